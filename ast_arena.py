@@ -0,0 +1,191 @@
+from array import array
+from ast_node import NODE_KINDS, NODE_TYPES
+
+# AST alternativa para programas muito grandes: em vez de um objeto ASTNode
+# por nó, a árvore inteira fica numa arena de arrays paralelos (como o
+# lexer.TokenBuffer faz com os tokens), e cada nó é só um índice. Cada nó tem
+# tipo (NodeKind, 1 byte), índice do valor na tabela de constantes, primeiro
+# filho, próximo irmão, linha e coluna. O coletor de lixo não vê os nós, e o
+# pickle (pool de processos, cache em disco) copia alguns arrays em vez de
+# percorrer milhões de objetos, sem limite de profundidade.
+#
+# O Parser constrói direto na arena com Parser(tokens, arena=ASTArena()) e
+# devolve um ArenaNode: uma visão de um nó (arena + índice) com a mesma
+# interface do ASTNode (kind, node_type, value, children, line, column,
+# pretty_print), criada só quando alguém a pede. Assim o SemanticAnalyzer, o
+# ThreeAddressCodeGenerator e os demais passes percorrem a arena sem mudar.
+
+NO_NODE = -1
+NO_POSITION = -1
+# Tipo das posições que guardam um filho None (o `else` ausente de um `if`),
+# para que a lista de filhos mantenha o tamanho
+EMPTY_KIND = 255
+
+class ASTArena:
+    # Os nós são gravados em pós-ordem: os filhos sempre antes do pai
+    def __init__(self):
+        self.kinds = array('B')
+        self.values = array('i')          # índice em self.constants, ou NO_NODE
+        self.first_children = array('i')  # NO_NODE nas folhas
+        self.next_siblings = array('i')   # NO_NODE no último filho
+        self.lines = array('i')
+        self.columns = array('i')
+        # Valores distintos dos nós (nomes, números, operadores, tipos); um
+        # valor que é um nó (o Tipo de uma DeclaracaoVariavel) fica como o
+        # índice (int) desse nó
+        self.constants = []
+        self.constant_indexes = {}
+        self.empty_slots = 0
+        self.root = NO_NODE
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def count_nodes(self):
+        # Nós de verdade, sem as posições de filhos None
+        return len(self.kinds) - self.empty_slots
+
+    def constant(self, value):
+        index = self.constant_indexes.get(value)
+        if index is None:
+            index = self.constant_indexes[value] = len(self.constants)
+            self.constants.append(value)
+        return index
+
+    def append(self, kind, value, first_child, line, column):
+        index = len(self.kinds)
+        self.kinds.append(kind)
+        self.values.append(value)
+        self.first_children.append(first_child)
+        self.next_siblings.append(NO_NODE)
+        self.lines.append(NO_POSITION if line is None else line)
+        self.columns.append(NO_POSITION if column is None else column)
+        return index
+
+    def add(self, node_type, value=None, children=None, line=None, column=None):
+        # Mesma assinatura do ASTNode, para o Parser construir nós nos dois
+        # formatos; os filhos e um valor que é um nó são índices da arena.
+        # Devolve o índice do novo nó
+        kind = NODE_KINDS.get(node_type)
+        if kind is None:
+            raise ValueError(f"Tipo de nó desconhecido: {node_type}")
+        first = previous = NO_NODE
+        if children:
+            next_siblings = self.next_siblings
+            for child in children:
+                if child is None:
+                    child = self.append(EMPTY_KIND, NO_NODE, NO_NODE, None, None)
+                    self.empty_slots += 1
+                if previous == NO_NODE:
+                    first = child
+                else:
+                    next_siblings[previous] = child
+                previous = child
+        index = self.append(kind, NO_NODE if value is None else self.constant(value), first, line, column)
+        self.root = index
+        return index
+
+    def child_indexes(self, index):
+        # Índices dos filhos de `index`, na ordem (inclusive as posições vazias)
+        next_siblings = self.next_siblings
+        child = self.first_children[index]
+        while child != NO_NODE:
+            yield child
+            child = next_siblings[child]
+
+    def value(self, index):
+        value = self.values[index]
+        if value == NO_NODE:
+            return None
+        value = self.constants[value]
+        return ArenaNode(self, value) if type(value) is int else value
+
+    def node(self, index):
+        # Visão do nó `index` (None para uma posição vazia)
+        if index == NO_NODE or self.kinds[index] == EMPTY_KIND:
+            return None
+        return ArenaNode(self, index)
+
+    def pretty_print(self, index, level=0):
+        # O mesmo texto do ASTNode.pretty_print, lendo direto dos arrays
+        kinds, values = self.kinds, self.values
+        lines = []
+        stack = [(index, level)]
+        while stack:
+            index, level = stack.pop()
+            indent = "  " * level
+            kind = kinds[index]
+            if kind == EMPTY_KIND:
+                lines.append(f"{indent}None")
+                continue
+            line = f"{indent}{NODE_TYPES[kind]}"
+            value = self.value(index) if values[index] != NO_NODE else None
+            if value:
+                line += f" (value: {value})"
+            if self.first_children[index] != NO_NODE:
+                line += ":"
+                stack.extend((child, level + 1) for child in reversed(list(self.child_indexes(index))))
+            lines.append(line)
+        return "\n".join(lines)
+
+    def __repr__(self):
+        return f"ASTArena({self.count_nodes()} nós)"
+
+class ArenaNode:
+    # Visão de um nó da arena com a interface do ASTNode (somente leitura)
+    __slots__ = ('arena', 'index')
+
+    def __init__(self, arena, index):
+        self.arena = arena
+        self.index = index
+
+    @property
+    def kind(self):
+        return self.arena.kinds[self.index]
+
+    @property
+    def node_type(self):
+        return NODE_TYPES[self.arena.kinds[self.index]]
+
+    @property
+    def value(self):
+        arena = self.arena
+        value = arena.values[self.index]
+        if value == NO_NODE:
+            return None
+        value = arena.constants[value]
+        return ArenaNode(arena, value) if type(value) is int else value
+
+    @property
+    def children(self):
+        # Lista nova a cada acesso, como numa leitura do TokenBuffer
+        arena = self.arena
+        kinds, next_siblings = arena.kinds, arena.next_siblings
+        children = []
+        child = arena.first_children[self.index]
+        while child != NO_NODE:
+            children.append(None if kinds[child] == EMPTY_KIND else ArenaNode(arena, child))
+            child = next_siblings[child]
+        return children
+
+    @property
+    def line(self):
+        line = self.arena.lines[self.index]
+        return None if line == NO_POSITION else line
+
+    @property
+    def column(self):
+        column = self.arena.columns[self.index]
+        return None if column == NO_POSITION else column
+
+    def __eq__(self, other):
+        return isinstance(other, ArenaNode) and self.arena is other.arena and self.index == other.index
+
+    def __hash__(self):
+        return hash((id(self.arena), self.index))
+
+    def __repr__(self):
+        return self.pretty_print()
+
+    def pretty_print(self, level=0):
+        return self.arena.pretty_print(self.index, level)
@@ -0,0 +1,196 @@
+import sys
+from json.encoder import encode_basestring
+
+# Impressão da AST direto num arquivo (ou qualquer objeto com `write`), nó a
+# nó, em vez de montar o texto inteiro numa string: a memória extra é a
+# pilha do percurso (proporcional à profundidade) e um buffer de alguns
+# milhares de pedaços de texto. Três formatos:
+#   - "text": o mesmo texto do ASTNode.pretty_print (que usa write_text);
+#   - "json": um objeto por nó com tipo, valor, linha, coluna e filhos;
+#   - "sexp": expressões S, `(Tipo "valor" filho ...)`, um nó por linha.
+# Com `max_depth`, os nós nesse nível (contado a partir da raiz) aparecem
+# sem os filhos, só com quantos foram omitidos.
+
+FORMATS = ("text", "json", "sexp")
+
+FLUSH_PIECES = 4096  # pedaços de texto acumulados antes de cada `write`
+
+# Eventos do percurso
+ENTER = 0      # nó cujos filhos vêm a seguir (até o LEAVE dele)
+LEAVE = 1
+COLLAPSED = 2  # nó no limite de profundidade: os filhos não são visitados
+OTHER = 3      # filho que não é um nó (o `else` ausente de um `if` é None)
+
+def is_node(value):
+    return hasattr(value, "kind")
+
+def walk(root, max_depth=None, level=0):
+    # Percorre a AST em pré-ordem sem recursão, produzindo (evento, nó,
+    # nível, filhos); a pilha guarda um iterador de filhos por nível
+    if not is_node(root):
+        yield OTHER, root, level, None
+        return
+    limit = None if max_depth is None else level + max_depth
+    frames = []
+    node, depth = root, level
+    while True:
+        children = node.children
+        if children and limit is not None and depth >= limit:
+            yield COLLAPSED, node, depth, children
+        else:
+            yield ENTER, node, depth, children
+            if children:
+                frames.append((node, depth, iter(children)))
+            else:
+                yield LEAVE, node, depth, children
+        while frames:
+            parent, parent_depth, siblings = frames[-1]
+            child = next(siblings, walk)  # `walk` marca o fim dos filhos
+            if child is walk:
+                frames.pop()
+                yield LEAVE, parent, parent_depth, None
+            elif is_node(child):
+                node, depth = child, parent_depth + 1
+                break
+            else:
+                yield OTHER, child, parent_depth + 1, None
+        else:
+            return
+
+class Output:
+    # Junta pedaços de texto e os escreve em blocos
+    def __init__(self, out):
+        self.out = out
+        self.pieces = []
+
+    def add(self, piece):
+        pieces = self.pieces
+        pieces.append(piece)
+        if len(pieces) >= FLUSH_PIECES:
+            self.out.write("".join(pieces))
+            pieces.clear()
+
+    def flush(self):
+        if self.pieces:
+            self.out.write("".join(self.pieces))
+            self.pieces.clear()
+
+def write_text(root, out, max_depth=None, level=0):
+    # Uma linha por nó, com dois espaços por nível (o formato do pretty_print)
+    output = Output(out)
+    add = output.add
+    for event, node, depth, children in walk(root, max_depth, level):
+        if event == LEAVE:
+            continue
+        indent = "  " * depth
+        if event == OTHER:
+            add(f"{indent}{node}\n")
+            continue
+        line = f"{indent}{node.node_type}"
+        if node.value:
+            line += f" (value: {node.value})"
+        if children:
+            line += ":"
+        add(line + "\n")
+        if event == COLLAPSED:
+            add(f"{indent}  ... ({len(children)} filhos omitidos)\n")
+    output.flush()
+
+def json_value(value):
+    if value is None:
+        return "null"
+    if type(value) is str:
+        return encode_basestring(value)
+    if type(value) is int:
+        return str(value)
+    if is_node(value):
+        # O Tipo de uma DeclaracaoVariavel: uma folha, impressa inteira
+        return json_node(value) + '"children":[]}'
+    return encode_basestring(str(value))
+
+def json_node(node):
+    # Início do objeto de um nó, até antes dos filhos
+    return (f'{{"type":"{node.node_type}","value":{json_value(node.value)},'
+            f'"line":{json_value(node.line)},"column":{json_value(node.column)},')
+
+def write_json(root, out, max_depth=None, level=0):
+    # Um único objeto JSON (numa linha só); filhos None viram null e nós no
+    # limite de profundidade têm "omitted" (quantos filhos) em vez de "children"
+    output = Output(out)
+    add = output.add
+    separate = False  # há um elemento antes, no mesmo nível
+    for event, node, _, children in walk(root, max_depth, level):
+        if event == LEAVE:
+            add("]}")
+            separate = True
+            continue
+        if separate:
+            add(",")
+        if event == OTHER:
+            add("null" if node is None else encode_basestring(str(node)))
+            separate = True
+        elif event == COLLAPSED:
+            add(json_node(node) + f'"omitted":{len(children)}}}')
+            separate = True
+        else:
+            add(json_node(node) + '"children":[')
+            separate = False
+    add("\n")
+    output.flush()
+
+def sexp_value(value):
+    if is_node(value):
+        return sexp_node(value) + ")"
+    return encode_basestring(str(value))
+
+def sexp_node(node):
+    # Início da expressão de um nó, até antes dos filhos
+    if node.value is None:
+        return f"({node.node_type}"
+    return f"({node.node_type} {sexp_value(node.value)}"
+
+def write_sexp(root, out, max_depth=None, level=0):
+    # `(Tipo "valor" filho ...)`, com cada filho numa linha indentada; None
+    # vira nil e os filhos omitidos pelo limite de profundidade viram `...`
+    output = Output(out)
+    add = output.add
+    for event, node, depth, children in walk(root, max_depth, level):
+        if event == LEAVE:
+            add(")")
+            continue
+        if depth > level:
+            add("\n" + "  " * depth)
+        if event == OTHER:
+            add("nil" if node is None else encode_basestring(str(node)))
+        elif event == COLLAPSED:
+            add(sexp_node(node) + f" ...{len(children)})")
+        else:
+            add(sexp_node(node))
+    add("\n")
+    output.flush()
+
+WRITERS = {"text": write_text, "json": write_json, "sexp": write_sexp}
+
+def dump(root, out=None, format="text", max_depth=None):
+    # Escreve a AST em `out` (por padrão a saída padrão) no formato pedido
+    writer = WRITERS.get(format)
+    if writer is None:
+        raise ValueError(f"Formato desconhecido: {format}. Use {', '.join(FORMATS)}")
+    writer(root, sys.stdout if out is None else out, max_depth)
+
+if __name__ == '__main__':
+    import argparse
+    from compiler import Compiler
+
+    arg_parser = argparse.ArgumentParser(description="Imprime a AST de um programa.")
+    arg_parser.add_argument("arquivo", nargs="?", default="tests/codigo_1.txt")
+    arg_parser.add_argument("--format", choices=FORMATS, default="text")
+    arg_parser.add_argument("--depth", type=int, help="profundidade máxima impressa")
+    args = arg_parser.parse_args()
+
+    with open(args.arquivo) as file:
+        result = Compiler(file.read(), quiet=True).compile()
+    for diagnostic in result.diagnostics:
+        print(diagnostic)
+    if result.ast is not None:
+        dump(result.ast, format=args.format, max_depth=args.depth)
@@ -1,23 +1,72 @@
+import io
+from ast_dump import write_text
+
+class NodeKind:
+    # Tipos de nó da AST como inteiros pequenos, como lexer.TokenKind; o nome
+    # de cada membro é o `node_type` do nó
+    Programa = 0
+    DeclaracaoVariavel = 1
+    Tipo = 2
+    ID = 3
+    DeclaracaoProcedimento = 4
+    DeclaracaoFuncao = 5
+    Parametro = 6
+    Bloco = 7
+    BlocoComRetorno = 8
+    ComandoAtribuicao = 9
+    ChamadaFuncaoOuProcedimento = 10
+    ChamadaProcedimento = 11
+    ChamadaFuncao = 12
+    ComandoCondicional = 13
+    ComandoLaco = 14
+    ComandoImpressao = 15
+    ComandoRetorno = 16
+    ComandoBreak = 17
+    ExpressaoBooleana = 18
+    ExpressaoAritmetica = 19
+    Termo = 20
+    Numero = 21
+    String = 22
+    Booleano = 23
+
+# Nome de cada tipo, indexado pelo valor inteiro do NodeKind
+NODE_KINDS = {name: kind for name, kind in vars(NodeKind).items() if not name.startswith("_")}
+NODE_TYPES = tuple(sorted(NODE_KINDS, key=NODE_KINDS.get))
+
+# Filhos das folhas (e de blocos vazios): uma única tupla compartilhada em
+# vez de uma lista vazia por nó
+NO_CHILDREN = ()
+
 class ASTNode:
-    def __init__(self, node_type, value=None, children=None):
-        self.node_type = node_type  
-        self.value = value  
-        self.children = children if children is not None else []  
+    # Nó compacto: __slots__ em vez de __dict__, o tipo como inteiro e a
+    # posição (linha e coluna do primeiro token) de onde o nó começa no fonte
+    __slots__ = ('kind', 'value', 'children', 'line', 'column')
+
+    def __init__(self, node_type, value=None, children=None, line=None, column=None):
+        kind = NODE_KINDS.get(node_type)
+        if kind is None:
+            raise ValueError(f"Tipo de nó desconhecido: {node_type}")
+        self.kind = kind
+        self.value = value
+        self.children = children if children else NO_CHILDREN
+        self.line = line
+        self.column = column
+
+    @property
+    def node_type(self):
+        return NODE_TYPES[self.kind]
 
     def add_child(self, child):
+        if self.children is NO_CHILDREN:
+            self.children = []
         self.children.append(child)
 
     def __repr__(self):
         return self.pretty_print()
 
     def pretty_print(self, level=0):
-        indent = "  " * level
-        result = f"{indent}{self.node_type}"
-        if self.value:
-            result += f" (value: {self.value})"
-        if self.children:
-            result += ":\n" + "\n".join(
-                child.pretty_print(level + 1) if isinstance(child, ASTNode) else f"{indent}  {child}"
-                for child in self.children
-            )
-        return result
+        # Uma linha por nó, com dois espaços por nível; para árvores grandes,
+        # ast_dump.write_text escreve o mesmo texto direto num arquivo
+        buffer = io.StringIO()
+        write_text(self, buffer, level=level)
+        return buffer.getvalue()[:-1]
@@ -0,0 +1,83 @@
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from compile_cache import CompilationCache
+from compiler import Compiler
+from source import open_source
+
+@dataclass
+class FileResult:
+    # Resumo da compilação de um arquivo; é o que volta dos processos do pool,
+    # por isso não carrega a AST
+    path: str
+    success: bool
+    diagnostics: List[str] = field(default_factory=list)
+    timings: Dict[str, float] = field(default_factory=dict)
+    instructions: int = 0
+    elapsed: float = 0.0
+    tac: Optional[List[str]] = None
+
+def expand_paths(patterns):
+    # Expande globs (inclusive `**`) e remove repetições, mantendo a ordem
+    paths = []
+    seen = set()
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+        for path in matches:
+            if path not in seen and not os.path.isdir(path):
+                seen.add(path)
+                paths.append(path)
+    return paths
+
+def compile_file(path, keep_tac=False, cache_dir=None, opt_level=0, cache_bytes=None, arena=False, streaming=False):
+    # Compila um arquivo com as mesmas opções da compilação de um arquivo só
+    # (nível de otimização, arena, streaming e tamanho do cache)
+    start = time.perf_counter()
+    cache = None
+    if cache_dir is not None:
+        cache = CompilationCache(cache_dir) if cache_bytes is None else CompilationCache(cache_dir, cache_bytes)
+    try:
+        with open_source(path) as codigo:
+            result = Compiler(codigo, streaming=streaming, quiet=True, cache=cache, opt_level=opt_level, arena=arena).compile()
+    except (OSError, ValueError) as e:
+        return FileResult(path, False, [str(e)], elapsed=time.perf_counter() - start)
+    return FileResult(
+        path,
+        result.success,
+        [str(diagnostic) for diagnostic in result.diagnostics],
+        result.timings,
+        len(result.tac) if result.tac is not None else 0,
+        time.perf_counter() - start,
+        result.tac.render() if keep_tac and result.tac is not None else None,
+    )
+
+def compile_batch(paths, jobs=None, ordered=False, keep_tac=False, cache_dir=None, opt_level=0, cache_bytes=None, arena=False,
+                  streaming=False):
+    # Compila os arquivos em paralelo num ProcessPoolExecutor (um processo
+    # por núcleo, por padrão) e devolve cada FileResult assim que fica pronto.
+    # Com ordered=True os resultados saem na ordem de `paths`, ainda assim
+    # sem esperar o lote inteiro terminar.
+    jobs = jobs or os.cpu_count() or 1
+    options = (keep_tac, cache_dir, opt_level, cache_bytes, arena, streaming)
+    if jobs == 1 or len(paths) <= 1:
+        for path in paths:
+            yield compile_file(path, *options)
+        return
+    with ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as executor:
+        futures = [executor.submit(compile_file, path, *options) for path in paths]
+        for future in (futures if ordered else as_completed(futures)):
+            yield future.result()
+
+def summarize(results):
+    summary = {"files": 0, "succeeded": 0, "failed": 0, "instructions": 0, "compile_time": 0.0, "phases": {}}
+    for result in results:
+        summary["files"] += 1
+        summary["succeeded" if result.success else "failed"] += 1
+        summary["instructions"] += result.instructions
+        summary["compile_time"] += result.elapsed
+        for phase, elapsed in result.timings.items():
+            summary["phases"][phase] = summary["phases"].get(phase, 0.0) + elapsed
+    return summary
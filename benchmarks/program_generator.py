@@ -0,0 +1,128 @@
+import argparse
+import random
+
+# Gera programas válidos (segundo BNF/BNF-revisada.txt e as regras do
+# analisador semântico) com tamanhos e formatos configuráveis, para medir o
+# compilador em entradas grandes.
+#
+# Restrições que os programas respeitam:
+#   - dentro de funções/procedimentos só parâmetros e variáveis locais são
+#     visíveis (o escopo global não é herdado);
+#   - uma função só pode chamar funções declaradas antes dela;
+#   - condições de if/while são expressões relacionais.
+
+SHAPES = ("nested", "wide", "functions", "identifiers", "mixed")
+
+def generate_program(shape, size, seed=0):
+    if shape not in SHAPES:
+        raise ValueError(f"Formato desconhecido: {shape}. Use um de: {', '.join(SHAPES)}")
+    rng = random.Random(seed)
+    return GENERATORS[shape](size, rng)
+
+def arithmetic_chain(operands, length, rng):
+    # Cadeia `a + b * 2 - c ...` com `length` termos
+    parts = [rng.choice(operands)]
+    for _ in range(length - 1):
+        parts.append(rng.choice(("+", "-", "*", "/")))
+        parts.append(rng.choice(operands))
+    return " ".join(parts)
+
+def nested_program(depth, rng):
+    # if/while aninhados até `depth` níveis
+    lines = ["int x, y;", "bool c;", "x = 0;", "y = 1;", "c = true;"]
+    indent = ""
+    for level in range(depth):
+        if level % 2 == 0:
+            lines.append(f"{indent}while (x < {rng.randint(1, 100)}) {{")
+        else:
+            lines.append(f"{indent}if (c == true) {{")
+        indent += "    "
+        lines.append(f"{indent}x = x + {rng.randint(1, 9)};")
+    for level in reversed(range(depth)):
+        lines.append(f"{indent}y = y * 2;")
+        if level % 3 == 0:
+            lines.append(f"{indent}break;")
+        indent = indent[:-4]
+        lines.append(f"{indent}}}")
+    lines.append("print(y);")
+    return "\n".join(lines) + "\n"
+
+def wide_program(length, rng):
+    # Poucas atribuições com expressões muito longas
+    operands = ["a", "b", "c"] + [str(n) for n in range(1, 10)]
+    lines = ["int a, b, c, r;", "a = 1;", "b = 2;", "c = 3;"]
+    for _ in range(4):
+        lines.append(f"r = {arithmetic_chain(operands, length, rng)};")
+    lines.append("bool t;")
+    lines.append(f"t = {arithmetic_chain(operands, length, rng)} < r;")
+    lines.append("print(r);")
+    return "\n".join(lines) + "\n"
+
+def functions_program(count, rng):
+    # Muitas funções e procedimentos, cada um chamando um anterior
+    lines = ["int g;", "g = 1;"]
+    functions = []
+    for index in range(count):
+        if index % 3 == 2:
+            name = f"p{index}"
+            lines.append(f"void {name}(int a) {{")
+            lines.append("    int r;")
+            lines.append(f"    r = {arithmetic_chain(['a', '1', '2'], 5, rng)};")
+            lines.append("    print(r);")
+            lines.append("}")
+            lines.append(f"prc {name}(g);")
+        else:
+            name = f"f{index}"
+            lines.append(f"int {name}(int a, int b) {{")
+            lines.append("    int r;")
+            if functions:
+                callee = rng.choice(functions)
+                lines.append(f"    r = fun {callee}(a, b) + {arithmetic_chain(['a', 'b', '3'], 3, rng)};")
+            else:
+                lines.append(f"    r = {arithmetic_chain(['a', 'b', '3'], 3, rng)};")
+            lines.append("    if (r > 100) {")
+            lines.append("        r = r - 100;")
+            lines.append("    }")
+            lines.append("    return r;")
+            lines.append("}")
+            functions.append(name)
+            lines.append(f"g = fun {name}(g, {index});")
+    lines.append("print(g);")
+    return "\n".join(lines) + "\n"
+
+def identifiers_program(count, rng):
+    # Listas de identificadores muito longas
+    names = [f"v{index}" for index in range(count)]
+    flags = [f"b{index}" for index in range(count // 4 + 1)]
+    lines = [f"int {', '.join(names)};", f"bool {', '.join(flags)};"]
+    for index, name in enumerate(names):
+        lines.append(f"{name} = {index};")
+    for flag in flags:
+        lines.append(f"{flag} = {rng.choice(names)} < {rng.choice(names)};")
+    lines.append(f"print({names[-1]});")
+    return "\n".join(lines) + "\n"
+
+def mixed_program(size, rng):
+    # Um pouco de cada formato; os nomes globais de cada parte não colidem
+    parts = [
+        functions_program(size, rng),
+        identifiers_program(size, rng),
+        nested_program(min(size, 60), rng),
+    ]
+    return "".join(parts)
+
+GENERATORS = {
+    "nested": nested_program,
+    "wide": wide_program,
+    "functions": functions_program,
+    "identifiers": identifiers_program,
+    "mixed": mixed_program,
+}
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Gera um programa sintético da linguagem.")
+    arg_parser.add_argument("shape", choices=SHAPES)
+    arg_parser.add_argument("size", type=int)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args()
+    print(generate_program(args.shape, args.size, args.seed), end="")
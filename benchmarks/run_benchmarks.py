@@ -0,0 +1,133 @@
+import argparse
+import json
+import platform
+import sys
+from compiler import Compiler
+from benchmarks.program_generator import generate_program
+
+# Casos padrão: (nome, formato, tamanho). O tamanho de "nested" fica abaixo
+# do limite de recursão do parser (blocos aninhados são analisados
+# recursivamente).
+CASES = (
+    ("nested-150", "nested", 150),
+    ("wide-300", "wide", 300),
+    ("functions-2000", "functions", 2000),
+    ("identifiers-5000", "identifiers", 5000),
+    ("mixed-500", "mixed", 500),
+)
+
+PHASES = ("lexer", "parser", "semantic", "codegen")
+
+def run_case(name, shape, size, repeat, seed=0, opt_level=0):
+    code = generate_program(shape, size, seed)
+    best = {}
+    counters = {}
+    for _ in range(repeat):
+        result = Compiler(code, quiet=True, opt_level=opt_level).compile()
+        if not result.success:
+            raise RuntimeError(f"Programa gerado para '{name}' não compilou: {result.diagnostics[0]}")
+        for phase in PHASES + (("optimize",) if opt_level else ()):
+            elapsed = result.timings[phase]
+            best[phase] = min(best.get(phase, elapsed), elapsed)
+        for phase, stats in result.profile["phases"].items():
+            counters.update({f"{phase}.{key}": value for key, value in stats["counters"].items()})
+    return {
+        "shape": shape,
+        "size": size,
+        "source_bytes": len(code),
+        "phases": best,
+        "total": sum(best.values()),
+        "counters": counters,
+    }
+
+def run_benchmarks(cases=CASES, repeat=3, seed=0, scale=1.0, opt_level=0):
+    results = {}
+    for name, shape, size in cases:
+        results[name] = run_case(name, shape, max(1, int(size * scale)), repeat, seed, opt_level)
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "repeat": repeat,
+        "scale": scale,
+        "opt_level": opt_level,
+        "cases": results,
+    }
+
+def compare(results, baseline, tolerance, min_time):
+    # Lista as etapas que ficaram mais lentas que o baseline além da
+    # tolerância. Tempos abaixo de `min_time` segundos são ruído e ignorados.
+    regressions = []
+    for name, case in results["cases"].items():
+        reference = baseline["cases"].get(name)
+        if reference is None or reference["size"] != case["size"]:
+            continue
+        for phase, elapsed in case["phases"].items():
+            expected = reference["phases"].get(phase)
+            if expected is None or max(elapsed, expected) < min_time:
+                continue
+            if elapsed > expected * (1 + tolerance):
+                regressions.append((name, phase, expected, elapsed))
+    return regressions
+
+def print_table(results, baseline=None):
+    phases = PHASES + (("optimize",) if results.get("opt_level") else ())
+    print(f"{'caso':<20}" + "".join(f"{phase:>12}" for phase in phases) + f"{'total':>12}{'vs base':>10}")
+    for name, case in results["cases"].items():
+        row = f"{name:<20}" + "".join(f"{case['phases'][phase] * 1000:>10.1f}ms" for phase in phases)
+        row += f"{case['total'] * 1000:>10.1f}ms"
+        reference = baseline["cases"].get(name) if baseline else None
+        if reference and reference["size"] == case["size"]:
+            row += f"{(case['total'] / reference['total'] - 1) * 100:>+9.1f}%"
+        print(row)
+    if results.get("opt_level"):
+        print(f"\ninstruções com -O{results['opt_level']}:")
+        for name, case in results["cases"].items():
+            before = case["counters"]["optimize.instructions_before"]
+            after = case["counters"]["optimize.instructions_after"]
+            print(f"  {name:<20}{before:>10} -> {after:<10}({(after / before - 1) * 100 if before else 0:+.1f}%)")
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Mede cada etapa do compilador em programas sintéticos.")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="repetições por caso (vale o menor tempo)")
+    arg_parser.add_argument("--scale", type=float, default=1.0, help="multiplica o tamanho de todos os casos")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--opt-level", type=int, choices=(0, 1, 2), default=0, help="nível de otimização do código gerado")
+    arg_parser.add_argument("--output", help="salva os resultados em JSON neste arquivo")
+    arg_parser.add_argument("--baseline", help="arquivo JSON de baseline para comparação")
+    arg_parser.add_argument("--save-baseline", action="store_true", help="grava os resultados no arquivo de --baseline")
+    arg_parser.add_argument("--tolerance", type=float, default=0.25, help="piora relativa aceita antes de falhar (0.25 = 25%%)")
+    arg_parser.add_argument("--min-time", type=float, default=0.005, help="ignora etapas mais rápidas que isso (segundos)")
+    args = arg_parser.parse_args()
+
+    results = run_benchmarks(repeat=args.repeat, seed=args.seed, scale=args.scale, opt_level=args.opt_level)
+
+    # A comparação é opcional: sem --baseline (ou com um arquivo que ainda
+    # não existe) só os tempos são mostrados
+    baseline = None
+    if args.baseline and not args.save_baseline:
+        try:
+            with open(args.baseline) as file:
+                baseline = json.load(file)
+        except FileNotFoundError:
+            print(f"Baseline {args.baseline} não encontrado; use --save-baseline para gravá-lo. Nada foi comparado.\n")
+
+    print_table(results, baseline)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.save_baseline:
+        if not args.baseline:
+            arg_parser.error("--save-baseline precisa de --baseline")
+        with open(args.baseline, "w") as file:
+            json.dump(results, file, indent=2)
+        print(f"Baseline salvo em {args.baseline}")
+    elif baseline is not None:
+        regressions = compare(results, baseline, args.tolerance, args.min_time)
+        if regressions:
+            print("\nREGRESSÕES DE DESEMPENHO:")
+            for name, phase, expected, elapsed in regressions:
+                print(f"  {name} / {phase}: {expected * 1000:.1f}ms -> {elapsed * 1000:.1f}ms ({(elapsed / expected - 1) * 100:+.1f}%)")
+            sys.exit(1)
+        print("\nSem regressões em relação ao baseline.")
@@ -0,0 +1,204 @@
+import argparse
+import time
+from compiler import Compiler
+from tac_vm import TacRuntimeError, format_value, truncating_divide
+
+# Mede a execução dos programas compilados: a avaliação direta da AST
+# (TreeEvaluator, abaixo), a máquina virtual de código de três endereços
+# (backend "vm") e a tradução para Python (backend "python").
+
+CASES = {
+    "laco": """
+int i, s;
+i = 0;
+s = 0;
+while (i < 200000) {
+    s = s + i * 2 - i / 3;
+    i = i + 1;
+}
+print(s);
+""",
+    "chamadas": """
+int dobro(int n) {
+    int r;
+    r = n * 2 + 1;
+    return r;
+}
+int i, s;
+i = 0;
+s = 0;
+while (i < 100000) {
+    s = s + fun dobro(i);
+    i = i + 1;
+}
+print(s);
+""",
+    "recursao": """
+int fib(int n) {
+    int r;
+    if (n < 2) {
+        r = n;
+    } else {
+        r = fun fib(n - 1) + fun fib(n - 2);
+    }
+    return r;
+}
+print(fun fib(20));
+""",
+    "aninhado": """
+int i, j, s;
+bool fim;
+i = 0;
+s = 0;
+fim = false;
+while (i < 300) {
+    j = 0;
+    while (j < 300) {
+        if (j == i) {
+            s = s + 1;
+        } else {
+            s = s + 2;
+        }
+        j = j + 1;
+    }
+    i = i + 1;
+}
+print(s);
+""",
+}
+
+class Break(Exception):
+    pass
+
+class Return(Exception):
+    def __init__(self, value):
+        self.value = value
+
+BINARY = {
+    "+": lambda a, b: a + b,
+    "-": lambda a, b: a - b,
+    "*": lambda a, b: a * b,
+    "/": truncating_divide,
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+}
+
+class TreeEvaluator:
+    # Avaliação direta da AST, nó a nó, com variáveis em dicionários: a
+    # referência ingênua contra a qual os backends são comparados
+    def __init__(self, ast_root):
+        self.ast_root = ast_root
+        self.output = []
+        self.routines = {}
+
+    def run(self):
+        stack = [self.ast_root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            if node.node_type in ("DeclaracaoFuncao", "DeclaracaoProcedimento"):
+                self.routines.setdefault(node.value, node)
+            stack.extend(node.children)
+        try:
+            self.execute(self.ast_root, {})
+        except Return:
+            pass
+        return self.output
+
+    def execute(self, node, env):
+        if node is None:
+            return
+        node_type = node.node_type
+        if node_type in ("Programa", "Bloco", "BlocoComRetorno"):
+            for child in node.children:
+                self.execute(child, env)
+        elif node_type == "ComandoAtribuicao":
+            env[node.children[0].value] = self.evaluate(node.children[1], env)
+        elif node_type == "ComandoImpressao":
+            self.output.append(format_value(self.evaluate(node.children[0], env)))
+        elif node_type == "ComandoLaco":
+            try:
+                while self.evaluate(node.children[0], env):
+                    self.execute(node.children[1], env)
+            except Break:
+                pass
+        elif node_type == "ComandoCondicional":
+            if self.evaluate(node.children[0], env):
+                self.execute(node.children[1], env)
+            elif len(node.children) == 3:
+                self.execute(node.children[2], env)
+        elif node_type == "ComandoBreak":
+            raise Break()
+        elif node_type == "ComandoRetorno":
+            raise Return(self.evaluate(node.children[0], env))
+        elif node_type == "ChamadaProcedimento":
+            self.call(node, env)
+
+    def evaluate(self, node, env):
+        node_type = node.node_type
+        if node_type in ("ExpressaoBooleana", "ExpressaoAritmetica", "Termo"):
+            return BINARY[node.value](self.evaluate(node.children[0], env), self.evaluate(node.children[1], env))
+        if node_type == "Numero":
+            return int(node.value)
+        if node_type == "ID":
+            if node.value not in env:
+                raise TacRuntimeError(f"Variável '{node.value}' lida antes de ser atribuída")
+            return env[node.value]
+        if node_type == "Booleano":
+            return node.value == "true"
+        if node_type == "String":
+            return node.value.strip('"')
+        if node_type == "ChamadaFuncao":
+            return self.call(node, env)
+        raise NotImplementedError(node_type)
+
+    def call(self, node, env):
+        declaration = self.routines[node.value]
+        params = declaration.children[1:-1] if declaration.node_type == "DeclaracaoFuncao" else declaration.children[:-1]
+        local = {param.value: self.evaluate(arg, env) for param, arg in zip(params, node.children)}
+        try:
+            self.execute(declaration.children[-1], local)
+        except Return as result:
+            return result.value
+        return None
+
+def best_time(function, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def run_case(code, repeat):
+    result = Compiler(code, quiet=True, opt_level=2).compile()
+    if not result.success:
+        raise RuntimeError(f"Programa não compilou: {result.diagnostics[0]}")
+    times = {}
+    outputs = {}
+    times["árvore"], outputs["árvore"] = best_time(lambda: TreeEvaluator(result.ast).run(), repeat)
+    times["vm"], outputs["vm"] = best_time(lambda: result.execute("vm"), repeat)
+    times["python"], outputs["python"] = best_time(lambda: result.execute("python"), repeat)
+    if len({tuple(output) for output in outputs.values()}) != 1:
+        raise RuntimeError(f"Saídas diferentes entre os backends: {outputs}")
+    return times
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Compara a execução por avaliação da AST, pela TacVM e pelo backend Python.")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="repetições por caso (vale o menor tempo)")
+    args = arg_parser.parse_args()
+
+    backends = ("árvore", "vm", "python")
+    print(f"{'caso':<12}" + "".join(f"{backend:>12}" for backend in backends) + f"{'python/árvore':>16}")
+    for name, code in CASES.items():
+        times = run_case(code, args.repeat)
+        row = f"{name:<12}" + "".join(f"{times[backend] * 1000:>10.1f}ms" for backend in backends)
+        row += f"{times['árvore'] / times['python']:>15.1f}x"
+        print(row)
@@ -0,0 +1,263 @@
+from tac_ir import Op, instruction_def, instruction_uses
+
+# Grafo de fluxo de controle do código de três endereços. O programa é
+# dividido em rotinas (o código de nível superior e cada função ou
+# procedimento) e cada rotina em blocos básicos, com arestas de sucessores
+# e predecessores. O corpo de uma função aparece no meio do código de nível
+# superior, mas não é executado ali: o nível superior segue direto para a
+# instrução depois do fim da função.
+
+MAIN = "<main>"  # nome da rotina do código de nível superior
+
+BEGIN_OPS = frozenset({Op.FUNC_BEGIN, Op.PROC_BEGIN})
+END_OPS = frozenset({Op.FUNC_END, Op.PROC_END})
+# Instruções que terminam um bloco básico
+TERMINATORS = frozenset({Op.GOTO, Op.IF_FALSE, Op.BREAK, Op.RETURN})
+
+class BasicBlock:
+    __slots__ = ("index", "start", "end", "successors", "predecessors")
+
+    def __init__(self, index, start, end):
+        self.index = index
+        self.start = start  # intervalo [start, end) em program.instructions
+        self.end = end
+        self.successors = []
+        self.predecessors = []
+
+    def __repr__(self):
+        return f"BasicBlock({self.index}, {self.start}:{self.end}, succ={[block.index for block in self.successors]})"
+
+class ControlFlowGraph:
+    def __init__(self, program, name, segments):
+        # `segments` são os intervalos contíguos de instruções da rotina, em
+        # ordem de execução sequencial
+        self.program = program
+        self.name = name
+        self.blocks = []
+        self.label_blocks = {}  # rótulo -> bloco que começa nele
+        self._dominators = None
+        self.build(segments)
+
+    def instructions(self, block):
+        return self.program.instructions[block.start:block.end]
+
+    @property
+    def entry(self):
+        return self.blocks[0] if self.blocks else None
+
+    def build(self, segments):
+        instructions = self.program.instructions
+        for start, end in segments:
+            block_start = start
+            for index in range(start, end):
+                op = instructions[index][0]
+                if op == Op.LABEL and index > block_start:
+                    self.add_block(block_start, index)
+                    block_start = index
+                if op in TERMINATORS:
+                    self.add_block(block_start, index + 1)
+                    block_start = index + 1
+            if block_start < end:
+                self.add_block(block_start, end)
+
+        for position, block in enumerate(self.blocks):
+            op, _, left, right = instructions[block.end - 1]
+            following = self.blocks[position + 1] if position + 1 < len(self.blocks) else None
+            if op == Op.GOTO or op == Op.BREAK:
+                targets = [self.label_blocks.get(left)]
+            elif op == Op.IF_FALSE:
+                targets = [following, self.label_blocks.get(right)]
+            elif op == Op.RETURN:
+                targets = []
+            else:
+                targets = [following]
+            for target in targets:
+                if target is not None and target not in block.successors:
+                    block.successors.append(target)
+                    target.predecessors.append(block)
+
+    def add_block(self, start, end):
+        block = BasicBlock(len(self.blocks), start, end)
+        self.blocks.append(block)
+        first = self.program.instructions[start]
+        if first[0] == Op.LABEL:
+            self.label_blocks[first[2]] = block
+
+    def reverse_postorder(self):
+        # Blocos alcançáveis a partir da entrada, em pós-ordem reversa
+        if not self.blocks:
+            return []
+        visited = {self.entry.index}
+        order = []
+        stack = [(self.entry, iter(self.entry.successors))]
+        while stack:
+            block, successors = stack[-1]
+            for successor in successors:
+                if successor.index not in visited:
+                    visited.add(successor.index)
+                    stack.append((successor, iter(successor.successors)))
+                    break
+            else:
+                stack.pop()
+                order.append(block)
+        order.reverse()
+        return order
+
+    def reachable(self):
+        return {block.index for block in self.reverse_postorder()}
+
+    def immediate_dominators(self):
+        # Dominador imediato de cada bloco (None para a entrada e para blocos
+        # inalcançáveis), pelo algoritmo iterativo de Cooper, Harvey e Kennedy
+        if self._dominators is not None:
+            return self._dominators
+        order = self.reverse_postorder()
+        position = {block.index: number for number, block in enumerate(order)}
+        idom = [None] * len(self.blocks)
+        if not order:
+            self._dominators = idom
+            return idom
+        entry = order[0].index
+        idom[entry] = entry
+        changed = True
+        while changed:
+            changed = False
+            for block in order[1:]:
+                new = None
+                for predecessor in block.predecessors:
+                    if idom[predecessor.index] is None:
+                        continue
+                    if new is None:
+                        new = predecessor.index
+                        continue
+                    # Interseção: sobe pelos dominadores até se encontrarem
+                    a, b = predecessor.index, new
+                    while a != b:
+                        while position[a] > position[b]:
+                            a = idom[a]
+                        while position[b] > position[a]:
+                            b = idom[b]
+                    new = a
+                if idom[block.index] != new:
+                    idom[block.index] = new
+                    changed = True
+        idom[entry] = None
+        self._dominators = idom
+        return idom
+
+    def dominates(self, a, b):
+        # O bloco `a` domina o bloco `b`? (todo caminho da entrada até b passa por a)
+        idom = self.immediate_dominators()
+        index = b.index
+        while index is not None:
+            if index == a.index:
+                return True
+            index = idom[index]
+        return False
+
+    def liveness(self):
+        # Variáveis e temporários vivos na entrada e na saída de cada bloco
+        # (análise iterativa para trás). Devolve (live_in, live_out), listas
+        # de conjuntos indexadas pelo número do bloco
+        uses = []
+        defs = []
+        for block in self.blocks:
+            used = set()
+            defined = set()
+            for ins in self.instructions(block):
+                for operand in instruction_uses(ins):
+                    if operand not in defined:
+                        used.add(operand)
+                target = instruction_def(ins)
+                if target is not None:
+                    defined.add(target)
+            uses.append(used)
+            defs.append(defined)
+        live_in = [set() for _ in self.blocks]
+        live_out = [set() for _ in self.blocks]
+        order = list(reversed(self.reverse_postorder()))
+        changed = True
+        while changed:
+            changed = False
+            for block in order:
+                index = block.index
+                out = set()
+                for successor in block.successors:
+                    out |= live_in[successor.index]
+                new_in = uses[index] | (out - defs[index])
+                if new_in != live_in[index] or out != live_out[index]:
+                    live_in[index] = new_in
+                    live_out[index] = out
+                    changed = True
+        return live_in, live_out
+
+    def __str__(self):
+        lines = [f"rotina {self.name}:"]
+        idom = self.immediate_dominators()
+        for block in self.blocks:
+            successors = ", ".join(f"B{successor.index}" for successor in block.successors) or "-"
+            dominator = f"B{idom[block.index]}" if idom[block.index] is not None else "-"
+            lines.append(f"  B{block.index} [{block.start}:{block.end}] -> {successors} (idom {dominator})")
+        return "\n".join(lines)
+
+def routine_segments(program):
+    # Intervalos de instruções de cada rotina, na ordem em que aparecem:
+    # {nome: [(início, fim), ...]}. As instruções FUNC_BEGIN/FUNC_END não
+    # fazem parte de nenhuma rotina
+    segments = {MAIN: []}
+    stack = [(MAIN, 0)]
+    for index, (op, _, left, _) in enumerate(program.instructions):
+        if op in BEGIN_OPS:
+            name, start = stack[-1]
+            if start < index:
+                segments[name].append((start, index))
+            segments[left] = []
+            stack.append((left, index + 1))
+        elif op in END_OPS:
+            name, start = stack.pop()
+            if start < index:
+                segments[name].append((start, index))
+            outer, _ = stack[-1]
+            stack[-1] = (outer, index + 1)
+    name, start = stack[-1]
+    if start < len(program.instructions):
+        segments[name].append((start, len(program.instructions)))
+    return segments
+
+def build_cfgs(program):
+    # Um ControlFlowGraph por rotina: {MAIN ou nome da função: grafo}
+    return {name: ControlFlowGraph(program, name, segments)
+            for name, segments in routine_segments(program).items()}
+
+if __name__ == '__main__':
+    from lexer import Lexer
+    from parser import Parser
+    from three_address_code_generator import ThreeAddressCodeGenerator
+
+    code = '''
+    int a, b;
+    a = 0;
+    b = 1;
+    int dobro(int x) {
+        int r;
+        r = x * 2;
+        return r;
+    }
+    while (a < 10) {
+        a = a + 1;
+        if (a == 5) {
+            break;
+        }
+        b = fun dobro(b);
+    }
+    print(b);
+    '''
+    program = ThreeAddressCodeGenerator(Parser(Lexer(code).iter_tokens()).parse()).generate()
+    for line in program.render():
+        print(line)
+    for name, graph in build_cfgs(program).items():
+        print()
+        print(graph)
+        live_in, _ = graph.liveness()
+        for block in graph.blocks:
+            print(f"  vivos na entrada de B{block.index}: {sorted(map(str, live_in[block.index]))}")
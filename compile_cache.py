@@ -0,0 +1,132 @@
+import hashlib
+import os
+import pickle
+import tempfile
+from compiler import COMPILER_VERSION
+from serialization import SerializationError, dump_ast, load_ast
+
+class CompilationCache:
+    # Cache em disco do resultado de compilações bem sucedidas (AST e código
+    # de três endereços), indexado pelo hash do código fonte + versão do
+    # compilador + opções. O tamanho total do diretório é limitado a
+    # `max_bytes`; quando passa disso, as entradas usadas há mais tempo
+    # (mtime mais antigo, atualizado a cada acerto) são removidas. A AST vai
+    # no formato binário de serialization.py (menor e mais rápido que o
+    # pickle de um objeto por nó, e sem limite de profundidade); o código de
+    # três endereços, uma lista de tuplas, vai direto no pickle.
+    SUFFIX = ".cache"
+
+    def __init__(self, directory, max_bytes=256 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, code, options=""):
+        digest = hashlib.sha256()
+        digest.update(f"{COMPILER_VERSION}\0{options}\0".encode())
+        digest.update(code.encode() if isinstance(code, str) else code)
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def get(self, key, arena=None):
+        # (AST, código de três endereços) ou None; com `arena` (uma
+        # ast_arena.ASTArena) a AST é carregada nela
+        path = self.path(key)
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+        except OSError:
+            self.misses += 1
+            return None
+        try:
+            ast_data, tac = pickle.loads(data)
+            ast = load_ast(ast_data, arena)
+        except Exception:
+            # Entrada estragada ou gravada por outra versão do código (uma
+            # classe que mudou de lugar dá AttributeError ou ImportError no
+            # pickle): conta como falha, e a entrada é apagada
+            self.remove(path)
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return ast, tac
+
+    def remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def put(self, key, ast, tac):
+        try:
+            data = pickle.dumps((dump_ast(ast), tac), protocol=pickle.HIGHEST_PROTOCOL)
+        except SerializationError:
+            return False
+        if len(data) > self.max_bytes:
+            return False
+        # Grava em um arquivo temporário e renomeia, para que outro processo
+        # nunca leia uma entrada pela metade
+        handle, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(handle, "wb") as file:
+                file.write(data)
+            os.replace(temporary, self.path(key))
+        except OSError:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            return False
+        self.evict()
+        return True
+
+    def entries(self):
+        entries = []
+        with os.scandir(self.directory) as iterator:
+            for entry in iterator:
+                if entry.name.endswith(self.SUFFIX):
+                    try:
+                        info = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((info.st_mtime, info.st_size, entry.path))
+        return entries
+
+    def evict(self):
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+
+    def clear(self):
+        for _, _, path in self.entries():
+            self.remove(path)
+
+    def stats(self):
+        entries = self.entries()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+        }
@@ -1,7 +1,18 @@
-from lexer import Lexer
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from lexer import Lexer, LexicalError
 from parser import Parser
+from ast_arena import ASTArena
 from new_semantic import SemanticAnalyzer
-from three_address_code_generator import ThreeAddressCodeGenerator  
+from parallel_backend import ParallelBackend
+from three_address_code_generator import ThreeAddressCodeGenerator
+from tac_ir import TacProgram
+from optimizer import optimize
+from tac_vm import TacVM
+import py_backend
+import ast_dump
+import sys
+from instrumentation import PhaseProfiler, count_nodes, peak_rss_kb, reset_peak_rss
 
 class Colors:
     RED = '\033[91m'
@@ -9,71 +20,268 @@ class Colors:
     YELLOW = '\033[93m'
     RESET = '\033[0m'
 
+# Muda sempre que a AST ou o código gerado mudam de formato; faz parte da
+# chave do cache de compilação
+COMPILER_VERSION = "1.4"
+
+# Saídas que podem ser impressas durante a compilação
+DUMPS = frozenset({"tokens", "symbols", "ast", "tac"})
+
+@dataclass
+class Diagnostic:
+    phase: str
+    message: str
+
+    def __str__(self):
+        return f"[{self.phase}] {self.message}"
+
+@dataclass
+class CompileResult:
+    tokens: Any = None
+    symbol_table: Optional[Dict[str, Any]] = None
+    ast: Any = None
+    diagnostics: List[Diagnostic] = field(default_factory=list)
+    tac: Optional[TacProgram] = None  # texto com tac.render()
+    timings: Dict[str, float] = field(default_factory=dict)
+    peak_rss_kb: Optional[int] = None
+    profile: Optional[Dict[str, Any]] = None
+    cache_hit: bool = False
+
+    @property
+    def success(self):
+        return self.tac is not None and not self.diagnostics
+
+    def execute(self, backend="python", write=None):
+        # Executa o programa compilado e devolve as linhas impressas (ou
+        # passa cada uma para `write`). backend="python" traduz a AST para
+        # código Python (py_backend); backend="vm" interpreta o código de três
+        # endereços (tac_vm). Programas que o Python não consegue compilar
+        # (aninhamento profundo demais) são executados na TacVM
+        if not self.success:
+            raise ValueError("Programa com erros de compilação não pode ser executado")
+        if backend not in ("python", "vm"):
+            raise ValueError(f"Backend desconhecido: {backend}. Use 'python' ou 'vm'")
+        if backend == "python":
+            code = py_backend.load(self.ast)
+            if code is not None:
+                return py_backend.run_code(code, write)
+        return TacVM(self.tac, write=write).run()
+
 class Compiler:
-    def __init__(self, code: str):
+    def __init__(self, code, streaming: bool = False, quiet: bool = False, dumps=None, profile: bool = False, cache=None, jobs=None, opt_level: int = 0, arena: bool = False,
+                 ast_format: str = "text", ast_depth: Optional[int] = None, ast_output=None):
         if not code:
             raise ValueError(f"{Colors.RED}Código vazio!{Colors.RESET}")
         self.lexer = Lexer(code)
         self.parser = None
         self.semantic_analyzer = None
+        # No modo streaming o parser consome os tokens à medida que o léxico
+        # os produz, sem guardar a lista completa de tokens
+        self.streaming = streaming
+        # No modo quiet nada é impresso: o resultado vem no CompileResult e
+        # só as saídas pedidas em `dumps` são impressas
+        self.quiet = quiet
+        if dumps is None:
+            dumps = () if quiet else DUMPS
+            if ast_output is not None:
+                # Com um arquivo de saída, a AST é escrita mesmo no modo quiet
+                dumps = DUMPS if not quiet else {"ast"}
+        self.dumps = frozenset(dumps)
+        unknown = self.dumps - DUMPS
+        if unknown:
+            raise ValueError(f"Saídas desconhecidas: {', '.join(sorted(unknown))}")
+        # Formato ("text", "json" ou "sexp"), profundidade máxima e destino
+        # (objeto com `write`; por padrão a saída padrão) da AST impressa; a
+        # AST é escrita nó a nó (ver ast_dump.py)
+        if ast_format not in ast_dump.FORMATS:
+            raise ValueError(f"Formato de AST desconhecido: {ast_format}. Use {', '.join(ast_dump.FORMATS)}")
+        if ast_depth is not None and ast_depth < 0:
+            raise ValueError(f"Profundidade da AST negativa: {ast_depth}")
+        self.ast_format = ast_format
+        self.ast_depth = ast_depth
+        self.ast_output = ast_output
+        # Com profile=True o relatório inclui o pico de alocações de cada
+        # etapa (tracemalloc), o que deixa a compilação mais lenta
+        self.profile = profile
+        self.profiler = None
+        # Cache de compilação opcional (ex.: compile_cache.CompilationCache);
+        # num acerto, léxico, parser, semântico e geração são pulados
+        self.cache = cache
+        # Com jobs > 1, os corpos das funções são analisados e gerados em
+        # paralelo (ver parallel_backend.py); o resultado é o mesmo
+        self.jobs = jobs
+        self.backend = None
+        # Nível de otimização do código gerado: 0 = nenhuma, 1 = dobra de
+        # constantes e simplificações algébricas, 2 = também subexpressões
+        # comuns, propagação de cópias e temporários mortos
+        self.opt_level = opt_level
+        # Com arena=True a AST é gravada numa ast_arena.ASTArena (arrays
+        # paralelos) em vez de um objeto por nó; o resultado é o mesmo
+        self.arena = arena
+        self.peak_rss_kb = None
+        self.result = None
+
+    def log(self, message, color=Colors.GREEN):
+        if not self.quiet:
+            print(f"{color}{message}{Colors.RESET}")
+
+    def dump_ast(self, ast):
+        ast_dump.dump(ast, sys.stdout if self.ast_output is None else self.ast_output, self.ast_format, self.ast_depth)
+
+    def report(self, phase, label, error):
+        self.result.diagnostics.append(Diagnostic(phase, str(error)))
+        self.log(f"{label}: {error}", Colors.RED)
 
     def compile(self):
-        # Etapa 1: Analisador Léxico
+        self.result = CompileResult()
+        self.profiler = PhaseProfiler(trace_memory=self.profile)
+        reset_peak_rss()
         try:
-            print(f"{Colors.GREEN}Iniciando Analisador Léxico!{Colors.RESET}")
-            self.lexer.tokenize()
-            self.lexer.print_tokens()
-            self.lexer.print_symbol_table()
-            self.parser = Parser(self.lexer.tokens)
-            print(f"{Colors.GREEN}Analisador Léxico bem sucedido!{Colors.RESET}")
-        except SyntaxError as e:
-            print(f"{Colors.RED}Erro no léxico: {e}{Colors.RESET}")
-            return  
-        except Exception as e:
-            print(f"{Colors.RED}Erro: {e}{Colors.RESET}")
-            return  
+            self.run_phases()
+        finally:
+            self.peak_rss_kb = self.result.peak_rss_kb = self.profiler.peak_rss_kb = peak_rss_kb()
+            self.result.timings = self.profiler.timings()
+            self.result.profile = self.profiler.as_dict()
+            if self.peak_rss_kb is not None:
+                self.log(f"Pico de memória (RSS): {self.peak_rss_kb} KB", Colors.YELLOW)
+        return self.result
+
+    def run_phases(self):
+        result = self.result
+        profiler = self.profiler
+
+        cache_key = None
+        if self.cache is not None:
+            with profiler.phase("cache"):
+                cache_key = self.cache.key(self.lexer.code, f"O{self.opt_level}")
+                try:
+                    entry = self.cache.get(cache_key, ASTArena() if self.arena else None)
+                except Exception as e:
+                    # Um cache com problema nunca impede a compilação
+                    self.log(f"Cache de compilação ignorado: {e}", Colors.YELLOW)
+                    entry = None
+            if entry is not None:
+                result.ast, result.tac = entry
+                result.cache_hit = True
+                self.log("Resultado obtido do cache de compilação!")
+                if "ast" in self.dumps:
+                    self.dump_ast(result.ast)
+                if "tac" in self.dumps:
+                    for instr in result.tac.render():
+                        print(instr)
+                return
+
+        # Etapa 1: Analisador Léxico
+        if self.streaming:
+            self.parser = Parser(self.lexer.iter_tokens(), arena=ASTArena() if self.arena else None)
+        else:
+            try:
+                self.log("Iniciando Analisador Léxico!")
+                with profiler.phase("lexer") as counters:
+                    self.lexer.tokenize()
+                    counters["tokens"] = len(self.lexer.tokens)
+                    counters["identifiers"] = len(self.lexer.symbol_table.symbols)
+                result.tokens = self.lexer.tokens
+                if "tokens" in self.dumps:
+                    self.lexer.print_tokens()
+                if "symbols" in self.dumps:
+                    self.lexer.print_symbol_table()
+                self.parser = Parser(self.lexer.tokens, arena=ASTArena() if self.arena else None)
+                self.log("Analisador Léxico bem sucedido!")
+            except SyntaxError as e:
+                self.report("lexer", "Erro no léxico", e)
+                return
+            except Exception as e:
+                self.report("lexer", "Erro", e)
+                return
 
         # Etapa 2: Analisador Sintático
         try:
-            print(f"{Colors.GREEN}Iniciando Analisador Sintático!{Colors.RESET}")
-            ast_root = self.parser.parse()  # Arvore retornada pelo parser
-            print(ast_root)
-            print(f"{Colors.GREEN}Analisador Sintático bem sucedido!{Colors.RESET}")
+            self.log("Iniciando Analisador Sintático!")
+            with profiler.phase("parser") as counters:
+                ast_root = self.parser.parse()  # Arvore retornada pelo parser
+            if self.parser.arena is not None:
+                counters["ast_nodes"] = self.parser.arena.count_nodes()
+            else:
+                counters["ast_nodes"] = count_nodes(ast_root)
+            if self.streaming:
+                # Sem a etapa léxica separada, os tokens são contados aqui
+                counters["tokens"] = self.parser.current_token_index
+            result.ast = ast_root
+            if "ast" in self.dumps:
+                self.dump_ast(ast_root)
+            self.log("Analisador Sintático bem sucedido!")
         except SyntaxError as e:
-            print(f"{Colors.RED}Erro de sintaxe: {e}{Colors.RESET}")
-            return 
+            self.report("parser", "Erro de sintaxe", e)
+            return
+        except LexicalError as e:
+            # Com streaming, os erros do léxico só aparecem durante o parse
+            self.report("lexer", "Erro no léxico", e)
+            return
         except Exception as e:
-            print(f"{Colors.RED}Erro: {e}{Colors.RESET}")
+            self.report("parser", "Erro", e)
             return
 
         # Etapa 3: Analisador Semântico
         try:
-            print(f"{Colors.GREEN}Iniciando Analisador Semântico!{Colors.RESET}")
-            self.semantic_analyzer = SemanticAnalyzer(ast_root, {})
-            self.semantic_analyzer.analyze()
-
-            if self.semantic_analyzer.errors:
-                for error in self.semantic_analyzer.errors:
-                    print(f"{Colors.RED}Erro semântico: {error}{Colors.RESET}")
-                return  
-            print(f"{Colors.GREEN}Analisador Semântico bem sucedido!{Colors.RESET}")
+            self.log("Iniciando Analisador Semântico!")
+            with profiler.phase("semantic") as counters:
+                if self.jobs and self.jobs > 1 and ParallelBackend.supports(ast_root):
+                    # A passada paralela também gera o código dos corpos
+                    # das funções, que a etapa seguinte só junta
+                    self.backend = ParallelBackend(ast_root, self.jobs)
+                    errors = self.backend.analyze()
+                    symbol_table = self.backend.symbol_table
+                    counters["parallel_functions"] = self.backend.functions
+                else:
+                    self.semantic_analyzer = SemanticAnalyzer(ast_root, {}, verbose=not self.quiet)
+                    self.semantic_analyzer.analyze()
+                    errors = self.semantic_analyzer.errors
+                    symbol_table = self.semantic_analyzer.symbol_table
+            counters["symbols"] = len(symbol_table)
+            counters["errors"] = len(errors)
+            result.symbol_table = symbol_table
+
+            if errors:
+                for error in errors:
+                    self.report("semantic", "Erro semântico", error)
+                return
+            self.log("Analisador Semântico bem sucedido!")
         except Exception as e:
-            print(f"{Colors.RED}Erro no analisador semântico: {e}{Colors.RESET}")
+            self.report("semantic", "Erro no analisador semântico", e)
             return
 
         # Etapa 4: Geração de Código de Três Endereços
         try:
-            print(f"{Colors.GREEN}Iniciando Geração de Código de Três Endereços!{Colors.RESET}")
-            codegen = ThreeAddressCodeGenerator(ast_root)
-            instructions = codegen.generate()
+            self.log("Iniciando Geração de Código de Três Endereços!")
+            with profiler.phase("codegen") as counters:
+                codegen = self.backend or ThreeAddressCodeGenerator(ast_root)
+                instructions = codegen.generate()
+            counters["instructions"] = len(instructions)
+            counters["temporaries"] = codegen.temps_created
+            result.tac = instructions
 
+            if self.opt_level >= 1:
+                with profiler.phase("optimize") as counters:
+                    stats = optimize(instructions, self.opt_level)
+                    counters.update(stats)
+                self.log(f"Otimização (-O{self.opt_level}): {stats['instructions_before']} -> "
+                         f"{stats['instructions_after']} instruções ({stats['eliminated']} eliminadas)", Colors.YELLOW)
+                if stats["dead_routine_names"]:
+                    self.log(f"Rotinas nunca chamadas removidas: {', '.join(stats['dead_routine_names'])}", Colors.YELLOW)
 
-            for instr in instructions:
-                print(instr)
-            
+            if "tac" in self.dumps:
+                for instr in instructions.render():
+                    print(instr)
 
-            print(f"{Colors.GREEN}Código de Três Endereços Gerado com Sucesso!{Colors.RESET}")
+            self.log("Código de Três Endereços Gerado com Sucesso!")
 
         except Exception as e:
-            print(f"{Colors.RED}Erro na geração de código: {e}{Colors.RESET}")
+            self.report("codegen", "Erro na geração de código", e)
             return
+
+        if cache_key is not None:
+            try:
+                self.cache.put(cache_key, ast_root, instructions)
+            except Exception as e:
+                self.log(f"Resultado não guardado no cache de compilação: {e}", Colors.YELLOW)
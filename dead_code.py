@@ -0,0 +1,78 @@
+from cfg import MAIN, build_cfgs
+from tac_ir import Op
+
+# Remoção de código morto: blocos básicos que não são alcançáveis a partir
+# da entrada da sua rotina (código depois de `return` ou `break`, o lado de
+# um `if` cuja condição a dobra de constantes resolveu) e funções e
+# procedimentos que nunca são chamados a partir do nível superior, direta ou
+# indiretamente. Depois disso, `goto`s para o rótulo logo em seguida (que
+# sobram quando um dos lados de um `if` some) também saem.
+
+def called_routines(graphs, instructions):
+    # Rotinas alcançáveis a partir do nível superior pelas chamadas que estão
+    # em blocos alcançáveis
+    called = {MAIN}
+    pending = [MAIN]
+    while pending:
+        graph = graphs[pending.pop()]
+        for block in graph.reverse_postorder():
+            for index in range(block.start, block.end):
+                op, _, name, _ = instructions[index]
+                if (op == Op.CALL or op == Op.CALL_PROC) and name in graphs and name not in called:
+                    called.add(name)
+                    pending.append(name)
+    return called
+
+def eliminate_dead_code(program):
+    # Altera `program` e devolve quantas instruções inalcançáveis saíram das
+    # rotinas que ficaram, quantas rotinas foram removidas e os seus nomes
+    instructions = program.instructions
+    graphs = build_cfgs(program)
+    called = called_routines(graphs, instructions)
+    dead = set()  # índices das instruções removidas
+    unreachable = 0
+    removed = []
+    for name, graph in graphs.items():
+        if name in called:
+            reachable = graph.reachable()
+            for block in graph.blocks:
+                if block.index not in reachable:
+                    dead.update(range(block.start, block.end))
+                    unreachable += block.end - block.start
+        else:
+            removed.append(name)
+            for block in graph.blocks:
+                dead.update(range(block.start, block.end))
+    if removed:
+        # As instruções de início e fim das rotinas removidas
+        names = set(removed)
+        for index, (op, _, left, _) in enumerate(instructions):
+            if (op == Op.FUNC_BEGIN or op == Op.FUNC_END or op == Op.PROC_BEGIN or op == Op.PROC_END) and left in names:
+                dead.add(index)
+    if dead:
+        instructions = [ins for index, ins in enumerate(instructions) if index not in dead]
+    jumps = remove_jumps_to_next(instructions)
+    program.instructions = instructions
+    return {"unreachable": unreachable + jumps, "dead_routines": len(removed), "dead_routine_names": tuple(removed)}
+
+def remove_jumps_to_next(instructions):
+    # Remove (na própria lista) `goto L` seguido apenas de rótulos até `L:`;
+    # devolve quantos saíram
+    kept = 0
+    removed = 0
+    count = len(instructions)
+    for index in range(count):
+        ins = instructions[index]
+        if ins[0] == Op.GOTO:
+            following = index + 1
+            while following < count and instructions[following][0] == Op.LABEL:
+                if instructions[following][2] == ins[2]:
+                    break
+                following += 1
+            if following < count and instructions[following][0] == Op.LABEL:
+                removed += 1
+                continue
+        instructions[kept] = ins
+        kept += 1
+    del instructions[kept:]
+    return removed
@@ -0,0 +1,261 @@
+import hashlib
+import re
+from functools import partial
+from ast_node import ASTNode
+from compiler import CompileResult, Diagnostic
+from instrumentation import PhaseProfiler
+from lexer import Lexer, LexicalError
+from new_semantic import SemanticAnalyzer
+from parser import Parser
+from tac_ir import TacProgram
+from three_address_code_generator import ThreeAddressCodeGenerator
+
+# Só o que importa para achar o fim de cada declaração/comando de nível
+# superior: strings (que podem conter `;` e chaves), chaves e ponto e vírgula
+STRUCTURE = re.compile(r'"(?:\\.|[^"\\])*"|[{};]')
+ELSE_AHEAD = re.compile(r'\s*else\b')
+# Os espaços que o léxico ignora
+WHITESPACE = " \t\n"
+
+def split_units(code):
+    # Divide o código nos trechos de cada declaração/comando de nível
+    # superior, sem rodar o léxico: um trecho termina num `;` fora de chaves
+    # ou na `}` que fecha o nível superior (a não ser que venha um `else`).
+    # Devolve (início, fim) de cada trecho.
+    units = []
+    depth = 0
+    start = 0
+    for match in STRUCTURE.finditer(code):
+        char = match.group()
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth <= 0 and not ELSE_AHEAD.match(code, match.end()):
+                depth = 0
+                units.append((start, match.end()))
+                start = match.end()
+        elif char == ";" and depth == 0:
+            units.append((start, match.end()))
+            start = match.end()
+    if code[start:].strip():
+        units.append((start, len(code)))
+    return units
+
+# Slots do ASTNode onde o UnitNode guarda a posição relativa ao trecho
+LINE_SLOT = ASTNode.line
+COLUMN_SLOT = ASTNode.column
+
+class UnitPosition:
+    # Linha e coluna onde começa o texto de um trecho no código atual
+    __slots__ = ('line', 'column')
+
+    def __init__(self, line, column):
+        self.line = line
+        self.column = column
+
+class UnitNode(ASTNode):
+    # Nó de um trecho: a posição é guardada relativa ao início do trecho
+    # (linha 0 é a primeira linha dele, a única em que a coluna também é
+    # relativa) e a posição atual do trecho só é somada quando alguém lê a
+    # linha ou a coluna. Um trecho reaproveitado em outro lugar do código
+    # só troca o UnitPosition, sem copiar nem percorrer os nós
+    __slots__ = ('position',)
+
+    def __init__(self, position, node_type, value=None, children=None, line=None, column=None):
+        self.position = position
+        super().__init__(node_type, value, children, line, column)
+
+    @property
+    def line(self):
+        line = LINE_SLOT.__get__(self)
+        return None if line is None else line + self.position.line
+
+    @line.setter
+    def line(self, line):
+        LINE_SLOT.__set__(self, None if line is None else line - self.position.line)
+
+    @property
+    def column(self):
+        column = COLUMN_SLOT.__get__(self)
+        if column is None or LINE_SLOT.__get__(self) != 0:
+            return column
+        return column + self.position.column
+
+    @column.setter
+    def column(self, column):
+        # Depende da linha, que o ASTNode (e o pickle) grava antes da coluna
+        if column is not None and LINE_SLOT.__get__(self) == 0:
+            column -= self.position.column
+        COLUMN_SLOT.__set__(self, column)
+
+class RecordingTable(dict):
+    # Tabela de símbolos global que anota os nomes inseridos, para saber o
+    # que cada trecho acrescentou sem percorrer a tabela inteira
+    def __init__(self):
+        super().__init__()
+        self.added = []
+
+    def __setitem__(self, name, value):
+        if name not in self:
+            self.added.append(name)
+        super().__setitem__(name, value)
+
+def symbol_signature(name, value):
+    # Assinatura de uma entrada da tabela global: tipo da variável ou
+    # tipo e parâmetros da função/procedimento
+    if isinstance(value, dict):
+        return f"{name}:{value['type']}({','.join(f'{tipo} {nome}' for tipo, nome in value['params'])})"
+    return f"{name}:{getattr(value, 'value', value)}"
+
+class IncrementalCompiler:
+    # Recompila um programa reaproveitando o trabalho de compilações
+    # anteriores. O código é dividido nos trechos de nível superior
+    # (declarações de funções/procedimentos/variáveis e comandos globais) e:
+    #   - só os trechos com texto novo passam pelo léxico e pelo parser;
+    #   - a análise semântica de um trecho é reaproveitada se o texto e as
+    #     assinaturas globais declaradas antes dele (variáveis, funções e
+    #     procedimentos) não mudaram. Editar o corpo de uma função não muda
+    #     a assinatura dela, então os trechos seguintes continuam no cache;
+    #   - o código de três endereços é reaproveitado se o texto e os números
+    #     do primeiro temporário e do primeiro rótulo do trecho não mudaram.
+    #     Quando um trecho anterior passa a usar mais ou menos temporários ou
+    #     rótulos, os seguintes são
+    #     gerados de novo a partir da AST já em cache (sem léxico, parser ou
+    #     análise semântica), para manter a mesma numeração de uma
+    #     compilação completa.
+    # O cache guarda apenas os trechos da última compilação. Os nós de um
+    # trecho reaproveitado em outra posição passam a mostrar a posição nova,
+    # também na AST de resultados anteriores que os compartilham.
+    def __init__(self):
+        self.parsed = {}
+        self.analyzed = {}
+        self.generated = {}
+
+    def compile(self, code):
+        result = CompileResult()
+        profiler = PhaseProfiler()
+        parsed, analyzed, generated = {}, {}, {}
+        try:
+            self.run_phases(code, result, profiler, parsed, analyzed, generated)
+        finally:
+            if result.diagnostics:
+                # Compilação interrompida: mantém o cache antigo também
+                self.parsed.update(parsed)
+                self.analyzed.update(analyzed)
+                self.generated.update(generated)
+            else:
+                # Entradas não usadas nesta compilação são descartadas
+                self.parsed, self.analyzed, self.generated = parsed, analyzed, generated
+            result.timings = profiler.timings()
+            result.profile = profiler.as_dict()
+        return result
+
+    def run_phases(self, code, result, profiler, parsed, analyzed, generated):
+        with profiler.phase("split") as counters:
+            spans = split_units(code)
+            counters["units"] = len(spans)
+
+        # Léxico e parser, só para os trechos novos
+        units = []
+        with profiler.phase("parser") as counters:
+            reparsed = 0
+            line = 1
+            position = 0
+            for start, end in spans:
+                text = code[start:end]
+                key = text.strip(WHITESPACE)
+                # Posição do início do texto do trecho (sem os espaços da
+                # frente), que é a referência das posições dos nós em cache
+                start += len(text) - len(text.lstrip(WHITESPACE))
+                line += code.count("\n", position, start)
+                position = start
+                column = start - code.rfind("\n", 0, start) - 1
+                # Cada ocorrência do mesmo texto no programa tem seus próprios
+                # nós (e posição); a n-ésima reaproveita a n-ésima em cache
+                occurrences = parsed.setdefault(key, [])
+                cached = self.parsed.get(key, ())
+                if len(occurrences) < len(cached):
+                    nodes, origin = cached[len(occurrences)]
+                    origin.line, origin.column = line, column
+                else:
+                    reparsed += 1
+                    origin = UnitPosition(line, column)
+                    try:
+                        lexer = Lexer(key, first_line=line, first_column=column)
+                        parser = Parser(lexer.iter_tokens(), node_factory=partial(UnitNode, origin))
+                        nodes = parser.parse().children
+                    except SyntaxError as e:
+                        result.diagnostics.append(Diagnostic("parser", str(e)))
+                        return
+                    except LexicalError as e:
+                        result.diagnostics.append(Diagnostic("lexer", str(e)))
+                        return
+                occurrences.append((nodes, origin))
+                units.append((key, nodes))
+            counters["reparsed_units"] = reparsed
+        # A raiz tem a posição do primeiro token, como no Parser (que usa o
+        # EOF, na posição 0:0, num programa vazio)
+        children = [node for _, nodes in units for node in nodes]
+        first = children[0] if children else None
+        result.ast = ASTNode("Programa", children=children,
+                             line=first.line if first else 0, column=first.column if first else 0)
+
+        # Análise semântica, trecho a trecho, sobre a tabela global
+        symbol_table = RecordingTable()
+        errors = []
+        with profiler.phase("semantic") as counters:
+            reanalyzed = 0
+            environment = hashlib.blake2b(digest_size=16)
+            for key, nodes in units:
+                cache_key = (key, environment.digest())
+                cached = analyzed.get(cache_key) or self.analyzed.get(cache_key)
+                if cached is None:
+                    reanalyzed += 1
+                    analyzer = SemanticAnalyzer(None, symbol_table, verbose=False)
+                    symbol_table.added = []
+                    try:
+                        for node in nodes:
+                            analyzer.visit(node)
+                    except Exception as e:
+                        result.diagnostics.append(Diagnostic("semantic", str(e)))
+                        return
+                    cached = (analyzer.errors, [(name, symbol_table[name]) for name in symbol_table.added])
+                else:
+                    for name, value in cached[1]:
+                        dict.__setitem__(symbol_table, name, value)
+                analyzed[cache_key] = cached
+                errors.extend(cached[0])
+                for name, value in cached[1]:
+                    environment.update(symbol_signature(name, value).encode())
+                    environment.update(b"\0")
+            counters["reanalyzed_units"] = reanalyzed
+        result.symbol_table = dict(symbol_table)
+        if errors:
+            result.diagnostics.extend(Diagnostic("semantic", error) for error in errors)
+            return
+
+        # Código de três endereços, com a mesma numeração da compilação completa
+        program = TacProgram()
+        with profiler.phase("codegen") as counters:
+            regenerated = 0
+            temp_count = label_count = 0
+            for key, nodes in units:
+                cache_key = (key, temp_count, label_count)
+                cached = generated.get(cache_key) or self.generated.get(cache_key)
+                if cached is None:
+                    regenerated += 1
+                    codegen = ThreeAddressCodeGenerator(None, temp_count=temp_count, label_count=label_count)
+                    try:
+                        for node in nodes:
+                            codegen.traverse(node)
+                    except Exception as e:
+                        result.diagnostics.append(Diagnostic("codegen", str(e)))
+                        return
+                    cached = (codegen.program, codegen.temp_count, codegen.label_count)
+                generated[cache_key] = cached
+                program.extend(cached[0])
+                temp_count, label_count = cached[1], cached[2]
+            counters["regenerated_units"] = regenerated
+            counters["instructions"] = len(program)
+        result.tac = program
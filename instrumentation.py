@@ -0,0 +1,89 @@
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+class PhaseProfiler:
+    # Mede cada etapa do compilador: tempo de parede, tempo de CPU, pico de
+    # alocações (tracemalloc, só com trace_memory=True porque deixa tudo
+    # bem mais lento) e contadores livres (tokens, nós da AST, ...).
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.phases = {}
+        self.peak_rss_kb = None
+
+    @contextmanager
+    def phase(self, name):
+        stats = self.phases.setdefault(name, {"wall_time": 0.0, "cpu_time": 0.0, "counters": {}})
+        started_tracing = False
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+            memory_before = tracemalloc.get_traced_memory()[0]
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield stats["counters"]
+        finally:
+            stats["wall_time"] += time.perf_counter() - wall_start
+            stats["cpu_time"] += time.process_time() - cpu_start
+            if self.trace_memory:
+                peak = tracemalloc.get_traced_memory()[1] - memory_before
+                stats["peak_alloc_bytes"] = max(stats.get("peak_alloc_bytes", 0), peak)
+                if started_tracing:
+                    tracemalloc.stop()
+
+    def timings(self):
+        return {name: stats["wall_time"] for name, stats in self.phases.items()}
+
+    def as_dict(self):
+        return {
+            "phases": {name: dict(stats, counters=dict(stats["counters"])) for name, stats in self.phases.items()},
+            "total_wall_time": sum(stats["wall_time"] for stats in self.phases.values()),
+            "total_cpu_time": sum(stats["cpu_time"] for stats in self.phases.values()),
+            "peak_rss_kb": self.peak_rss_kb,
+        }
+
+    def to_json(self, indent=2):
+        return json.dumps(self.as_dict(), indent=indent)
+
+def count_nodes(node):
+    # Conta os nós da AST sem recursão (filhos None, como o else ausente,
+    # não contam)
+    total = 0
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if current is None:
+            continue
+        total += 1
+        stack.extend(current.children)
+    return total
+
+def reset_peak_rss():
+    # No Linux, escrever "5" em clear_refs zera o pico de RSS (VmHWM), o que
+    # permite medir o pico de cada compilação separadamente
+    try:
+        with open("/proc/self/clear_refs", "w") as file:
+            file.write("5")
+    except OSError:
+        pass
+
+def peak_rss_kb():
+    try:
+        with open("/proc/self/status") as file:
+            for line in file:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # No macOS ru_maxrss vem em bytes; no Linux já vem em KB
+    return peak // 1024 if os.uname().sysname == "Darwin" else peak
@@ -1,16 +1,124 @@
+import mmap
 import re
-from typing import Any, Dict, List
+from array import array
+from typing import Any, Dict, Union
+
+class TokenKind:
+    # Tipos de token que chegam ao parser, como inteiros pequenos: o parser
+    # compara inteiros em vez de strings e o TokenBuffer guarda 1 byte por tipo.
+    # É uma classe simples e não um IntEnum porque o acesso a membros de Enum
+    # é várias vezes mais lento, e esses atributos são lidos a cada token.
+    EQ = 0
+    LE = 1
+    GE = 2
+    NE = 3
+    ASSIGN = 4
+    LT = 5
+    GT = 6
+    SEMICOLON = 7
+    COMMA = 8
+    LPAREN = 9
+    RPAREN = 10
+    LBRACE = 11
+    RBRACE = 12
+    PLUS = 13
+    MINUS = 14
+    TIMES = 15
+    DIVIDE = 16
+    AND = 17
+    OR = 18
+    NOT = 19
+    IF = 20
+    ELSE = 21
+    WHILE = 22
+    RETURN = 23
+    PRINT = 24
+    VOID = 25
+    INT = 26
+    BOOL = 27
+    TRUE = 28
+    FALSE = 29
+    BREAK = 30
+    CONTINUE = 31
+    PRC = 32
+    FUN = 33
+    STRING = 34
+    NUMBER = 35
+    ID = 36
+    EOF = 37
+
+# Nome de cada tipo, indexado pelo valor inteiro do TokenKind
+TOKEN_CODES = {name: kind for name, kind in vars(TokenKind).items() if name.isupper()}
+TOKEN_TYPES = tuple(sorted(TOKEN_CODES, key=TOKEN_CODES.get))
+KEYWORDS = {
+    'int': TokenKind.INT, 'bool': TokenKind.BOOL, 'void': TokenKind.VOID,
+    'true': TokenKind.TRUE, 'false': TokenKind.FALSE, 'if': TokenKind.IF,
+    'else': TokenKind.ELSE, 'while': TokenKind.WHILE, 'return': TokenKind.RETURN,
+    'print': TokenKind.PRINT, 'prc': TokenKind.PRC, 'fun': TokenKind.FUN,
+}
 
 class Token:
-    def __init__(self, token_type: str, value: str, line: int, column: int):
-        self.token_type = token_type
+    __slots__ = ('kind', 'value', 'line', 'column')
+
+    def __init__(self, kind: int, value: str, line: int, column: int):
+        self.kind = kind
         self.value = value
         self.line = line
         self.column = column
 
+    @property
+    def token_type(self):
+        return TOKEN_TYPES[self.kind]
+
     def __repr__(self):
         return f"Token({self.token_type}, '{self.value}', line={self.line}, column={self.column})"
     
+class LexicalError(RuntimeError):
+    pass
+
+def binary_char(code, start):
+    # Caractere UTF-8 (de 1 a 4 bytes) que começa em `start` num código em bytes
+    return code[start:start + 4].decode('utf-8', errors='replace')[0]
+
+class TokenBuffer:
+    # Guarda os tokens em arrays paralelos (struct-of-arrays) em vez de um
+    # objeto Token por lexema: o tipo vira um código de 1 byte e o valor é
+    # guardado como offsets de início/fim no código fonte. Objetos Token só
+    # são criados quando alguém lê o buffer (ex.: o Parser, via iteração).
+    def __init__(self, code):
+        self.code = code
+        self.binary = not isinstance(code, str)
+        self.types = array('B')
+        self.lines = array('I')
+        self.columns = array('I')
+        self.starts = array('I')
+        self.ends = array('I')
+
+    def __len__(self):
+        return len(self.types)
+
+    def kind(self, index):
+        return self.types[index]
+
+    def token_type(self, index):
+        return TOKEN_TYPES[self.types[index]]
+
+    def value(self, index):
+        val = self.code[self.starts[index]:self.ends[index]]
+        return val.decode('utf-8') if self.binary else val
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.types)
+        return Token(self.types[index], self.value(index), self.lines[index], self.columns[index])
+
+    def __iter__(self):
+        for index in range(len(self.types)):
+            yield self[index]
+
+    def __repr__(self):
+        return f"TokenBuffer({len(self)} tokens)"
+
 class SymbolTable:
     def __init__(self):
         self.symbols: Dict[str, Dict[str, Any]] = {}
@@ -35,10 +143,18 @@ class SymbolTable:
         return f"SymbolTable({self.symbols})"
 
 class Lexer:
-    def __init__(self, code: str):
+    def __init__(self, code: Union[str, bytes, mmap.mmap], first_line: int = 1, first_column: int = 0):
+        # `code` pode ser uma str ou um buffer de bytes (ex.: arquivo mapeado
+        # com mmap); no segundo caso o regex roda direto sobre os bytes e só
+        # o texto de cada token é decodificado
         self.code = code
-        self.current_line = 1
-        self.tokens: List[Token] = []
+        self.binary = not isinstance(code, str)
+        # Linha e coluna do primeiro caractere de `code`, para quando o
+        # código é um trecho de um arquivo maior (ex.: compilação incremental)
+        self.first_line = first_line
+        self.first_column = first_column
+        self.current_line = first_line
+        self.tokens = TokenBuffer(code)
         self.symbol_table = SymbolTable()
         self.token_specification = [
             ('EQ', r'=='),                          # Igualdade
@@ -85,33 +201,102 @@ class Lexer:
 
         #tem que ver se dá pra melhorar a diferença entre chamada de função e procedimento
         self.tok_regex = '|'.join('(?P<%s>%s)' % pair for pair in self.token_specification)
-        self.get_token = re.compile(self.tok_regex).match
+        pattern = self.tok_regex.encode() if self.binary else self.tok_regex
+        self.get_token = re.compile(pattern).match
 
     def tokenize(self):
-        line_start = 0
+        # Preenche self.tokens (um TokenBuffer) sem criar objetos Token
+        self.current_line = self.first_line
+        line_start = -self.first_column
+        # Com bytes, as colunas contam caracteres: `extra` são os bytes a mais
+        # dos caracteres não ASCII da linha, que só aparecem em strings
+        extra = 0
+        code = self.code
+        binary = self.binary
+        codes = TOKEN_CODES
+        keywords = KEYWORDS
+        buffer = self.tokens
+        add_type = buffer.types.append
+        add_line = buffer.lines.append
+        add_column = buffer.columns.append
+        add_start = buffer.starts.append
+        add_end = buffer.ends.append
+        match = self.get_token(code)
+        while match is not None:
+            typ = match.lastgroup
+            start = match.start()
+            end = match.end()
+            if typ == 'NEWLINE':
+                line_start = end
+                extra = 0
+                self.current_line += 1
+            elif typ == 'SKIP':
+                pass
+            elif typ == 'MISMATCH':
+                val = binary_char(code, start) if binary else match.group(typ)
+                raise LexicalError(f'{val!r} inesperado na linha {self.current_line}')
+            else:
+                column = start - line_start - extra
+                if typ == 'ID':
+                    val = match.group(typ)
+                    if binary:
+                        val = val.decode('ascii')
+                    kind = keywords.get(val)
+                    if kind is None:
+                        kind = TokenKind.ID
+                        self.symbol_table.add_symbol(val, self.current_line, column)
+                else:
+                    kind = codes[typ]
+                    if binary and typ == 'STRING':
+                        val = code[start:end]
+                        if not val.isascii():
+                            extra += len(val) - len(val.decode('utf-8'))
+                add_type(kind)
+                add_line(self.current_line)
+                add_column(column)
+                add_start(start)
+                add_end(end)
+            match = self.get_token(code, end)
+
+    def iter_tokens(self):
+        # Gera os tokens sob demanda, sem montar a lista inteira em memória
+        self.current_line = self.first_line
+        line_start = -self.first_column
+        extra = 0  # como no tokenize
+        binary = self.binary
+        codes = TOKEN_CODES
+        keywords = KEYWORDS
         match = self.get_token(self.code)
         while match is not None:
             typ = match.lastgroup
             start = match.start()
             end = match.end()
-            column = start - line_start
+            column = start - line_start - extra
             if typ == 'NEWLINE':
                 line_start = end
+                extra = 0
                 self.current_line += 1
             elif typ == 'SKIP':
                 pass
             elif typ == 'ID':
                 val = match.group(typ)
-                if val in {'int', 'bool', 'void', 'true', 'false', 'if', 'else', 'while', 'return', 'print', 'prc', 'fun'}:
-                    typ = val.upper()
-                else:
+                if binary:
+                    val = val.decode('ascii')
+                kind = keywords.get(val)
+                if kind is None:
+                    kind = TokenKind.ID
                     self.symbol_table.add_symbol(val, self.current_line, column)
-                self.tokens.append(Token(typ, val, self.current_line, column))
+                yield Token(kind, val, self.current_line, column)
             elif typ != 'MISMATCH':
                 val = match.group(typ)
-                self.tokens.append(Token(typ, val, self.current_line, column))
+                if binary:
+                    size = len(val)
+                    val = val.decode('utf-8')
+                    extra += size - len(val)
+                yield Token(codes[typ], val, self.current_line, column)
             else:
-                raise RuntimeError(f'{match.group(typ)!r} inesperado na linha {self.current_line}')
+                val = binary_char(self.code, start) if binary else match.group(typ)
+                raise LexicalError(f'{val!r} inesperado na linha {self.current_line}')
             match = self.get_token(self.code, end)
 
     def print_tokens(self):
@@ -1,4 +1,13 @@
+import argparse
+import glob
+import json
+import sys
+from contextlib import nullcontext
+from batch import compile_batch, expand_paths, summarize
 from compiler import Compiler
+from compile_cache import CompilationCache
+from source import open_source
+from tac_vm import TacRuntimeError, TacVM
 
 class Colors:
     RED = '\033[91m'
@@ -6,18 +15,102 @@ class Colors:
     YELLOW = '\033[93m'
     RESET = '\033[0m'
 
-def main(file):
+def main(file, profile=False, quiet=False, cache=None, jobs=None, opt_level=0, run=False, arena=False, ast_format="text", ast_depth=None,
+         ast_output=None, streaming=False):
     try:
-        with open(file, "r") as file:
-            codigo = file.read()
-            print(f"Código lido do arquivo:\n{codigo}")
+        # O arquivo é mapeado em memória e lido direto pelo Lexer; com
+        # ast_output, a AST é escrita nó a nó nesse arquivo
+        with open_source(file) as codigo, \
+                (open(ast_output, "w", encoding="utf-8") if ast_output else nullcontext()) as ast_file:
+            if not quiet:
+                print("Código lido do arquivo:")
+                sys.stdout.flush()
+                sys.stdout.buffer.write(codigo)
+                sys.stdout.buffer.write(b"\n")
+                sys.stdout.buffer.flush()
 
-        compiler = Compiler(codigo)
-        compiler.compile()
+            compiler = Compiler(codigo, streaming=streaming, quiet=quiet, profile=profile, cache=cache, jobs=jobs, opt_level=opt_level,
+                                arena=arena, ast_format=ast_format, ast_depth=ast_depth, ast_output=ast_file)
+            result = compiler.compile()
+            if quiet:
+                for diagnostic in result.diagnostics:
+                    print(f"{Colors.RED}{diagnostic}{Colors.RESET}")
+            if profile:
+                print(json.dumps(result.profile, indent=2))
+            if cache is not None and not quiet:
+                print(f"{Colors.YELLOW}Cache de compilação: {cache.stats()}{Colors.RESET}")
+            if run and result.success:
+                execute(result.tac, profile)
     except FileNotFoundError:
         print(f"{Colors.RED}Erro: O arquivo {file} não foi encontrado.{Colors.RESET}")
     except Exception as e:
         print(f"{Colors.RED}Erro: {e}{Colors.RESET}")
 
+def execute(program, profile=False):
+    # Executa o código gerado na máquina virtual, imprimindo a saída do programa
+    vm = TacVM(program, write=print)
+    try:
+        vm.run()
+    except TacRuntimeError as e:
+        print(f"{Colors.RED}{e}{Colors.RESET}")
+    if profile:
+        print(json.dumps({"instructions": vm.steps, "routines": vm.profile()}, indent=2))
+
+def main_batch(patterns, jobs=None, ordered=False, cache_dir=None, opt_level=0, cache_bytes=None, arena=False, streaming=False):
+    # Compila vários arquivos em paralelo, mostrando cada resultado assim
+    # que fica pronto, e um resumo no final
+    paths = expand_paths(patterns)
+    if not paths:
+        print(f"{Colors.RED}Erro: nenhum arquivo encontrado.{Colors.RESET}")
+        return False
+    results = []
+    for result in compile_batch(paths, jobs=jobs, ordered=ordered, cache_dir=cache_dir, opt_level=opt_level,
+                                cache_bytes=cache_bytes, arena=arena, streaming=streaming):
+        results.append(result)
+        if result.success:
+            print(f"{Colors.GREEN}OK{Colors.RESET}   {result.path} ({result.instructions} instruções, {result.elapsed * 1000:.1f} ms)")
+        else:
+            print(f"{Colors.RED}ERRO{Colors.RESET} {result.path}")
+            for diagnostic in result.diagnostics:
+                print(f"     {Colors.RED}{diagnostic}{Colors.RESET}")
+    summary = summarize(results)
+    color = Colors.GREEN if not summary["failed"] else Colors.RED
+    print(f"{color}{summary['files']} arquivos: {summary['succeeded']} compilados, {summary['failed']} com erro{Colors.RESET}")
+    return not summary["failed"]
+
 if __name__ == "__main__":
-    main("tests/codigo.txt")
+    arg_parser = argparse.ArgumentParser(description="Compila arquivos da linguagem.")
+    arg_parser.add_argument("arquivos", nargs="*", default=["tests/codigo.txt"], help="arquivos ou globs; mais de um compila em lote")
+    arg_parser.add_argument("--profile", action="store_true", help="imprime tempos, memória e contadores de cada etapa em JSON")
+    arg_parser.add_argument("--quiet", action="store_true", help="não imprime tokens, AST nem código gerado")
+    arg_parser.add_argument("-O", dest="opt_level", type=int, choices=(0, 1, 2), default=0, help="nível de otimização: -O0 (nenhuma), -O1 (constantes e simplificações) ou -O2 (também subexpressões comuns, cópias e temporários mortos)")
+    arg_parser.add_argument("--run", action="store_true", help="executa o código gerado na máquina virtual (tac_vm.py)")
+    arg_parser.add_argument("--stream", action="store_true", help="o parser consome os tokens à medida que o léxico os produz, sem guardar a lista (a lista de tokens e a tabela de símbolos não são impressas)")
+    arg_parser.add_argument("--arena", action="store_true", help="guarda a AST numa arena de arrays (ast_arena.py) em vez de um objeto por nó")
+    arg_parser.add_argument("--ast-format", choices=("text", "json", "sexp"), help="formato da AST impressa (padrão: text)")
+    arg_parser.add_argument("--ast-depth", type=int, help="profundidade máxima da AST impressa")
+    arg_parser.add_argument("--ast-output", help="escreve a AST nesse arquivo em vez da saída padrão (também com --quiet)")
+    arg_parser.add_argument("--cache-dir", help="diretório do cache de compilação em disco")
+    arg_parser.add_argument("--cache-size", type=int, default=256, help="tamanho máximo do cache em MB")
+    arg_parser.add_argument("--jobs", "-j", type=int, help="processos usados no modo em lote (padrão: número de núcleos); com um arquivo, analisa e gera as funções em paralelo")
+    arg_parser.add_argument("--ordered", action="store_true", help="no modo em lote, mostra os resultados na ordem dos arquivos")
+    args = arg_parser.parse_args()
+    batch_mode = len(args.arquivos) > 1 or any(glob.has_magic(pattern) for pattern in args.arquivos)
+    ast_options = [option for option, value in (("--ast-format", args.ast_format), ("--ast-depth", args.ast_depth),
+                                                 ("--ast-output", args.ast_output)) if value is not None]
+    # Combinações em que as opções não teriam efeito
+    batch_unsupported = ast_options + [option for option, value in (("--run", args.run), ("--profile", args.profile),
+                                                                    ("--quiet", args.quiet)) if value]
+    if batch_unsupported and batch_mode:
+        arg_parser.error(f"{', '.join(batch_unsupported)} não funciona no modo em lote")
+    if ast_options and args.quiet and args.ast_output is None:
+        arg_parser.error(f"{', '.join(ast_options)} não tem efeito com --quiet (a AST não é impressa); use --ast-output")
+    if args.ast_depth is not None and args.ast_depth < 0:
+        arg_parser.error("--ast-depth deve ser maior ou igual a 0")
+    if batch_mode:
+        sys.exit(0 if main_batch(args.arquivos, args.jobs, args.ordered, args.cache_dir, args.opt_level, args.cache_size * 1024 * 1024,
+                                 args.arena, args.stream) else 1)
+    cache = CompilationCache(args.cache_dir, args.cache_size * 1024 * 1024) if args.cache_dir else None
+    main(args.arquivos[0], profile=args.profile, quiet=args.quiet, cache=cache, jobs=args.jobs, opt_level=args.opt_level, run=args.run, arena=args.arena,
+         ast_format=args.ast_format or "text", ast_depth=args.ast_depth, ast_output=args.ast_output,
+         streaming=args.stream)
@@ -1,17 +1,25 @@
+from types import GeneratorType
+from ast_node import NodeKind
 from lexer import Lexer
 from parser import Parser
 
 class SemanticAnalyzer:
-    def __init__(self, ast_root, symbol_table):
+    def __init__(self, ast_root, symbol_table, verbose=True):
         self.ast_root = ast_root
         self.symbol_table = symbol_table  # Tabela de símbolos global
         self.current_scope = self.symbol_table  # Escopo atual
         self.current_function_type = None  # Tipo da função atual
+        self.loop_depth = 0  # Laços abertos na rotina atual, para o 'break'
         self.errors = []
+        # Com verbose=False nada é impresso; os erros ficam em self.errors
+        self.verbose = verbose
+        self.visitors = {}  # tipo de nó -> método visit_* (ou generic_visit)
 
     def analyze(self):
         self.visit(self.ast_root)
 
+        if not self.verbose:
+            return
         if self.errors:
             print("Erros Semânticos:")
             for error in self.errors:
@@ -19,15 +27,43 @@ class SemanticAnalyzer:
         else:
             print("Análise Semântica concluída sem erros.")
 
+    # Percurso sem recursão: os visit_* que visitam filhos são geradores que
+    # entregam (yield) cada filho e recebem de volta o tipo dele. `run`
+    # mantém a pilha desses geradores, então a profundidade da AST não
+    # esbarra no limite de recursão do Python
     def visit(self, node):
-        print(f"- {node.node_type} com valor: {node.value}")
-        method_name = f'visit_{node.node_type}'
-        visitor = getattr(self, method_name, self.generic_visit)
+        return self.run(self.dispatch(node))
+
+    def dispatch(self, node):
+        if self.verbose:
+            print(f"- {node.node_type} com valor: {node.value}")
+        visitor = self.visitors.get(node.kind)
+        if visitor is None:
+            method_name = f'visit_{node.node_type}'
+            visitor = self.visitors[node.kind] = getattr(self, method_name, self.generic_visit)
         return visitor(node)
 
+    def run(self, result):
+        stack = []
+        push = stack.append
+        dispatch = self.dispatch
+        while True:
+            if type(result) is GeneratorType:
+                push(result)
+                result = None
+            elif not stack:
+                return result
+            try:
+                child = stack[-1].send(result)
+            except StopIteration as stop:
+                stack.pop()
+                result = stop.value
+                continue
+            result = dispatch(child)
+
     def generic_visit(self, node):
         for child in node.children:
-            self.visit(child)
+            yield child
 
     def visit_DeclaracaoVariavel(self, node):
         tipo_variavel = node.value
@@ -38,59 +74,56 @@ class SemanticAnalyzer:
                 self.current_scope[id_node.value] = tipo_variavel
 
     def visit_DeclaracaoFuncao(self, node):
-        tipo_funcao = node.children[0].value
-        nome_funcao = node.value
-        parametros = node.children[1:-1]
-        corpo = node.children[-1]
-
-        if nome_funcao in self.symbol_table:
-            self.errors.append(f"Erro: Função '{nome_funcao}' já declarada.")
-        else:
-            self.symbol_table[nome_funcao] = {
-                'type': tipo_funcao,
-                'params': [(param.children[0].value, param.value) for param in parametros]
-            }
-
-            # Novo escopo para a função
-            self.current_scope = {}
-            for param in parametros:
-                self.current_scope[param.value] = param.children[0].value
-
-            # Atualiza o tipo da função atual
-            self.current_function_type = tipo_funcao
-
-            self.visit(corpo)
-
-            # Volta ao escopo global e reseta o tipo da função atual
-            self.current_scope = self.symbol_table
-            self.current_function_type = None
+        if self.declarar_funcao(node):
+            yield from self.corpo(node)
+
+    visit_DeclaracaoProcedimento = visit_DeclaracaoFuncao
+
+    def assinatura(self, node):
+        # Tipo, parâmetros e corpo de uma função ou procedimento
+        if node.kind == NodeKind.DeclaracaoFuncao:
+            return node.children[0].value, node.children[1:-1], node.children[-1]
+        return 'void', node.children[:-1], node.children[-1]
+
+    def declarar_funcao(self, node):
+        # Registra a assinatura na tabela global; devolve False se o nome já existe
+        tipo, parametros, _ = self.assinatura(node)
+        if node.value in self.symbol_table:
+            if node.kind == NodeKind.DeclaracaoFuncao:
+                self.errors.append(f"Erro: Função '{node.value}' já declarada.")
+            else:
+                self.errors.append(f"Erro: Procedimento '{node.value}' já declarado.")
+            return False
+        self.symbol_table[node.value] = {
+            'type': tipo,
+            'params': [(param.children[0].value, param.value) for param in parametros]
+        }
+        return True
 
-    def visit_DeclaracaoProcedimento(self, node):
-        nome_procedimento = node.value
-        parametros = node.children[:-1]
-        corpo = node.children[-1]
+    def visitar_corpo(self, node):
+        self.run(self.corpo(node))
 
-        if nome_procedimento in self.symbol_table:
-            self.errors.append(f"Erro: Procedimento '{nome_procedimento}' já declarado.")
-        else:
-            self.symbol_table[nome_procedimento] = {
-                'type': 'void',
-                'params': [(param.children[0].value, param.value) for param in parametros]
-            }
+    def corpo(self, node):
+        tipo, parametros, corpo = self.assinatura(node)
 
-            # Novo escopo para o procedimento
-            self.current_scope = {}
-            for param in parametros:
-                self.current_scope[param.value] = param.children[0].value
+        # Novo escopo para a função/procedimento
+        self.current_scope = {}
+        for param in parametros:
+            if param.value in self.current_scope:
+                self.errors.append(f"Erro: Parâmetro '{param.value}' repetido em '{node.value}'.")
+            self.current_scope[param.value] = param.children[0].value
 
-            # Atualiza o tipo do procedimento atual
-            self.current_function_type = 'void'
+        # Atualiza o tipo da função atual; os laços de fora não valem no corpo
+        self.current_function_type = tipo
+        loop_depth = self.loop_depth
+        self.loop_depth = 0
 
-            self.visit(corpo)
+        yield corpo
 
-            # Volta ao escopo global e reseta o tipo do procedimento atual
-            self.current_scope = self.symbol_table
-            self.current_function_type = None
+        # Volta ao escopo global e reseta o tipo da função atual
+        self.current_scope = self.symbol_table
+        self.current_function_type = None
+        self.loop_depth = loop_depth
 
     def visit_ComandoAtribuicao(self, node):
         id_node = node.children[0]
@@ -100,7 +133,7 @@ class SemanticAnalyzer:
             self.errors.append(f"Erro: Variável '{id_node.value}' não declarada.")
         else:
             tipo_variavel = self.current_scope[id_node.value]
-            tipo_expressao = self.visit(expressao_node)
+            tipo_expressao = yield expressao_node
 
             if hasattr(tipo_variavel, 'value'):
                 tipo_variavel = tipo_variavel.value
@@ -123,7 +156,7 @@ class SemanticAnalyzer:
                 self.errors.append(f"Erro: Número incorreto de argumentos para '{nome}'.")
             else:
                 for arg, (param_type, param_name) in zip(argumentos, func_info['params']):
-                    tipo_argumento = self.visit(arg)
+                    tipo_argumento = yield arg
 
                     if hasattr(tipo_argumento, 'value'):
                         tipo_argumento = tipo_argumento.value
@@ -148,7 +181,7 @@ class SemanticAnalyzer:
                 self.errors.append(f"Erro: Número incorreto de argumentos para '{nome}'.")
             else:
                 for arg, (param_type, param_name) in zip(argumentos, proc_info['params']):
-                    tipo_argumento = self.visit(arg)
+                    tipo_argumento = yield arg
 
                     if hasattr(tipo_argumento, 'value'):
                         tipo_argumento = tipo_argumento.value
@@ -166,31 +199,33 @@ class SemanticAnalyzer:
         bloco_then = node.children[1]
         bloco_else = node.children[2] if len(node.children) > 2 else None
 
-        tipo_condicao = self.visit(condicao)
+        tipo_condicao = yield condicao
         if tipo_condicao != 'bool':
             self.errors.append("Erro: Condição do 'if' deve ser uma expressão booleana.")
         else:
-            self.visit(bloco_then)
+            yield bloco_then
             if bloco_else:
-                self.visit(bloco_else)
+                yield bloco_else
 
     def visit_ComandoLaco(self, node):
         condicao = node.children[0]
         bloco_laco = node.children[1]
 
-        tipo_condicao = self.visit(condicao)
+        tipo_condicao = yield condicao
         if tipo_condicao != 'bool':
             self.errors.append("Erro: Condição do 'while' deve ser uma expressão booleana.")
         else:
-            self.visit(bloco_laco)
+            self.loop_depth += 1
+            yield bloco_laco
+            self.loop_depth -= 1
 
     def visit_ComandoImpressao(self, node):
         expressao = node.children[0]
-        self.visit(expressao)
+        yield expressao
 
     def visit_ComandoRetorno(self, node):
         expressao_retorno = node.children[0]
-        tipo_retorno = self.visit(expressao_retorno)
+        tipo_retorno = yield expressao_retorno
         
         if hasattr(tipo_retorno, 'value'):
             tipo_retorno = tipo_retorno.value
@@ -199,14 +234,15 @@ class SemanticAnalyzer:
             self.errors.append(f"Erro: Tipo de retorno incompatível. Esperado '{self.current_function_type}', encontrado '{tipo_retorno}'.")
 
     def visit_ComandoBreak(self, node):
-        pass  # 'break' não precisa de verificação semântica adicional
+        if self.loop_depth == 0:
+            self.errors.append("Erro: 'break' fora de um laço.")
 
     def visit_Expressao(self, node):
-        return self.visit(node.children[0])
+        return (yield node.children[0])
 
     def visit_ExpressaoBooleana(self, node):
-        esquerda = self.visit(node.children[0])
-        direita = self.visit(node.children[1])
+        esquerda = yield node.children[0]
+        direita = yield node.children[1]
 
         if hasattr(esquerda, 'value'):
             esquerda = esquerda.value
@@ -220,8 +256,8 @@ class SemanticAnalyzer:
             return 'bool'
 
     def visit_ExpressaoAritmetica(self, node):
-        esquerda = self.visit(node.children[0])
-        direita = self.visit(node.children[1])
+        esquerda = yield node.children[0]
+        direita = yield node.children[1]
 
         if hasattr(esquerda, 'value'):
             esquerda = esquerda.value
@@ -235,7 +271,7 @@ class SemanticAnalyzer:
             return 'int'
 
     def visit_Termo(self, node):
-        return self.visit(node.children[0])
+        return (yield node.children[0])
 
     def visit_ID(self, node):
         if node.value not in self.current_scope:
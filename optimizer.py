@@ -0,0 +1,339 @@
+from tac_ir import Op, instruction_uses
+from dead_code import eliminate_dead_code
+from temp_allocation import allocate_temps
+
+# Passadas de otimização sobre o código de três endereços (tac_ir.TacProgram).
+# Cada temporário é definido uma única vez e usado depois da definição, então
+# basta uma passada em ordem, guardando o valor conhecido de cada temporário.
+
+def literal_value(operand):
+    # Valor de um operando literal (int ou bool), ou None se não for um
+    # literal que a otimização entende (variáveis, temporários, strings)
+    if type(operand) is not str:
+        return None
+    if operand == "true":
+        return True
+    if operand == "false":
+        return False
+    digits = operand[1:] if operand[:1] == "-" else operand
+    if digits.isdigit():
+        return int(operand)
+    return None
+
+def literal_text(value):
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    return str(value)
+
+def divide(left, right):
+    # Divisão inteira truncada em direção a zero, como em C
+    quotient = abs(left) // abs(right)
+    return quotient if (left >= 0) == (right >= 0) else -quotient
+
+def evaluate(op, left, right):
+    # Resultado de `left op right` para dois literais, ou None se não dá
+    # para calcular em tempo de compilação (tipos misturados, divisão por zero)
+    if type(left) is bool or type(right) is bool:
+        if type(left) is not type(right):
+            return None
+        if op == Op.EQ:
+            return left == right
+        if op == Op.NE:
+            return left != right
+        return None
+    if op == Op.ADD:
+        return left + right
+    if op == Op.SUB:
+        return left - right
+    if op == Op.MUL:
+        return left * right
+    if op == Op.DIV:
+        return divide(left, right) if right != 0 else None
+    if op == Op.EQ:
+        return left == right
+    if op == Op.NE:
+        return left != right
+    if op == Op.LT:
+        return left < right
+    if op == Op.LE:
+        return left <= right
+    if op == Op.GT:
+        return left > right
+    return left >= right
+
+# Operações aritméticas: o resultado é sempre um int (na TacVM e no
+# backend Python, até `true * 1` vale 1)
+ARITHMETIC_OPS = frozenset({Op.ADD, Op.SUB, Op.MUL, Op.DIV})
+
+def known_int(operand, int_temps):
+    # O operando com certeza é um int: literal inteiro ou temporário que
+    # veio de uma operação aritmética. Variáveis e resultados de chamadas
+    # não têm tipo conhecido aqui
+    if type(operand) is int:
+        return operand in int_temps
+    return type(literal_value(operand)) is int
+
+def simplify(op, left, right, int_temps):
+    # Identidades algébricas com um operando literal; devolve o operando que
+    # substitui a operação, ou None. As aritméticas só valem com dois ints:
+    # `true * 1` é 1, não `true`
+    left_value = literal_value(left)
+    right_value = literal_value(right)
+    if op in ARITHMETIC_OPS:
+        if not (known_int(left, int_temps) and known_int(right, int_temps)):
+            return None
+        if op == Op.ADD:
+            if right_value == 0:
+                return left
+            if left_value == 0:
+                return right
+        elif op == Op.SUB:
+            if right_value == 0:
+                return left
+            if left == right and left_value is None:
+                return "0"
+        elif op == Op.MUL:
+            if right_value in (0, 1):
+                return left if right_value == 1 else "0"
+            if left_value in (0, 1):
+                return right if left_value == 1 else "0"
+        elif right_value == 1:
+            return left
+    elif op == Op.EQ:
+        # `c == true` é o próprio `c` (a análise semântica garante que é bool)
+        if right_value is True:
+            return left
+        if left_value is True:
+            return right
+    elif op == Op.NE:
+        if right_value is False:
+            return left
+        if left_value is False:
+            return right
+    return None
+
+def fold_constants(program):
+    # Dobra subexpressões constantes, aplica identidades (x*1, x+0, x*0...),
+    # resolve comparações entre literais e desvios com condição constante.
+    # Altera `program` e devolve as contagens de cada transformação.
+    values = {}  # temporário -> operando que o substitui
+    int_temps = set()  # temporários resultado de operações aritméticas
+    folded = simplified = branches = 0
+    before = len(program.instructions)
+    instructions = []
+    append = instructions.append
+    for ins in program.instructions:
+        op, result, left, right = ins
+        if op >= Op.ADD:
+            if type(left) is int:
+                left = values.get(left, left)
+            if type(right) is int:
+                right = values.get(right, right)
+            left_value = literal_value(left)
+            right_value = literal_value(right)
+            if left_value is not None and right_value is not None:
+                value = evaluate(op, left_value, right_value)
+                if value is not None:
+                    values[result] = literal_text(value)
+                    folded += 1
+                    continue
+            replacement = simplify(op, left, right, int_temps)
+            if replacement is not None:
+                values[result] = replacement
+                simplified += 1
+                continue
+            if op in ARITHMETIC_OPS:
+                int_temps.add(result)
+            ins = (op, result, left, right)
+        elif op == Op.ASSIGN:
+            if type(left) is int and left in values:
+                left = values[left]
+                if left == result:
+                    # `x = x`, que sobra de `x = x + 0`
+                    simplified += 1
+                    continue
+                ins = (op, result, left, right)
+        elif op == Op.PRINT or op == Op.RETURN:
+            if type(left) is int and left in values:
+                ins = (op, result, values[left], right)
+        elif op == Op.IF_FALSE:
+            if type(left) is int:
+                left = values.get(left, left)
+            condition = literal_value(left)
+            if condition is True:
+                branches += 1
+                continue
+            if condition is False:
+                branches += 1
+                ins = (Op.GOTO, None, right, None)
+            else:
+                ins = (op, result, left, right)
+        elif op == Op.CALL or op == Op.CALL_PROC:
+            if any(type(arg) is int and arg in values for arg in right):
+                ins = (op, result, left, tuple(values.get(arg, arg) if type(arg) is int else arg for arg in right))
+        append(ins)
+    program.instructions = instructions
+    return {
+        "folded": folded,
+        "simplified": simplified,
+        "branches": branches,
+        "eliminated": before - len(instructions),
+    }
+
+# Instruções depois das quais começa um novo bloco básico (além dos rótulos)
+BLOCK_ENDS = frozenset({Op.GOTO, Op.IF_FALSE, Op.BREAK, Op.RETURN,
+                        Op.FUNC_BEGIN, Op.FUNC_END, Op.PROC_BEGIN, Op.PROC_END})
+COMMUTATIVE_OPS = frozenset({Op.ADD, Op.MUL, Op.EQ, Op.NE})
+
+class ValueTable:
+    # Numeração de valores de um bloco básico: cada operando (variável,
+    # temporário ou literal) tem um número de valor, e cada número lembra
+    # quem ainda guarda aquele valor
+    def __init__(self):
+        self.numbers = {}   # operando -> número de valor
+        self.holders = {}   # número -> operandos que guardam o valor, em ordem
+        self.literals = {}  # número -> literal
+        self.expressions = {}  # (op, número, número) -> número
+        self.count = 0
+
+    def number(self, operand):
+        number = self.numbers.get(operand)
+        if number is None:
+            number = self.count
+            self.count += 1
+            self.numbers[operand] = number
+            if literal_value(operand) is not None or (type(operand) is str and operand[:1] == '"'):
+                self.literals[number] = operand
+            else:
+                self.holders[number] = [operand]
+        return number
+
+    def representative(self, operand):
+        # Quem melhor representa o valor do operando: o literal, se houver,
+        # senão o primeiro operando que ainda guarda esse valor
+        number = self.number(operand)
+        literal = self.literals.get(number)
+        if literal is not None:
+            return literal
+        holders = self.holders.get(number)
+        return holders[0] if holders else operand
+
+    def assign(self, target, number):
+        old = self.numbers.get(target)
+        if old is not None:
+            holders = self.holders.get(old)
+            if holders and target in holders:
+                holders.remove(target)
+        self.numbers[target] = number
+        self.holders.setdefault(number, []).append(target)
+
+    def define(self, target):
+        # Valor novo (resultado de uma operação ou chamada)
+        number = self.count
+        self.count += 1
+        self.numbers[target] = number
+        self.holders[number] = [target]
+        return number
+
+def local_value_numbering(program):
+    # Numeração de valores local a cada bloco básico: elimina subexpressões
+    # comuns (o temporário repetido passa a ser o que já tem o valor) e
+    # propaga cópias (`b = a; print b` vira `print a`), removendo atribuições
+    # que não mudam o valor da variável
+    cse = copies = 0
+    instructions = []
+    append = instructions.append
+    table = ValueTable()
+    for ins in program.instructions:
+        op, result, left, right = ins
+        if op == Op.LABEL:
+            table = ValueTable()
+        elif op >= Op.ADD:
+            left = table.representative(left)
+            right = table.representative(right)
+            left_number = table.number(left)
+            right_number = table.number(right)
+            if op in COMMUTATIVE_OPS and right_number < left_number:
+                key = (op, right_number, left_number)
+            else:
+                key = (op, left_number, right_number)
+            number = table.expressions.get(key)
+            if number is not None and table.holders.get(number):
+                # O temporário vira um apelido de quem já guarda o valor
+                table.numbers[result] = number
+                cse += 1
+                continue
+            table.expressions[key] = table.define(result)
+            ins = (op, result, left, right)
+        elif op == Op.ASSIGN:
+            source = table.representative(left)
+            number = table.number(source)
+            if table.numbers.get(result) == number:
+                copies += 1
+                continue
+            if source != left:
+                copies += 1
+            table.assign(result, number)
+            ins = (op, result, source, right)
+        elif op == Op.PRINT or op == Op.RETURN or op == Op.IF_FALSE:
+            source = table.representative(left)
+            if source != left:
+                copies += 1
+                ins = (op, result, source, right)
+        elif op == Op.CALL or op == Op.CALL_PROC:
+            args = tuple(table.representative(arg) for arg in right)
+            if args != right:
+                copies += 1
+            if op == Op.CALL:
+                table.define(result)
+            ins = (op, result, left, args)
+        append(ins)
+        if op in BLOCK_ENDS:
+            table = ValueTable()
+    program.instructions = instructions
+    return {"cse": cse, "copies": copies}
+
+def eliminate_dead_temps(program):
+    # Remove operações cujo temporário nunca é usado. De trás para frente,
+    # já que um temporário é sempre usado depois de definido; chamadas
+    # ficam (podem ter efeitos), mesmo com o resultado descartado
+    used = set()
+    kept = []
+    removed = 0
+    for ins in reversed(program.instructions):
+        op, result, left, right = ins
+        if op >= Op.ADD:
+            if result not in used:
+                removed += 1
+                continue
+            if type(left) is int:
+                used.add(left)
+            if type(right) is int:
+                used.add(right)
+        else:
+            used.update(instruction_uses(ins))
+        kept.append(ins)
+    kept.reverse()
+    program.instructions = kept
+    return {"dead_temps": removed}
+
+def optimize(program, level):
+    # -O1: dobra de constantes, simplificações e remoção de código morto;
+    # -O2: também numeração de valores (subexpressões comuns e cópias),
+    # remoção de temporários mortos e reaproveitamento de temporários. A
+    # numeração propaga constantes para dentro das expressões, por isso a
+    # dobra roda de novo depois dela
+    stats = {"instructions_before": len(program.instructions)}
+    if level >= 2:
+        passes = [fold_constants, local_value_numbering, fold_constants, eliminate_dead_code,
+                  eliminate_dead_temps, allocate_temps]
+    else:
+        passes = [fold_constants, eliminate_dead_code]
+    for optimization in passes:
+        for name, count in optimization(program).items():
+            stats[name] = stats[name] + count if name in stats else count
+    stats["instructions_after"] = len(program.instructions)
+    stats["eliminated"] = stats["instructions_before"] - stats["instructions_after"]
+    return stats
@@ -0,0 +1,194 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from new_semantic import SemanticAnalyzer
+from tac_ir import TacProgram
+from three_address_code_generator import ThreeAddressCodeGenerator, numbers_used
+
+DECLARACOES = frozenset({"DeclaracaoFuncao", "DeclaracaoProcedimento"})
+
+class VisibleSymbols:
+    # A tabela global como era quando a função foi declarada: das entradas
+    # da tabela final (na ordem de inserção) só as `count` primeiras existiam
+    def __init__(self, positions, count):
+        self.positions = positions
+        self.count = count
+
+    def __contains__(self, name):
+        entry = self.positions.get(name)
+        return entry is not None and entry[0] < self.count
+
+    def __getitem__(self, name):
+        entry = self.positions.get(name)
+        if entry is None or entry[0] >= self.count:
+            raise KeyError(name)
+        return entry[1]
+
+# Estado dos processos do pool: as unidades de nível superior e a tabela
+# global (nome -> (posição, valor)). Com `fork` os processos herdam isso do
+# pai e as tarefas levam só índices; sem `fork` é enviado uma única vez pelo
+# initializer. No processo pai, os dois voltam a ficar vazios quando as
+# tarefas terminam (ver ParallelBackend.run), para não segurar a AST e a
+# tabela depois da compilação
+_units = ()
+_positions = {}
+
+def _init_worker(units, symbols):
+    global _units, _positions
+    _units = units
+    _positions = {name: (index, value) for index, (name, value) in enumerate(symbols)}
+
+def compile_function(task):
+    # Análise semântica e geração de código do corpo de uma função. Devolve
+    # (erros, TacProgram, temporários, exceção da geração); exceções da
+    # análise semântica são propagadas
+    index, visible, temp_base, label_base = task
+    node = _units[index]
+    analyzer = SemanticAnalyzer(None, VisibleSymbols(_positions, visible), verbose=False)
+    analyzer.visitar_corpo(node)
+    if analyzer.errors:
+        return analyzer.errors, None, 0, None
+    codegen = ThreeAddressCodeGenerator(None, temp_count=temp_base, label_count=label_base)
+    try:
+        codegen.traverse(node)
+    except Exception as e:
+        return [], None, 0, e
+    return [], codegen.program, codegen.temps_created, None
+
+class ParallelBackend:
+    # Análise semântica e geração de código em duas passadas:
+    #   1. uma passada sequencial sobre o nível superior registra as
+    #      assinaturas das funções/procedimentos, analisa os comandos e
+    #      declarações globais e anota, para cada função, quantas entradas
+    #      da tabela global ela enxerga e onde começam as suas numerações de
+    #      temporários e rótulos (contadas sem gerar código);
+    #   2. os corpos das funções são analisados e gerados num pool de
+    #      processos e juntados na ordem do programa.
+    # Erros, exceções e código gerado saem iguais aos da compilação
+    # sequencial, com a mesma numeração de temporários e rótulos.
+    def __init__(self, ast_root, jobs=None):
+        self.ast_root = ast_root
+        self.jobs = jobs or os.cpu_count() or 1
+        self.symbol_table = {}
+        self.errors = []
+        self.temps_created = 0
+        self.functions = 0
+        self.results = None
+        self.bases = None  # (primeiro temporário, primeiro rótulo) de cada unidade
+
+    @staticmethod
+    def supports(ast_root):
+        # Funções declaradas dentro de outras mudam a tabela global no meio
+        # da análise; nesse caso (e com menos de duas funções) não compensa
+        functions = [node for node in ast_root.children if node.node_type in DECLARACOES]
+        if len(functions) < 2:
+            return False
+        for function in functions:
+            stack = list(function.children)
+            while stack:
+                node = stack.pop()
+                if node is None:
+                    continue
+                if node.node_type in DECLARACOES:
+                    return False
+                stack.extend(node.children)
+        return True
+
+    def analyze(self):
+        units = self.ast_root.children
+        analyzer = SemanticAnalyzer(None, self.symbol_table, verbose=False)
+        unit_errors = [None] * len(units)
+        tasks = []
+        task_units = []
+        bases = [None] * len(units)
+        temp_count = label_count = 0
+        failure = None
+        for index, node in enumerate(units):
+            bases[index] = (temp_count, label_count)
+            temps, labels = numbers_used(node)
+            temp_count += temps
+            label_count += labels
+            start = len(analyzer.errors)
+            if node.node_type in DECLARACOES:
+                if analyzer.declarar_funcao(node):
+                    tasks.append((index, len(self.symbol_table)) + bases[index])
+                    task_units.append(index)
+            else:
+                try:
+                    analyzer.visit(node)
+                except Exception as e:
+                    # Como na análise sequencial, nada depois daqui importa
+                    failure = (index, e)
+                    break
+            unit_errors[index] = analyzer.errors[start:]
+
+        self.functions = len(tasks)
+        self.results = [None] * len(units)
+        results = self.run(tasks)
+        # Junta na ordem do programa; uma exceção num corpo de função só é
+        # propagada se nenhuma unidade anterior falhou
+        for index in task_units:
+            if failure is not None and index > failure[0]:
+                break
+            try:
+                errors, instructions, temps, error = next(results)
+            except StopIteration:
+                break
+            unit_errors[index] = unit_errors[index] + errors
+            self.results[index] = (instructions, temps, error)
+        # Libera o estado global mesmo se as tarefas não foram todas lidas
+        results.close()
+        if failure is not None:
+            raise failure[1]
+        self.errors = [error for errors in unit_errors if errors for error in errors]
+        self.bases = bases
+        return self.errors
+
+    def run(self, tasks):
+        units = self.ast_root.children
+        symbols = list(self.symbol_table.items())
+        if self.jobs == 1 or len(tasks) <= 1:
+            return self._run_serial(tasks, units, symbols)
+        return self._run_pool(tasks, units, symbols)
+
+    def _run_serial(self, tasks, units, symbols):
+        _init_worker(units, symbols)
+        try:
+            yield from map(compile_function, tasks)
+        finally:
+            _init_worker((), ())
+
+    def _run_pool(self, tasks, units, symbols):
+        jobs = min(self.jobs, len(tasks))
+        if "fork" in multiprocessing.get_all_start_methods():
+            _init_worker(units, symbols)
+            options = {"mp_context": multiprocessing.get_context("fork")}
+        else:
+            options = {"initializer": _init_worker, "initargs": (units, symbols)}
+        try:
+            with ProcessPoolExecutor(max_workers=jobs, **options) as executor:
+                yield from executor.map(compile_function, tasks, chunksize=max(1, len(tasks) // (jobs * 4)))
+        finally:
+            _init_worker((), ())
+
+    def generate(self):
+        # Código do nível superior gerado aqui, com a numeração de cada
+        # trecho; o das funções já veio do pool
+        program = TacProgram()
+        self.temps_created = 0
+        for index, node in enumerate(self.ast_root.children):
+            if node.node_type in DECLARACOES:
+                generated = self.results[index]
+                if generated is None:
+                    continue
+                body, temps, error = generated
+                if error is not None:
+                    raise error
+            else:
+                temp_base, label_base = self.bases[index]
+                codegen = ThreeAddressCodeGenerator(None, temp_count=temp_base, label_count=label_base)
+                codegen.traverse(node)
+                body, temps = codegen.program, codegen.temps_created
+            program.extend(body)
+            self.temps_created += temps
+        return program
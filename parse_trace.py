@@ -0,0 +1,79 @@
+import sys
+
+class ParseTracer:
+    # Interface para acompanhar o Parser. Só é usada quando um tracer é
+    # passado para o Parser; sem tracer, os métodos da gramática rodam sem
+    # nenhum custo extra.
+    def enter(self, rule):
+        pass
+
+    def leave(self, rule):
+        pass
+
+    def consume(self, token):
+        pass
+
+class ListTracer(ParseTracer):
+    # Guarda os passos em uma lista, como o antigo `parsing_steps`
+    def __init__(self):
+        self.steps = []
+
+    def enter(self, rule):
+        self.steps.append(f"Analisando {rule}...")
+
+    def leave(self, rule):
+        self.steps.append(f"Fim de {rule}")
+
+    def consume(self, token):
+        self.steps.append(f"Consumindo token: {token}")
+
+class StreamTracer(ParseTracer):
+    # Escreve cada evento em um arquivo (ou sys.stderr), indentado pela
+    # profundidade da regra, sem acumular nada em memória
+    def __init__(self, stream=None):
+        self.stream = stream if stream is not None else sys.stderr
+        self.depth = 0
+
+    def enter(self, rule):
+        self.stream.write(f"{'  ' * self.depth}{rule} {{\n")
+        self.depth += 1
+
+    def leave(self, rule):
+        self.depth -= 1
+        self.stream.write(f"{'  ' * self.depth}}}\n")
+
+    def consume(self, token):
+        self.stream.write(f"{'  ' * self.depth}Consumindo token: {token}\n")
+
+class CallbackTracer(ParseTracer):
+    # Repassa cada evento para `callback(evento, dado)`, onde evento é
+    # "enter", "leave" ou "consume"
+    def __init__(self, callback):
+        self.callback = callback
+
+    def enter(self, rule):
+        self.callback("enter", rule)
+
+    def leave(self, rule):
+        self.callback("leave", rule)
+
+    def consume(self, token):
+        self.callback("consume", token)
+
+def traced_rule(tracer, rule, method):
+    def wrapper(*args):
+        # O leave sai mesmo quando a regra levanta um erro de sintaxe, para
+        # que os eventos fiquem balanceados
+        tracer.enter(rule)
+        try:
+            return method(*args)
+        finally:
+            tracer.leave(rule)
+    return wrapper
+
+def traced_eat(tracer, eat):
+    def wrapper(kind):
+        token = eat(kind)
+        tracer.consume(token)
+        return token
+    return wrapper
@@ -1,376 +1,391 @@
-from lexer import Lexer, Token
-from typing import List
+from collections import deque
+from lexer import Lexer, Token, TokenKind, TOKEN_TYPES
+from typing import Iterable
 from ast_node import ASTNode  
+from parse_trace import traced_eat, traced_rule
+
+# Classes de operadores pré-calculadas, usadas nos laços das expressões
+TYPE_KINDS = frozenset({TokenKind.INT, TokenKind.BOOL})
+RELATIONAL_OPERATORS = frozenset({TokenKind.EQ, TokenKind.NE, TokenKind.GT, TokenKind.GE, TokenKind.LT, TokenKind.LE})
+ADDITIVE_OPERATORS = frozenset({TokenKind.PLUS, TokenKind.MINUS})
+MULTIPLICATIVE_OPERATORS = frozenset({TokenKind.TIMES, TokenKind.DIVIDE})
+BOOLEAN_LITERALS = frozenset({TokenKind.TRUE, TokenKind.FALSE})
+
+# Regras da gramática que geram eventos para o tracer, quando há um
+REGRAS = (
+    "declaracao_comando", "declaracao_variaveis", "tipo", "lista_identificadores",
+    "declaracao_procedimento", "declaracao_funcao", "lista_parametros", "parametro",
+    "bloco", "bloco_retorno", "comando_atribuicao", "chamada_funcao_ou_procedimento",
+    "chamada_procedimento", "chamada_funcao", "lista_argumentos", "comando_condicional",
+    "comando_laco", "comando_impressao", "comando_retorno", "comando_break",
+    "expressao", "expressao_booleana", "expressao_aritmetica", "termo", "fator",
+)
 
 class Parser:
-    def __init__(self, tokens: List[Token]):
-        self.tokens = tokens
+    def __init__(self, tokens: Iterable[Token], tracer=None, arena=None, node_factory=None):
+        # Aceita tanto a lista de tokens quanto o gerador Lexer.iter_tokens();
+        # só os tokens de lookahead ficam guardados no buffer
+        self.tokens = iter(tokens)
+        self.lookahead = deque()
         self.current_token_index = 0  
-        self.parsing_steps = []  
         self.current_function_type = None  
+        # Com uma ast_arena.ASTArena os nós são gravados nela (e cada nó é um
+        # índice) em vez de virarem objetos ASTNode; por isso as regras nunca
+        # leem atributos dos nós que constroem
+        self.arena = arena
+        self.new_node = ASTNode if arena is None else arena.add
+        # node_factory troca a classe dos nós (mesma assinatura do ASTNode);
+        # o IncrementalCompiler usa para guardar posições relativas ao trecho
+        if node_factory is not None:
+            self.new_node = node_factory
+        self.tracer = tracer
+        if tracer is not None:
+            self.instalar_tracer(tracer)
+        self.comandos = {kind: getattr(self, method.__name__) for kind, method in self.COMANDOS.items()}
+
+    def instalar_tracer(self, tracer):
+        # Troca, só nesta instância, os métodos da gramática e o `eat` por
+        # versões que avisam o tracer. Sem tracer nada é embrulhado, então o
+        # parse normal não paga pelo rastreamento.
+        for regra in REGRAS:
+            setattr(self, regra, traced_rule(tracer, regra, getattr(self, regra)))
+        self.eat = traced_eat(tracer, self.eat)
 
     def parse(self):
-        ast_root = ASTNode("Programa")
-        while self.current_token_index < len(self.tokens): 
-            ast_root.add_child(self.declaracao_comando())  
+        inicio = self.current_token()
+        comandos = []
+        while self.current_token().kind != TokenKind.EOF: 
+            comandos.append(self.declaracao_comando())  
+        ast_root = self.new_node("Programa", children=comandos, line=inicio.line, column=inicio.column)
+        if self.arena is not None:
+            return self.arena.node(ast_root)
         return ast_root
 
-    def eat(self, token_type):
+    def eat(self, kind):
         current_token = self.current_token()
-        if current_token.token_type == token_type:
-            self.parsing_steps.append(f"Consumindo token: {current_token}")
+        if current_token.kind == kind:
+            self.lookahead.popleft()
             self.current_token_index += 1
             return current_token
         else:
-            raise SyntaxError(f"Esperado token {token_type}, mas encontrado {current_token.token_type} `{current_token.value}` na linha {current_token.line}")
+            raise SyntaxError(f"Esperado token {TOKEN_TYPES[kind]}, mas encontrado {current_token.token_type} `{current_token.value}` na linha {current_token.line}")
 
     def current_token(self):
-        if self.current_token_index < len(self.tokens):
-            return self.tokens[self.current_token_index]
-        else:
-            return Token("EOF", "EOF", 0, 0)
+        return self.peek(0)
+
+    def peek(self, offset):
+        # Puxa tokens do fluxo até ter `offset` tokens à frente do atual
+        while len(self.lookahead) <= offset:
+            token = next(self.tokens, None)
+            if token is None:
+                return Token(TokenKind.EOF, "EOF", 0, 0)
+            self.lookahead.append(token)
+        return self.lookahead[offset]
+
     def declaracao_comando(self):
-        token_type = self.current_token().token_type
-        self.parsing_steps.append(f"Analisando declaração/comando: {token_type}")
-        if token_type in ["INT", "BOOL"]:
-            #checar len antes de pegar
-            if self.tokens[self.current_token_index + 2].token_type == "LPAREN":
-                return self.declaracao_funcao()
-            else:
-                return self.declaracao_variaveis()
-        elif token_type == "VOID":
-            return self.declaracao_procedimento()
-        elif token_type == "ID":
-            if self.tokens[self.current_token_index + 1].token_type == "ASSIGN":
-                return self.comando_atribuicao()
-            elif self.tokens[self.current_token_index + 1].token_type == "LPAREN":
-                return self.chamada_funcao_ou_procedimento()
-            else:
-                raise SyntaxError(f"Token inesperado `{token_type}`, esperado (INT, BOOL ou VOID) na linha {self.current_token().line}")
-        elif token_type == "PRC":
-            return self.chamada_procedimento()
-        elif token_type == "FUN":
-            return self.chamada_funcao()
-        elif token_type == "IF":
-            return self.comando_condicional()
-        elif token_type == "WHILE":
-            return self.comando_laco()
-        elif token_type == "PRINT":
-            return self.comando_impressao()
-        elif token_type == "BREAK":
-            return self.comando_break()
-        elif token_type == "RETURN":
-            return self.comando_retorno()
+        token = self.current_token()
+        handler = self.comandos.get(token.kind)
+        if handler is None:
+            raise SyntaxError(f"Token inesperado {token.token_type}, esperado (PRC, FUN, IF, WHILE, PRINT, BREAK ou RETURN) na linha {token.line}")
+        return handler()
+
+    def declaracao_tipada(self):
+        # `int x;` e `int f(...)` só se distinguem pelo terceiro token
+        if self.peek(2).kind == TokenKind.LPAREN:
+            return self.declaracao_funcao()
         else:
-            raise SyntaxError(f"Token inesperado {token_type}, esperado (PRC, FUN, IF, WHILE, PRINT, BREAK ou RETURN) na linha {self.current_token().line}")
+            return self.declaracao_variaveis()
+
+    def comando_identificador(self):
+        proximo = self.peek(1).kind
+        if proximo == TokenKind.ASSIGN:
+            return self.comando_atribuicao()
+        elif proximo == TokenKind.LPAREN:
+            return self.chamada_funcao_ou_procedimento()
+        else:
+            raise SyntaxError(f"Token inesperado `ID`, esperado (INT, BOOL ou VOID) na linha {self.current_token().line}")
 
     def declaracao_variaveis(self):
-        self.parsing_steps.append("{")
-        self.parsing_steps.append("Analisando declaração de variáveis...")
-        
+        inicio = self.current_token()
         tipo_variavel = self.tipo() 
         identificadores = self.lista_identificadores() 
         
-        self.eat("SEMICOLON")  
-        self.parsing_steps.append("}")
+        self.eat(TokenKind.SEMICOLON)  
         
-        return ASTNode("DeclaracaoVariavel", value=tipo_variavel, children=identificadores)
+        return self.new_node("DeclaracaoVariavel", value=tipo_variavel, children=identificadores, line=inicio.line, column=inicio.column)
 
     def tipo(self):
-        token_type = self.current_token().token_type
-        if token_type in ["INT", "BOOL"]:
-            self.parsing_steps.append(f"Tipo encontrado: {token_type}")
-            self.eat(token_type)
-            return ASTNode("Tipo", value=token_type) 
+        token = self.current_token()
+        if token.kind in TYPE_KINDS:
+            self.eat(token.kind)
+            return self.new_node("Tipo", value=token.token_type, line=token.line, column=token.column)
         else:
             raise SyntaxError(f"Tipo de variável inválido: '{self.current_token().value}' na linha {self.current_token().line}. Esperado INT ou BOOL.")
 
     def lista_identificadores(self):
-        self.parsing_steps.append("Analisando lista de identificadores...")
+        token = self.eat(TokenKind.ID)
+        ids = [self.new_node("ID", value=token.value, line=token.line, column=token.column)]
         
-        ids = [ASTNode("ID", value=self.current_token().value)]  
-        self.eat("ID")
-        
-        while self.current_token().token_type == "COMMA":
-            self.eat("COMMA") 
-            ids.append(ASTNode("ID", value=self.current_token().value))  
-            self.eat("ID")  
+        while self.current_token().kind == TokenKind.COMMA:
+            self.eat(TokenKind.COMMA) 
+            token = self.eat(TokenKind.ID)
+            ids.append(self.new_node("ID", value=token.value, line=token.line, column=token.column))
         
         return ids  
 
     def declaracao_procedimento(self):
-        self.parsing_steps.append("{")
-        self.parsing_steps.append("Analisando declaração de procedimento...")
-        
-        self.eat("VOID")
-        nome_procedimento = self.eat("ID").value  
-        self.eat("LPAREN")
+        inicio = self.eat(TokenKind.VOID)
+        nome_procedimento = self.eat(TokenKind.ID).value  
+        self.eat(TokenKind.LPAREN)
         
         parametros = []
-        if self.current_token().token_type != "RPAREN":
+        if self.current_token().kind != TokenKind.RPAREN:
             parametros = self.lista_parametros()  
         
-        self.eat("RPAREN")
+        self.eat(TokenKind.RPAREN)
         corpo = self.bloco()
         
         self.current_function_type = None
-        self.parsing_steps.append("}")
         
-        return ASTNode("DeclaracaoProcedimento", value=nome_procedimento, children=parametros + [corpo])
+        return self.new_node("DeclaracaoProcedimento", value=nome_procedimento, children=parametros + [corpo], line=inicio.line, column=inicio.column)
 
     def declaracao_funcao(self):
-        self.parsing_steps.append("{")
-        self.parsing_steps.append("Analisando declaração de função...")
-        
+        inicio = self.current_token()
         tipo_funcao = self.tipo()  
-        nome_funcao = self.eat("ID").value 
-        self.eat("LPAREN")
+        nome_funcao = self.eat(TokenKind.ID).value 
+        self.eat(TokenKind.LPAREN)
         
         parametros = []
-        if self.current_token().token_type != "RPAREN":
+        if self.current_token().kind != TokenKind.RPAREN:
             parametros = self.lista_parametros()  
         
-        self.eat("RPAREN")
+        self.eat(TokenKind.RPAREN)
         corpo = self.bloco_retorno()  
         
         self.current_function_type = None
-        self.parsing_steps.append("}")
         
-        return ASTNode("DeclaracaoFuncao", value=nome_funcao, children=[tipo_funcao] + parametros + [corpo])
+        return self.new_node("DeclaracaoFuncao", value=nome_funcao, children=[tipo_funcao] + parametros + [corpo], line=inicio.line, column=inicio.column)
 
     def lista_parametros(self):
-        self.parsing_steps.append("Analisando lista de parâmetros...")
-        
         parametros = [self.parametro()]  
-        while self.current_token().token_type == "COMMA":
-            self.eat("COMMA")
+        while self.current_token().kind == TokenKind.COMMA:
+            self.eat(TokenKind.COMMA)
             parametros.append(self.parametro()) 
         
         return parametros
 
     def parametro(self):
-        self.parsing_steps.append("Analisando parâmetro...")
+        inicio = self.current_token()
         tipo_parametro = self.tipo()
-        nome_parametro = self.eat("ID").value
-        return ASTNode("Parametro", value=nome_parametro, children=[tipo_parametro])
+        nome_parametro = self.eat(TokenKind.ID).value
+        return self.new_node("Parametro", value=nome_parametro, children=[tipo_parametro], line=inicio.line, column=inicio.column)
 
     def bloco(self):
-        self.parsing_steps.append("Analisando bloco...")
-        self.eat("LBRACE")  
+        inicio = self.eat(TokenKind.LBRACE)
         
         comandos = []
-        while self.current_token().token_type != "RBRACE":
+        while self.current_token().kind != TokenKind.RBRACE:
             comandos.append(self.declaracao_comando()) 
         
-        self.eat("RBRACE")  
+        self.eat(TokenKind.RBRACE)  
         
-        return ASTNode("Bloco", children=comandos)
+        return self.new_node("Bloco", children=comandos, line=inicio.line, column=inicio.column)
 
     def bloco_retorno(self):
-        self.parsing_steps.append("Analisando bloco com retorno...")
-        self.eat("LBRACE")
+        inicio = self.eat(TokenKind.LBRACE)
         
         has_return = False
         comandos = []
-        while self.current_token().token_type != "RBRACE":
-            if self.current_token().token_type == "RETURN":
+        while self.current_token().kind != TokenKind.RBRACE:
+            if self.current_token().kind == TokenKind.RETURN:
                 has_return = True
                 comandos.append(self.comando_retorno()) 
             else:
                 comandos.append(self.declaracao_comando())  
         
-        self.eat("RBRACE")
+        self.eat(TokenKind.RBRACE)
         
         if self.current_function_type in ["INT", "BOOL"] and not has_return:
             raise SyntaxError(f"Função do tipo {self.current_function_type} deve ter um comando 'return'.")
         
-        return ASTNode("BlocoComRetorno", children=comandos)
+        return self.new_node("BlocoComRetorno", children=comandos, line=inicio.line, column=inicio.column)
 
     def comando_atribuicao(self):
-        self.parsing_steps.append("{")
-        self.parsing_steps.append("Analisando comando de atribuição...")
-        
-        identificador = ASTNode("ID", value=self.eat("ID").value)  
-        self.eat("ASSIGN")  
+        token = self.eat(TokenKind.ID)
+        identificador = self.new_node("ID", value=token.value, line=token.line, column=token.column)
+        self.eat(TokenKind.ASSIGN)  
         expressao = self.expressao()  
         
-        self.eat("SEMICOLON")
-        self.parsing_steps.append("}")
+        self.eat(TokenKind.SEMICOLON)
         
-        return ASTNode("ComandoAtribuicao", children=[identificador, expressao])
+        return self.new_node("ComandoAtribuicao", children=[identificador, expressao], line=token.line, column=token.column)
 
     def chamada_funcao_ou_procedimento(self):
-        self.parsing_steps.append("{")
-        self.parsing_steps.append("Analisando chamada de função ou procedimento...")
-        
-        nome = self.eat("ID").value
-        self.eat("LPAREN")
+        inicio = self.eat(TokenKind.ID)
+        nome = inicio.value
+        self.eat(TokenKind.LPAREN)
         
         argumentos = []
-        if self.current_token().token_type != "RPAREN":
+        if self.current_token().kind != TokenKind.RPAREN:
             argumentos = self.lista_argumentos()
         
-        self.eat("RPAREN")
-        self.eat("SEMICOLON")
-        self.parsing_steps.append("}")
+        self.eat(TokenKind.RPAREN)
+        self.eat(TokenKind.SEMICOLON)
         
-        return ASTNode("ChamadaFuncaoOuProcedimento", value=nome, children=argumentos)
+        return self.new_node("ChamadaFuncaoOuProcedimento", value=nome, children=argumentos, line=inicio.line, column=inicio.column)
 
     def chamada_procedimento(self):
-        self.parsing_steps.append("{")
-        self.parsing_steps.append("Analisando chamada de procedimento...")
-        self.eat("PRC")
-        nome_procedimento = self.eat("ID").value
-        self.eat("LPAREN")
+        inicio = self.eat(TokenKind.PRC)
+        nome_procedimento = self.eat(TokenKind.ID).value
+        self.eat(TokenKind.LPAREN)
         
         argumentos = []
-        if self.current_token().token_type != "RPAREN":
+        if self.current_token().kind != TokenKind.RPAREN:
             argumentos = self.lista_argumentos()
         
-        self.eat("RPAREN")
-        self.eat("SEMICOLON")
-        self.parsing_steps.append("}")
+        self.eat(TokenKind.RPAREN)
+        self.eat(TokenKind.SEMICOLON)
         
-        return ASTNode("ChamadaProcedimento", value=nome_procedimento, children=argumentos)
+        return self.new_node("ChamadaProcedimento", value=nome_procedimento, children=argumentos, line=inicio.line, column=inicio.column)
 
     def chamada_funcao(self):
-        self.parsing_steps.append("Analisando chamada de função com 'fun'...")
-        
-        nome_funcao = self.eat("ID").value
-        self.eat("LPAREN") 
+        inicio = self.eat(TokenKind.ID)
+        nome_funcao = inicio.value
+        self.eat(TokenKind.LPAREN) 
 
         argumentos = []
-        if self.current_token().token_type != "RPAREN":
+        if self.current_token().kind != TokenKind.RPAREN:
             argumentos = self.lista_argumentos()
 
-        self.eat("RPAREN")
-        self.parsing_steps.append("}")
+        self.eat(TokenKind.RPAREN)
         
-        return ASTNode("ChamadaFuncao", value=nome_funcao, children=argumentos)
+        return self.new_node("ChamadaFuncao", value=nome_funcao, children=argumentos, line=inicio.line, column=inicio.column)
 
     def lista_argumentos(self):
-        self.parsing_steps.append("Analisando lista de argumentos...")
         argumentos = [self.expressao()]
-        while self.current_token().token_type == "COMMA":
-            self.eat("COMMA")
+        while self.current_token().kind == TokenKind.COMMA:
+            self.eat(TokenKind.COMMA)
             argumentos.append(self.expressao())
         return argumentos
 
     def comando_condicional(self):
-        self.parsing_steps.append("{")
-        self.parsing_steps.append("Analisando comando condicional...")
-        self.eat("IF")
-        self.eat("LPAREN")
+        inicio = self.eat(TokenKind.IF)
+        self.eat(TokenKind.LPAREN)
         condicao = self.expressao_booleana()  
-        self.eat("RPAREN")
+        self.eat(TokenKind.RPAREN)
         bloco_then = self.bloco()  
         
         bloco_else = None
-        if self.current_token().token_type == "ELSE":
-            self.eat("ELSE")
+        if self.current_token().kind == TokenKind.ELSE:
+            self.eat(TokenKind.ELSE)
             bloco_else = self.bloco() 
         
-        self.parsing_steps.append("}")
-        return ASTNode("ComandoCondicional", children=[condicao, bloco_then, bloco_else])
+        return self.new_node("ComandoCondicional", children=[condicao, bloco_then, bloco_else], line=inicio.line, column=inicio.column)
 
     def comando_laco(self):
-        self.parsing_steps.append("{")
-        self.parsing_steps.append("Analisando comando de laço...")
-        self.eat("WHILE")
-        self.eat("LPAREN")
+        inicio = self.eat(TokenKind.WHILE)
+        self.eat(TokenKind.LPAREN)
         condicao = self.expressao_booleana()
-        self.eat("RPAREN")
+        self.eat(TokenKind.RPAREN)
         bloco_laco = self.bloco()
-        self.parsing_steps.append("}")
         
-        return ASTNode("ComandoLaco", children=[condicao, bloco_laco])
+        return self.new_node("ComandoLaco", children=[condicao, bloco_laco], line=inicio.line, column=inicio.column)
 
     def comando_impressao(self):
-        self.parsing_steps.append("{")
-        self.parsing_steps.append("Analisando comando de impressão...")
-        self.eat("PRINT")
-        self.eat("LPAREN")
+        inicio = self.eat(TokenKind.PRINT)
+        self.eat(TokenKind.LPAREN)
         expressao_impressao = self.expressao()
-        self.eat("RPAREN")
-        self.eat("SEMICOLON")
-        self.parsing_steps.append("}")
+        self.eat(TokenKind.RPAREN)
+        self.eat(TokenKind.SEMICOLON)
         
-        return ASTNode("ComandoImpressao", children=[expressao_impressao])
+        return self.new_node("ComandoImpressao", children=[expressao_impressao], line=inicio.line, column=inicio.column)
 
     def comando_retorno(self):
-        self.parsing_steps.append("{")
-        self.parsing_steps.append("Analisando comando de retorno...")
-        self.eat("RETURN")
+        inicio = self.eat(TokenKind.RETURN)
         expressao_retorno = self.expressao()
-        self.eat("SEMICOLON")
-        self.parsing_steps.append("}")
+        self.eat(TokenKind.SEMICOLON)
         
-        return ASTNode("ComandoRetorno", children=[expressao_retorno])
+        return self.new_node("ComandoRetorno", children=[expressao_retorno], line=inicio.line, column=inicio.column)
 
     def comando_break(self):
-        self.parsing_steps.append("{")
-        self.parsing_steps.append("Analisando comando de break...")
-        self.eat("BREAK")
-        self.eat("SEMICOLON")
-        self.parsing_steps.append("}")
+        inicio = self.eat(TokenKind.BREAK)
+        self.eat(TokenKind.SEMICOLON)
         
-        return ASTNode("ComandoBreak")
+        return self.new_node("ComandoBreak", line=inicio.line, column=inicio.column)
 
     def expressao(self):
         return self.expressao_booleana()
 
     def expressao_booleana(self):
+        inicio = self.current_token()
         esquerda = self.expressao_aritmetica() 
-        while self.current_token().token_type in ["EQ", "NE", "GT", "GE", "LT", "LE"]:
-            operador = self.eat(self.current_token().token_type).value
+        while self.current_token().kind in RELATIONAL_OPERATORS:
+            operador = self.eat(self.current_token().kind).value
             direita = self.expressao_aritmetica()  
-            esquerda = ASTNode("ExpressaoBooleana", value=operador, children=[esquerda, direita])
+            esquerda = self.new_node("ExpressaoBooleana", value=operador, children=[esquerda, direita], line=inicio.line, column=inicio.column)
         return esquerda
 
     def expressao_aritmetica(self):
+        inicio = self.current_token()
         esquerda = self.termo()
-        while self.current_token().token_type in ["PLUS", "MINUS"]:
-            operador = self.eat(self.current_token().token_type).value
+        while self.current_token().kind in ADDITIVE_OPERATORS:
+            operador = self.eat(self.current_token().kind).value
             direita = self.termo()
-            esquerda = ASTNode("ExpressaoAritmetica", value=operador, children=[esquerda, direita])
+            esquerda = self.new_node("ExpressaoAritmetica", value=operador, children=[esquerda, direita], line=inicio.line, column=inicio.column)
         return esquerda
 
     def termo(self):
+        inicio = self.current_token()
         esquerda = self.fator()
-        while self.current_token().token_type in ["TIMES", "DIVIDE"]:
-            operador = self.eat(self.current_token().token_type).value
+        while self.current_token().kind in MULTIPLICATIVE_OPERATORS:
+            operador = self.eat(self.current_token().kind).value
             direita = self.fator()
-            esquerda = ASTNode("Termo", value=operador, children=[esquerda, direita])
+            esquerda = self.new_node("Termo", value=operador, children=[esquerda, direita], line=inicio.line, column=inicio.column)
         return esquerda
 
     def fator(self):
         current_token = self.current_token()
         
-        if current_token.token_type == "FUN":
-            self.eat("FUN")
+        if current_token.kind == TokenKind.FUN:
+            self.eat(TokenKind.FUN)
             return self.chamada_funcao()
         
-        elif current_token.token_type == "ID":
-            return ASTNode("ID", value=self.eat("ID").value)
+        elif current_token.kind == TokenKind.ID:
+            return self.new_node("ID", value=self.eat(TokenKind.ID).value, line=current_token.line, column=current_token.column)
         
-        elif current_token.token_type == "NUMBER":
-            return ASTNode("Numero", value=self.eat("NUMBER").value)
+        elif current_token.kind == TokenKind.NUMBER:
+            return self.new_node("Numero", value=self.eat(TokenKind.NUMBER).value, line=current_token.line, column=current_token.column)
         
-        elif current_token.token_type == "STRING":  
-            return ASTNode("String", value=self.eat("STRING").value)
+        elif current_token.kind == TokenKind.STRING:  
+            return self.new_node("String", value=self.eat(TokenKind.STRING).value, line=current_token.line, column=current_token.column)
         
-        elif current_token.token_type in ["TRUE", "FALSE"]:
-            return ASTNode("Booleano", value=self.eat(current_token.token_type).value)
+        elif current_token.kind in BOOLEAN_LITERALS:
+            return self.new_node("Booleano", value=self.eat(current_token.kind).value, line=current_token.line, column=current_token.column)
         
-        elif current_token.token_type == "LPAREN":
-            self.eat("LPAREN")
+        elif current_token.kind == TokenKind.LPAREN:
+            self.eat(TokenKind.LPAREN)
             expressao = self.expressao()
-            self.eat("RPAREN")
+            self.eat(TokenKind.RPAREN)
             return expressao
         
         else:
             raise SyntaxError(f"Esperado valor (ID, NUMBER, TRUE, FALSE, STRING ou expressão), mas encontrado {self.current_token().token_type} `{self.current_token().value}` na linha {current_token.line}")
 
+    # Despacho de declaracao_comando pelo tipo do token atual
+    COMANDOS = {
+        TokenKind.INT: declaracao_tipada,
+        TokenKind.BOOL: declaracao_tipada,
+        TokenKind.VOID: declaracao_procedimento,
+        TokenKind.ID: comando_identificador,
+        TokenKind.PRC: chamada_procedimento,
+        TokenKind.FUN: chamada_funcao,
+        TokenKind.IF: comando_condicional,
+        TokenKind.WHILE: comando_laco,
+        TokenKind.PRINT: comando_impressao,
+        TokenKind.BREAK: comando_break,
+        TokenKind.RETURN: comando_retorno,
+    }
+
 if __name__ == '__main__':
     code = '''
     int x, y, inteiro, elsewhen;
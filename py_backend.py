@@ -0,0 +1,241 @@
+import re
+import sys
+from functools import lru_cache
+from cfg import MAIN
+from tac_vm import TacRuntimeError, format_value, truncating_divide
+
+# Backend que traduz o programa (a AST já verificada pelo SemanticAnalyzer)
+# para código Python e o executa no próprio CPython: cada rotina vira uma
+# função Python, as variáveis viram variáveis locais (acesso rápido por
+# índice, como os quadros da TacVM) e `while`/`if` viram laços e condicionais
+# nativos. A saída, os erros de execução e as mensagens são os mesmos da
+# TacVM.
+#
+# Identificadores são prefixados para não colidirem com nomes do Python nem
+# com as funções auxiliares (que começam com `_`): variáveis com `v_`,
+# funções e procedimentos com `f_`.
+
+FILENAME = "<programa>"
+MAIN_FUNCTION = "_main"
+MAX_DEPTH = 10000  # o mesmo limite de chamadas aninhadas da TacVM
+
+# Precedência de cada operador no código gerado (maior = liga mais forte).
+# Divisão é uma chamada de função (truncada como em C), então não tem
+# precedência de operador
+COMPARISON = 1
+PRECEDENCE = {"+": 2, "-": 2, "*": 3, "==": COMPARISON, "!=": COMPARISON,
+              "<": COMPARISON, "<=": COMPARISON, ">": COMPARISON, ">=": COMPARISON}
+ATOM = 4
+
+BINARY_NODES = frozenset({"ExpressaoBooleana", "ExpressaoAritmetica", "Termo"})
+DECLARACOES = frozenset({"DeclaracaoFuncao", "DeclaracaoProcedimento"})
+
+def variable(name):
+    return f"v_{name}"
+
+def routine(name):
+    return f"f_{name}"
+
+class PythonTranslator:
+    def __init__(self, ast_root):
+        self.ast_root = ast_root
+        self.lines = []
+        self.routines = {}  # nome -> nó de declaração (inclusive as aninhadas)
+
+    def translate(self):
+        # Devolve o código Python do programa
+        self.collect_routines(self.ast_root)
+        self.routine(MAIN_FUNCTION, (), self.ast_root, None)
+        for name, node in self.routines.items():
+            if node.node_type == "DeclaracaoFuncao":
+                params, body = node.children[1:-1], node.children[-1]
+            else:
+                params, body = node.children[:-1], node.children[-1]
+            self.routine(routine(name), [variable(param.value) for param in params], body,
+                         name if node.node_type == "DeclaracaoFuncao" else None)
+        return "\n".join(self.lines) + "\n"
+
+    def collect_routines(self, root):
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            if node.node_type in DECLARACOES:
+                self.routines.setdefault(node.value, node)
+            stack.extend(reversed(node.children))
+
+    def routine(self, name, params, body, function):
+        # `function` é o nome da função (None em procedimentos e no nível
+        # superior): uma função que chega ao fim sem `return` é um erro
+        self.lines.append(f"def {name}({', '.join(params)}):")
+        start = len(self.lines)
+        self.block(body, 1, False)
+        if function is not None:
+            self.lines.append(f"    _missing_return({function!r})")
+        if len(self.lines) == start:
+            self.lines.append("    pass")
+
+    def block(self, node, depth, in_loop):
+        indent = "    " * depth
+        start = len(self.lines)
+        if node is not None:
+            self.statement(node, indent, depth, in_loop)
+        if len(self.lines) == start:
+            self.lines.append(f"{indent}pass")
+
+    def statement(self, node, indent, depth, in_loop):
+        node_type = node.node_type
+        if node_type == "ComandoAtribuicao":
+            self.lines.append(f"{indent}{variable(node.children[0].value)} = {self.expression(node.children[1])[0]}")
+        elif node_type == "ComandoImpressao":
+            self.lines.append(f"{indent}_write(_format({self.expression(node.children[0])[0]}))")
+        elif node_type == "ComandoLaco":
+            self.lines.append(f"{indent}while {self.expression(node.children[0])[0]}:")
+            self.block(node.children[1], depth + 1, True)
+        elif node_type == "ComandoCondicional":
+            self.lines.append(f"{indent}if {self.expression(node.children[0])[0]}:")
+            self.block(node.children[1], depth + 1, in_loop)
+            if len(node.children) == 3 and node.children[2] is not None:
+                self.lines.append(f"{indent}else:")
+                self.block(node.children[2], depth + 1, in_loop)
+        elif node_type == "ComandoBreak":
+            self.lines.append(f"{indent}break" if in_loop else f"{indent}_break_outside_loop()")
+        elif node_type == "ComandoRetorno":
+            self.lines.append(f"{indent}return {self.expression(node.children[0])[0]}")
+        elif node_type == "ChamadaProcedimento":
+            self.lines.append(f"{indent}{self.call(node)}")
+        elif node_type == "Programa" or node_type == "Bloco" or node_type == "BlocoComRetorno":
+            for child in node.children:
+                self.statement(child, indent, depth, in_loop)
+        elif node_type == "DeclaracaoVariavel" or node_type in DECLARACOES:
+            pass
+        else:
+            raise NotImplementedError(f"Node type {node_type} not implemented in Python backend")
+
+    def call(self, node):
+        args = ", ".join(self.expression(arg)[0] for arg in node.children)
+        if node.value not in self.routines:
+            return f"_undeclared({node.value!r})"
+        return f"{routine(node.value)}({args})"
+
+    def expression(self, node):
+        # Devolve (texto, precedência); só põe parênteses onde a precedência
+        # exige, para que cadeias longas como `a + b + c ...` não esbarrem no
+        # limite de parênteses aninhados do Python
+        node_type = node.node_type
+        if node_type in BINARY_NODES:
+            operator = node.value
+            left, left_precedence = self.expression(node.children[0])
+            right, right_precedence = self.expression(node.children[1])
+            if operator == "/":
+                return f"_div({left}, {right})", ATOM
+            precedence = PRECEDENCE[operator]
+            # Operadores associam à esquerda; comparações nunca são
+            # encadeadas (`a < b < c` tem outro sentido em Python)
+            if left_precedence < precedence or (precedence == COMPARISON and left_precedence == COMPARISON):
+                left = f"({left})"
+            if right_precedence <= precedence:
+                right = f"({right})"
+            return f"{left} {operator} {right}", precedence
+        if node_type == "Numero":
+            return str(int(node.value)), ATOM
+        if node_type == "ID":
+            return variable(node.value), ATOM
+        if node_type == "Booleano":
+            return ("True" if node.value == "true" else "False"), ATOM
+        if node_type == "String":
+            return repr(node.value.strip('"')), ATOM
+        if node_type == "ChamadaFuncao":
+            return self.call(node), ATOM
+        raise NotImplementedError(f"Node type {node_type} not implemented in Python backend")
+
+def translate(ast_root):
+    return PythonTranslator(ast_root).translate()
+
+@lru_cache(maxsize=128)
+def compile_source(source):
+    # Objeto de código do programa traduzido, guardado para as próximas
+    # execuções do mesmo programa
+    return compile(source, FILENAME, "exec")
+
+def load(ast_root):
+    # Objeto de código do programa, ou None se o programa não pode ser
+    # expresso em Python (aninhamento além dos limites do CPython, por exemplo)
+    try:
+        return compile_source(translate(ast_root))
+    except (SyntaxError, RecursionError, MemoryError):
+        return None
+
+def _missing_return(name):
+    raise TacRuntimeError(f"Função '{name}' terminou sem retornar um valor")
+
+def _break_outside_loop():
+    raise TacRuntimeError("'break' fora de um laço")
+
+def _undeclared(name):
+    raise TacRuntimeError(f"Rotina '{name}' não declarada")
+
+def failing_routine(traceback):
+    # Nome da rotina do programa onde a exceção aconteceu
+    name = MAIN
+    while traceback is not None:
+        code = traceback.tb_frame.f_code
+        if code.co_filename == FILENAME:
+            name = MAIN if code.co_name == MAIN_FUNCTION else code.co_name[2:]
+        traceback = traceback.tb_next
+    return name
+
+def run_code(code, write=None):
+    # Executa o objeto de código de `load`; devolve as linhas impressas
+    # (quando não há `write`). Erros de execução saem como TacRuntimeError,
+    # com as mesmas mensagens da TacVM
+    output = []
+    namespace = {
+        "_write": write if write is not None else output.append,
+        "_format": format_value,
+        "_div": truncating_divide,
+        "_missing_return": _missing_return,
+        "_break_outside_loop": _break_outside_loop,
+        "_undeclared": _undeclared,
+    }
+    exec(code, namespace)
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(limit, MAX_DEPTH + 100))
+    try:
+        namespace[MAIN_FUNCTION]()
+    except TacRuntimeError as e:
+        raise TacRuntimeError(f"Erro de execução em '{failing_routine(e.__traceback__)}': {e}") from None
+    except NameError as e:
+        # Variável lida antes de ser atribuída (local não associada ou, numa
+        # função, nome que só existe fora dela)
+        match = re.search(r"'v_(\w+)'", str(e))
+        name = match.group(1) if match else str(e)
+        raise TacRuntimeError(f"Erro de execução em '{failing_routine(e.__traceback__)}': Variável '{name}' lida antes de ser atribuída") from None
+    except RecursionError as e:
+        name = failing_routine(e.__traceback__)
+        raise TacRuntimeError(f"Erro de execução em '{name}': Estouro da pilha de chamadas em '{name}'") from None
+    except TypeError as e:
+        raise TacRuntimeError(f"Erro de execução em '{failing_routine(e.__traceback__)}': operação com tipos incompatíveis") from None
+    except ValueError as e:
+        raise TacRuntimeError(f"Erro de execução em '{failing_routine(e.__traceback__)}': {e}") from None
+    finally:
+        sys.setrecursionlimit(limit)
+    return output
+
+if __name__ == '__main__':
+    from compiler import Compiler
+
+    path = sys.argv[1] if len(sys.argv) > 1 else "tests/codigo_1.txt"
+    with open(path) as file:
+        result = Compiler(file.read(), quiet=True).compile()
+    for diagnostic in result.diagnostics:
+        print(diagnostic)
+    if result.ast is not None:
+        print(translate(result.ast))
+        code = load(result.ast)
+        if code is not None:
+            try:
+                run_code(code, write=print)
+            except TacRuntimeError as e:
+                print(e)
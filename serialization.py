@@ -0,0 +1,517 @@
+from ast_node import ASTNode, NODE_TYPES, NodeKind
+from tac_ir import Op, TacProgram
+
+# Formato binário para guardar e transportar a AST (saída do Parser) e o
+# código de três endereços (saída do ThreeAddressCodeGenerator) sem refazer o
+# léxico e o parser nem serializar grafos de objetos com pickle.
+#
+# Os dois artefatos têm o mesmo layout; todos os inteiros são varints
+# (7 bits por byte, o bit alto indica que há mais bytes):
+#   - assinatura (4 bytes: AST_MAGIC ou TAC_MAGIC) e versão do formato;
+#   - tabela de textos: quantidade e, para cada texto, o tamanho em bytes e
+#     o UTF-8. Nomes, números e operadores aparecem uma vez só; o resto do
+#     arquivo se refere a eles pelo índice;
+#   - cabeçalho próprio do artefato (posição do Programa na AST, tabela de
+#     rótulos no código de três endereços);
+#   - índice das unidades: para cada uma, o nome (índice do texto + 1, ou 0
+#     quando não é uma função/procedimento), a posição e o tamanho em bytes
+#     e quantos itens (nós ou instruções) ela tem;
+#   - as unidades, uma depois da outra.
+# Uma unidade é uma declaração ou comando de nível superior (na AST) ou um
+# trecho contínuo do código de nível superior ou de uma rotina (no código de
+# três endereços), então os leitores (AstReader, TacReader) decodificam uma
+# função sem tocar no resto do arquivo.
+
+AST_MAGIC = b"ASTB"
+TAC_MAGIC = b"TACB"
+FORMAT_VERSION = 1
+
+DECLARACOES = frozenset({NodeKind.DeclaracaoFuncao, NodeKind.DeclaracaoProcedimento})
+
+# Forma do valor de um nó, nos 2 bits baixos do cabeçalho do nó
+NO_VALUE = 0
+TEXT_VALUE = 1
+NODE_VALUE = 2  # o Tipo de uma DeclaracaoVariavel, gravado logo em seguida
+
+# Tipo de um operando de instrução, nos 2 bits baixos do seu código
+NONE_OR_TUPLE = 0  # resto 0: None; resto n > 0: tupla com n - 1 operandos
+INTEGER = 1        # temporário ou rótulo
+TEXT = 2           # variável ou literal
+MULTIBYTE = object()  # na tabela de operandos de um byte: ler o código inteiro
+# Instruções cujo `right` é uma tupla (parâmetros ou argumentos); nas demais
+# e nos outros operandos, uma tupla é sinal de dados corrompidos
+TUPLE_OPS = frozenset({Op.FUNC_BEGIN, Op.PROC_BEGIN, Op.CALL, Op.CALL_PROC})
+
+class SerializationError(ValueError):
+    pass
+
+def write_varint(buffer, value):
+    while value >= 0x80:
+        buffer.append(value & 0x7F | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+def read_varint(data, position):
+    # Devolve (valor, posição seguinte)
+    byte = data[position]
+    value = byte & 0x7F
+    shift = 7
+    position += 1
+    while byte >= 0x80:
+        byte = data[position]
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        position += 1
+    return value, position
+
+class StringTable:
+    # Textos distintos do artefato, na ordem em que aparecem
+    def __init__(self):
+        self.indexes = {}
+        self.strings = []
+
+    def index(self, text):
+        index = self.indexes.get(text)
+        if index is None:
+            index = self.indexes[text] = len(self.strings)
+            self.strings.append(text)
+        return index
+
+def pack(magic, strings, header, units):
+    # Junta as partes do artefato; `units` tem (índice do nome + 1 ou 0,
+    # bytes da unidade, número de itens)
+    out = bytearray(magic)
+    write_varint(out, FORMAT_VERSION)
+    write_varint(out, len(strings.strings))
+    for text in strings.strings:
+        encoded = text.encode("utf-8")
+        write_varint(out, len(encoded))
+        out += encoded
+    out += header
+    write_varint(out, len(units))
+    offset = 0
+    for name, payload, items in units:
+        write_varint(out, name)
+        write_varint(out, offset)
+        write_varint(out, len(payload))
+        write_varint(out, items)
+        offset += len(payload)
+    for _, payload, _ in units:
+        out += payload
+    return bytes(out)
+
+class ArtifactReader:
+    # Lê a tabela de textos e o índice; as unidades só são decodificadas
+    # quando pedidas
+    MAGIC = None
+    DESCRIPTION = None
+
+    def __init__(self, data):
+        self.data = data
+        if bytes(data[:4]) != self.MAGIC:
+            raise SerializationError(f"Os dados não são {self.DESCRIPTION} serializado")
+        try:
+            version, position = read_varint(data, 4)
+            if version != FORMAT_VERSION:
+                raise SerializationError(f"Versão {version} do formato não suportada (esperada {FORMAT_VERSION})")
+            count, position = read_varint(data, position)
+            self.strings = []
+            for _ in range(count):
+                size, position = read_varint(data, position)
+                self.strings.append(bytes(data[position:position + size]).decode("utf-8"))
+                position += size
+            position = self.read_header(position)
+            count, position = read_varint(data, position)
+            units = []
+            for _ in range(count):
+                name, position = read_varint(data, position)
+                offset, position = read_varint(data, position)
+                size, position = read_varint(data, position)
+                items, position = read_varint(data, position)
+                units.append((self.strings[name - 1] if name else None, offset, size, items))
+        except (IndexError, UnicodeDecodeError):
+            raise SerializationError(f"{self.DESCRIPTION.capitalize()} serializado está truncado ou corrompido") from None
+        # (nome, início, fim, itens) de cada unidade
+        self.units = [(name, position + offset, position + offset + size, items) for name, offset, size, items in units]
+        if self.units and self.units[-1][2] > len(data):
+            raise SerializationError(f"{self.DESCRIPTION.capitalize()} serializado está truncado ou corrompido")
+        self.names = {}
+        for index, (name, _, _, _) in enumerate(self.units):
+            if name is not None:
+                self.names.setdefault(name, index)
+
+    def read_header(self, position):
+        return position
+
+    def __len__(self):
+        return len(self.units)
+
+    def functions(self):
+        # Nomes das funções e procedimentos, na ordem do programa
+        return list(self.names)
+
+    def unit_index(self, name):
+        index = self.names.get(name)
+        if index is None:
+            raise KeyError(f"Rotina '{name}' não está no artefato")
+        return index
+
+    def decode(self, index, *args):
+        _, start, end, _ = self.units[index]
+        try:
+            return self.decode_unit(start, end, *args)
+        except (IndexError, ValueError) as e:
+            if isinstance(e, SerializationError):
+                raise
+            raise SerializationError(f"{self.DESCRIPTION.capitalize()} serializado está truncado ou corrompido") from None
+
+# --- AST --------------------------------------------------------------------
+
+def encode_node(node, strings, out):
+    # Grava `node` em pré-ordem, sem recursão. Cada nó: cabeçalho
+    # ((tipo + 1) << 2 | forma do valor; 0 é um filho None), o texto do valor
+    # (se houver), a linha (diferença para a linha do nó anterior, em
+    # zigzag, + 1; 0 sem posição), a coluna + 1, o número de filhos, o nó do
+    # valor (se houver) e os filhos
+    count = 0
+    previous_line = 0
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node is None:
+            out.append(0)
+            continue
+        count += 1
+        value = node.value
+        children = node.children
+        if value is None:
+            mode = NO_VALUE
+        elif isinstance(value, str):
+            mode = TEXT_VALUE
+        elif hasattr(value, "kind"):
+            mode = NODE_VALUE
+        else:
+            raise SerializationError(f"Valor de nó não serializável: {value!r}")
+        write_varint(out, (node.kind + 1) << 2 | mode)
+        if mode == TEXT_VALUE:
+            write_varint(out, strings.index(value))
+        line = node.line
+        if line is None:
+            out.append(0)
+        else:
+            delta = line - previous_line
+            write_varint(out, ((delta << 1) if delta >= 0 else ((-delta << 1) - 1)) + 1)
+            previous_line = line
+        column = node.column
+        write_varint(out, 0 if column is None else column + 1)
+        write_varint(out, len(children))
+        stack.extend(reversed(children))
+        if mode == NODE_VALUE:
+            stack.append(value)
+    return count
+
+def dump_ast(root):
+    # Bytes da AST inteira (um Programa de ASTNode ou de ast_arena.ArenaNode)
+    strings = StringTable()
+    units = []
+    for node in root.children:
+        payload = bytearray()
+        items = encode_node(node, strings, payload)
+        name = 0
+        if node is not None and node.kind in DECLARACOES:
+            name = strings.index(node.value) + 1
+        units.append((name, payload, items))
+    header = bytearray()
+    write_varint(header, 0 if root.line is None else root.line + 1)
+    write_varint(header, 0 if root.column is None else root.column + 1)
+    return pack(AST_MAGIC, strings, header, units)
+
+class AstReader(ArtifactReader):
+    # Com `arena` (uma ast_arena.ASTArena), os nós decodificados vão para a
+    # arena em vez de virarem objetos ASTNode
+    MAGIC = AST_MAGIC
+    DESCRIPTION = "uma AST"
+
+    def read_header(self, position):
+        line, position = read_varint(self.data, position)
+        column, position = read_varint(self.data, position)
+        self.line = line - 1 if line else None
+        self.column = column - 1 if column else None
+        return position
+
+    def unit(self, index, arena=None):
+        # Declaração ou comando de nível superior número `index`
+        node = self.decode(index, arena)
+        return arena.node(node) if arena is not None else node
+
+    def function(self, name, arena=None):
+        # Declaração da função ou procedimento `name`, decodificando só ela
+        return self.unit(self.unit_index(name), arena)
+
+    def load(self, arena=None):
+        # O Programa inteiro
+        children = [self.decode(index, arena) for index in range(len(self.units))]
+        new_node = ASTNode if arena is None else arena.add
+        root = new_node("Programa", children=children, line=self.line, column=self.column)
+        return arena.node(root) if arena is not None else root
+
+    def decode_unit(self, position, end, arena):
+        data = self.data
+        strings = self.strings
+        node_types = NODE_TYPES
+        new_node = ASTNode if arena is None else arena.add
+        previous_line = 0
+        # Nós abertos: [tipo, valor, linha, coluna, itens lidos, itens
+        # esperados, valor é um nó]; os itens são o nó do valor e os filhos
+        frames = []
+        while True:
+            header = data[position]
+            if header < 0x80:
+                position += 1
+            else:
+                header, position = read_varint(data, position)
+            if header == 0:
+                item = None
+            else:
+                node_type = node_types[(header >> 2) - 1]
+                mode = header & 3
+                value = None
+                if mode == TEXT_VALUE:
+                    value, position = read_varint(data, position)
+                    value = strings[value]
+                # Varints de um byte (quase todos) são lidos direto
+                line = data[position]
+                if line < 0x80:
+                    position += 1
+                else:
+                    line, position = read_varint(data, position)
+                if line:
+                    delta = line - 1
+                    previous_line += (delta >> 1) if not delta & 1 else -((delta + 1) >> 1)
+                    line = previous_line
+                else:
+                    line = None
+                column = data[position]
+                if column < 0x80:
+                    position += 1
+                else:
+                    column, position = read_varint(data, position)
+                column = column - 1 if column else None
+                count = data[position]
+                if count < 0x80:
+                    position += 1
+                else:
+                    count, position = read_varint(data, position)
+                if mode == NODE_VALUE:
+                    count += 1
+                if count:
+                    frames.append([node_type, value, line, column, [], count, mode == NODE_VALUE])
+                    continue
+                item = new_node(node_type, value, None, line, column)
+            # Entrega o item ao nó aberto; fecha os nós que ficaram completos
+            while True:
+                if not frames:
+                    if position != end:
+                        raise SerializationError("Unidade da AST com bytes sobrando")
+                    return item
+                frame = frames[-1]
+                items = frame[4]
+                items.append(item)
+                if len(items) < frame[5]:
+                    break
+                frames.pop()
+                node_type, value, line, column, _, _, node_value = frame
+                if node_value:
+                    value = items[0]
+                    items = items[1:]
+                item = new_node(node_type, value, items, line, column)
+
+def load_ast(data, arena=None):
+    return AstReader(data).load(arena)
+
+# --- Código de três endereços --------------------------------------------------
+
+def encode_operand(operand, strings, out):
+    if operand is None:
+        out.append(0)
+    elif type(operand) is int:
+        if operand < 0:
+            raise SerializationError(f"Operando inteiro negativo: {operand}")
+        write_varint(out, operand << 2 | INTEGER)
+    elif type(operand) is str:
+        write_varint(out, strings.index(operand) << 2 | TEXT)
+    elif type(operand) is tuple:
+        write_varint(out, (len(operand) + 1) << 2 | NONE_OR_TUPLE)
+        for item in operand:
+            encode_operand(item, strings, out)
+    else:
+        raise SerializationError(f"Operando não serializável: {operand!r}")
+
+def tac_units(instructions):
+    # (nome da rotina ou None, início, fim) de cada trecho: código de nível
+    # superior entre rotinas, ou uma rotina de nível superior inteira (com
+    # as rotinas aninhadas nela)
+    units = []
+    start = 0
+    depth = 0
+    for index, (op, _, left, _) in enumerate(instructions):
+        if op == Op.FUNC_BEGIN or op == Op.PROC_BEGIN:
+            if depth == 0:
+                if index > start:
+                    units.append((None, start, index))
+                start = index
+            depth += 1
+        elif op == Op.FUNC_END or op == Op.PROC_END:
+            depth -= 1
+            if depth == 0:
+                units.append((instructions[start][2], start, index + 1))
+                start = index + 1
+    if start < len(instructions):
+        units.append((None, start, len(instructions)))
+    return units
+
+def dump_tac(program):
+    # Bytes de um TacProgram. Cada instrução: opcode e os três operandos
+    # (código do operando: valor << 2 | tipo)
+    strings = StringTable()
+    instructions = program.instructions
+    units = []
+    for name, start, end in tac_units(instructions):
+        payload = bytearray()
+        for index in range(start, end):
+            op, result, left, right = instructions[index]
+            payload.append(op)
+            encode_operand(result, strings, payload)
+            encode_operand(left, strings, payload)
+            encode_operand(right, strings, payload)
+        units.append((0 if name is None else strings.index(name) + 1, payload, end - start))
+    header = bytearray()
+    write_varint(header, len(program.labels))
+    for label, kind in program.labels.items():
+        write_varint(header, label)
+        write_varint(header, kind)
+    return pack(TAC_MAGIC, strings, header, units)
+
+class TacReader(ArtifactReader):
+    MAGIC = TAC_MAGIC
+    DESCRIPTION = "um código de três endereços"
+
+    def read_header(self, position):
+        data = self.data
+        self.operands = None  # tabela de one_byte_operands, feita na primeira decodificação
+        count, position = read_varint(data, position)
+        self.labels = {}
+        for _ in range(count):
+            label, position = read_varint(data, position)
+            kind, position = read_varint(data, position)
+            self.labels[label] = kind
+        return position
+
+    def one_byte_operands(self):
+        # Operando de cada código de um byte (os mais comuns); MULTIBYTE
+        # onde é preciso ler mais (tuplas e textos fora da tabela)
+        operands = []
+        for code in range(0x80):
+            kind = code & 3
+            if kind == TEXT and code >> 2 < len(self.strings):
+                operands.append(self.strings[code >> 2])
+            elif kind == INTEGER:
+                operands.append(code >> 2)
+            elif code == 0:
+                operands.append(None)
+            else:
+                operands.append(MULTIBYTE)
+        return operands
+
+    def function(self, name):
+        # TacProgram só com a rotina `name` (e as aninhadas nela) e os seus rótulos
+        instructions = self.decode(self.unit_index(name))
+        labels = self.labels
+        used = {left: labels[left] for op, _, left, _ in instructions if op == Op.LABEL and left in labels}
+        return TacProgram(instructions, used)
+
+    def load(self):
+        instructions = []
+        for index in range(len(self.units)):
+            instructions.extend(self.decode(index))
+        return TacProgram(instructions, dict(self.labels))
+
+    def decode_unit(self, position, end):
+        data = self.data
+        if self.operands is None:
+            self.operands = self.one_byte_operands()
+        table = self.operands
+        read_operand = self.read_operand
+        instructions = []
+        append = instructions.append
+        while position < end:
+            op = data[position]
+            if op > Op.GE:
+                raise SerializationError(f"Opcode desconhecido no código de três endereços: {op}")
+            result = table[data[position + 1]] if data[position + 1] < 0x80 else MULTIBYTE
+            if result is MULTIBYTE:
+                result, position = read_operand(position + 1)
+            else:
+                position += 2
+            left = table[data[position]] if data[position] < 0x80 else MULTIBYTE
+            if left is MULTIBYTE:
+                left, position = read_operand(position)
+            else:
+                position += 1
+            right = table[data[position]] if data[position] < 0x80 else MULTIBYTE
+            if right is MULTIBYTE:
+                right, position = read_operand(position, op in TUPLE_OPS)
+            else:
+                position += 1
+            append((op, result, left, right))
+        if position != end:
+            raise SerializationError("Unidade do código de três endereços com bytes sobrando")
+        return instructions
+
+    def read_operand(self, position, tuple_allowed=False):
+        # Devolve (operando, posição seguinte)
+        code, position = read_varint(self.data, position)
+        kind = code & 3
+        if kind == TEXT:
+            return self.strings[code >> 2], position
+        if kind == INTEGER:
+            return code >> 2, position
+        if code == 0:
+            return None, position
+        if kind != NONE_OR_TUPLE or not tuple_allowed:
+            raise SerializationError(f"Operando inválido no código de três endereços (código {code})")
+        # Tupla (argumentos de chamada, parâmetros) com code >> 2 - 1 itens
+        items = []
+        for _ in range((code >> 2) - 1):
+            item, position = self.read_operand(position)
+            items.append(item)
+        return tuple(items), position
+
+def load_tac(data):
+    return TacReader(data).load()
+
+if __name__ == '__main__':
+    import pickle
+    import sys
+    import time
+    from compiler import Compiler
+
+    path = sys.argv[1] if len(sys.argv) > 1 else "tests/codigo_1.txt"
+    with open(path) as file:
+        result = Compiler(file.read(), quiet=True).compile()
+    for diagnostic in result.diagnostics:
+        print(diagnostic)
+    if result.success:
+        for description, value, dump, load in (("AST", result.ast, dump_ast, load_ast),
+                                               ("TAC", result.tac, dump_tac, load_tac)):
+            start = time.perf_counter()
+            data = dump(value)
+            loaded = load(data)
+            elapsed = time.perf_counter() - start
+            same = loaded.pretty_print() == value.pretty_print() if description == "AST" else loaded == value
+            print(f"{description}: {len(data)} bytes (pickle: {len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))} bytes), "
+                  f"ida e volta em {elapsed * 1000:.2f} ms, {'igual' if same else 'DIFERENTE'}")
+        reader = TacReader(dump_tac(result.tac))
+        for name in reader.functions():
+            print(f"\n{name}:")
+            print(reader.function(name))
@@ -0,0 +1,20 @@
+import mmap
+import os
+import stat
+from contextlib import contextmanager
+
+@contextmanager
+def open_source(path):
+    # Abre o código fonte como um buffer de bytes mapeado em memória, sem
+    # criar uma cópia do arquivo inteiro em uma str. O Lexer lê esse buffer
+    # diretamente, então não existe problema de tokens cortados entre blocos.
+    with open(path, "rb") as file:
+        info = os.fstat(file.fileno())
+        if not stat.S_ISREG(info.st_mode) or info.st_size == 0:
+            # Arquivos vazios, pipes e arquivos especiais não podem ser mapeados
+            yield file.read()
+            return
+        # O mapeamento não é fechado na saída do `with`: o TokenBuffer do
+        # resultado guarda só as posições dos tokens e lê os valores dele, então
+        # o mmap é liberado quando a última referência (o buffer) deixa de existir
+        yield mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
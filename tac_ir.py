@@ -0,0 +1,184 @@
+# Representação estruturada do código de três endereços. Cada instrução é
+# uma tupla (opcode, result, left, right): tuplas custam bem menos para
+# criar que objetos, e o gerador cria milhões delas. Comentários e
+# indentação do formato textual não ficam nas instruções; são derivados na
+# hora de imprimir, a partir das instruções e da tabela de rótulos
+# (`TacProgram.labels`).
+# A única instrução que existe só para o texto é CALL_START, que marca onde
+# começam os argumentos de uma chamada de procedimento.
+#
+# Operandos:
+#   - int: temporário (impresso como `tN`);
+#   - str: nome de variável ou literal como aparece no código (`10`,
+#     `true`, `"texto"`).
+# Rótulos são números (impressos como `LN`).
+
+class Op:
+    FUNC_BEGIN = 0   # left=nome, right=nomes dos parâmetros
+    FUNC_END = 1     # left=nome
+    PROC_BEGIN = 2   # left=nome, right=nomes dos parâmetros
+    PROC_END = 3     # left=nome
+    ASSIGN = 4       # result = left
+    PRINT = 5        # print left
+    LABEL = 6        # left=rótulo
+    GOTO = 7         # goto left
+    IF_FALSE = 8     # if left == false goto right
+    BREAK = 9        # goto left (fim do laço mais interno; None fora de laço)
+    CALL = 10        # result = call left, *right
+    CALL_PROC = 11   # call left, *right
+    RETURN = 12      # return left
+    # Início dos argumentos de uma chamada de procedimento (left=nome); não
+    # executa nada, só delimita o trecho comentado no texto
+    CALL_START = 13
+    # Operações binárias: result = left <op> right
+    ADD = 14
+    SUB = 15
+    MUL = 16
+    DIV = 17
+    EQ = 18
+    NE = 19
+    LT = 20
+    LE = 21
+    GT = 22
+    GE = 23
+
+OP_NAMES = tuple(name for name, value in sorted(
+    ((name, value) for name, value in vars(Op).items() if not name.startswith("_")),
+    key=lambda item: item[1],
+))
+
+BINARY_OPS = {
+    "+": Op.ADD, "-": Op.SUB, "*": Op.MUL, "/": Op.DIV,
+    "==": Op.EQ, "!=": Op.NE, "<": Op.LT, "<=": Op.LE, ">": Op.GT, ">=": Op.GE,
+}
+OPERATOR_SYMBOLS = {op: symbol for symbol, op in BINARY_OPS.items()}
+
+# Tipo de cada rótulo, guardado em TacProgram.labels; vira o comentário da linha
+class LabelKind:
+    LOOP_START = 0
+    LOOP_END = 1
+    ELSE = 2
+    IF_END = 3
+
+LABEL_NOTES = (
+    "Início do laço 'while'",
+    "Fim do laço 'while'",
+    "Bloco 'else'",
+    "Fim do if-else",
+)
+
+def instruction_text(ins):
+    # Forma legível de uma instrução, para depuração
+    op, result, left, right = ins
+    return f"{OP_NAMES[op]} {result!r} {left!r} {right!r}"
+
+def is_value(operand):
+    # Temporário ou variável (o que pode ser lido e escrito), ao contrário
+    # de literais
+    if type(operand) is int:
+        return True
+    return operand is not None and (operand[0].isalpha() or operand[0] == "_") and operand != "true" and operand != "false"
+
+def instruction_uses(ins):
+    # Temporários e variáveis lidos pela instrução
+    op, result, left, right = ins
+    if op >= Op.ADD:
+        return [operand for operand in (left, right) if is_value(operand)]
+    if op == Op.ASSIGN or op == Op.PRINT or op == Op.RETURN or op == Op.IF_FALSE:
+        return [left] if is_value(left) else []
+    if op == Op.CALL or op == Op.CALL_PROC:
+        return [arg for arg in right if is_value(arg)]
+    return []
+
+def instruction_def(ins):
+    # Temporário ou variável escrito pela instrução, ou None
+    op = ins[0]
+    if op >= Op.ADD or op == Op.ASSIGN or op == Op.CALL:
+        return ins[1]
+    return None
+
+def operand_text(operand):
+    if type(operand) is int:
+        return f"t{operand}"
+    return f"{operand}"
+
+class TacProgram:
+    def __init__(self, instructions=None, labels=None):
+        self.instructions = instructions if instructions is not None else []
+        self.labels = labels if labels is not None else {}  # rótulo -> LabelKind
+
+    def emit(self, op, result=None, left=None, right=None):
+        self.instructions.append((op, result, left, right))
+
+    def extend(self, other):
+        self.instructions.extend(other.instructions)
+        self.labels.update(other.labels)
+
+    def __len__(self):
+        return len(self.instructions)
+
+    def __iter__(self):
+        return iter(self.instructions)
+
+    def __eq__(self, other):
+        return isinstance(other, TacProgram) and self.instructions == other.instructions and self.labels == other.labels
+
+    def render(self):
+        return list(render_lines(self))
+
+    def __str__(self):
+        return "\n".join(render_lines(self))
+
+def render_lines(program):
+    # Produz o formato textual histórico, uma linha (ou comentário) por vez:
+    # quatro espaços por nível de função e comentários de início/fim
+    labels = program.labels
+    depth = 0
+    for op, result, left, right in program.instructions:
+        if op == Op.FUNC_END or op == Op.PROC_END:
+            depth -= 1
+        indent = "    " * depth
+        if op >= Op.ADD:
+            yield f"{indent}{operand_text(result)} = {operand_text(left)} {OPERATOR_SYMBOLS[op]} {operand_text(right)}"
+        elif op == Op.ASSIGN:
+            yield f"{indent}{result} = {operand_text(left)}"
+        elif op == Op.LABEL:
+            kind = labels.get(left)
+            if kind is None:
+                yield f"{indent}L{left}:"
+            else:
+                blank = "\n" if kind == LabelKind.LOOP_START else ""
+                yield f"{blank}{indent}L{left}:  # {LABEL_NOTES[kind]}"
+        elif op == Op.IF_FALSE:
+            # O `if` do if-else vem separado por uma linha em branco; o do while não
+            blank = "\n" if labels.get(right) == LabelKind.ELSE else ""
+            yield f"{blank}{indent}if {operand_text(left)} == false goto L{right}"
+        elif op == Op.GOTO:
+            yield f"{indent}goto L{left}"
+        elif op == Op.PRINT:
+            yield f"{indent}print {operand_text(left)}"
+        elif op == Op.CALL:
+            yield f"{indent}{operand_text(result)} = call {left}, {', '.join(map(operand_text, right))}"
+        elif op == Op.CALL_START:
+            yield f"\n{indent}# Início da chamada de '{left}'"
+        elif op == Op.CALL_PROC:
+            yield f"{indent}call {left}, {', '.join(map(operand_text, right))}"
+            yield f"{indent}# Fim da chamada de '{left}'"
+        elif op == Op.RETURN:
+            yield f"{indent}return {operand_text(left)}"
+        elif op == Op.BREAK:
+            yield f"{indent}break" if left is None else f"{indent}goto L{left}  # break"
+        elif op == Op.FUNC_BEGIN:
+            yield f"\n{indent}# Início da função '{left}'"
+            yield f"{indent}function {left} begin"
+            depth += 1
+        elif op == Op.PROC_BEGIN:
+            yield f"\n{indent}# Início do procedimento '{left}'"
+            yield f"{indent}procedure {left} begin"
+            depth += 1
+        elif op == Op.FUNC_END:
+            yield f"{indent}function {left} end"
+        elif op == Op.PROC_END:
+            yield f"{indent}procedure {left} end"
+        else:
+            raise ValueError(f"Opcode desconhecido: {op}")
@@ -0,0 +1,299 @@
+import operator
+import time
+from cfg import MAIN, routine_segments
+from optimizer import divide, literal_value
+from tac_ir import Op
+
+# Máquina virtual que executa o código de três endereços (tac_ir.TacProgram).
+# Antes de executar, cada rotina (o nível superior e cada função ou
+# procedimento) é carregada uma única vez: os rótulos viram posições no
+# código da rotina, as chamadas apontam direto para a rotina chamada e cada
+# operando vira um índice no quadro (frame) da rotina -- uma lista com
+# parâmetros, variáveis, temporários e constantes. Nada é procurado por nome
+# durante a execução.
+#
+# Como na análise semântica, uma função só enxerga os seus parâmetros e
+# variáveis locais; o nível superior tem as variáveis globais.
+
+class TacRuntimeError(RuntimeError):
+    pass
+
+class _Unset:
+    # Valor de uma variável ainda não atribuída
+    def __repr__(self):
+        return "<não atribuída>"
+
+UNSET = _Unset()
+
+def truncating_divide(left, right):
+    if right == 0:
+        raise TacRuntimeError("Divisão por zero")
+    return divide(left, right)
+
+# Função de cada operação binária, indexada pelo opcode
+BINARY_FUNCTIONS = [None] * (Op.GE + 1)
+BINARY_FUNCTIONS[Op.ADD] = operator.add
+BINARY_FUNCTIONS[Op.SUB] = operator.sub
+BINARY_FUNCTIONS[Op.MUL] = operator.mul
+BINARY_FUNCTIONS[Op.DIV] = truncating_divide
+BINARY_FUNCTIONS[Op.EQ] = operator.eq
+BINARY_FUNCTIONS[Op.NE] = operator.ne
+BINARY_FUNCTIONS[Op.LT] = operator.lt
+BINARY_FUNCTIONS[Op.LE] = operator.le
+BINARY_FUNCTIONS[Op.GT] = operator.gt
+BINARY_FUNCTIONS[Op.GE] = operator.ge
+
+def constant_value(operand):
+    # Valor de um literal do código: int, bool ou texto (sem as aspas)
+    value = literal_value(operand)
+    if value is not None:
+        return value
+    return operand.strip('"')
+
+def format_value(value):
+    # Texto impresso por `print`
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    return str(value)
+
+class Routine:
+    # Uma rotina carregada: código com operandos resolvidos para índices do
+    # quadro e o quadro inicial (parâmetros e variáveis não atribuídos,
+    # constantes já no lugar)
+    __slots__ = ("name", "is_function", "params", "code", "template", "names",
+                 "calls", "instructions", "time")
+
+    def __init__(self, name, is_function, params):
+        self.name = name
+        self.is_function = is_function
+        self.params = params
+        self.code = []
+        self.template = []
+        self.names = []  # nome de cada posição do quadro, para as mensagens de erro
+        self.calls = 0
+        self.instructions = 0
+        self.time = 0.0
+
+class TacVM:
+    def __init__(self, program, write=None, max_steps=None, max_depth=10000):
+        # `write` recebe cada linha impressa; por padrão as linhas ficam em
+        # `self.output`. `max_steps` limita o número de instruções executadas
+        self.program = program
+        self.output = []
+        self.write = write if write is not None else self.output.append
+        self.max_steps = max_steps
+        self.max_depth = max_depth
+        self.steps = 0
+        self.routines = {}
+        self.load()
+
+    def load(self):
+        instructions = self.program.instructions
+        headers = {}  # nome da rotina -> (é função, parâmetros)
+        for op, _, left, right in instructions:
+            if op == Op.FUNC_BEGIN or op == Op.PROC_BEGIN:
+                headers[left] = (op == Op.FUNC_BEGIN, right or ())
+        segments = routine_segments(self.program)
+        for name, ranges in segments.items():
+            is_function, params = headers.get(name, (False, ()))
+            self.routines[name] = Routine(name, is_function, params)
+        for name, ranges in segments.items():
+            self.load_routine(self.routines[name], [instructions[index] for start, end in ranges for index in range(start, end)])
+
+    def load_routine(self, routine, instructions):
+        slots = {}
+        template = routine.template
+        names = routine.names
+        variables = set()  # posições de variáveis (lidas com verificação)
+
+        def slot(operand):
+            index = slots.get(operand)
+            if index is None:
+                index = len(template)
+                slots[operand] = index
+                if type(operand) is int:
+                    template.append(UNSET)
+                    names.append(f"t{operand}")
+                elif operand[0].isalpha() or operand[0] == "_":
+                    if operand == "true" or operand == "false":
+                        template.append(operand == "true")
+                    else:
+                        template.append(UNSET)
+                        variables.add(index)
+                    names.append(operand)
+                else:
+                    template.append(constant_value(operand))
+                    names.append(operand)
+            return index
+
+        for param in routine.params:
+            slot(param)
+        variables.clear()  # parâmetros sempre têm valor
+
+        def checks(*indexes):
+            return tuple(index for index in indexes if index in variables)
+
+        # Primeira passada: posição de cada rótulo no código da rotina
+        targets = {}
+        position = 0
+        for op, _, left, _ in instructions:
+            if op == Op.LABEL:
+                targets[left] = position
+            elif op != Op.CALL_START:
+                position += 1
+
+        code = routine.code
+        for op, result, left, right in instructions:
+            if op >= Op.ADD:
+                left_slot, right_slot = slot(left), slot(right)
+                code.append((op, slot(result), left_slot, right_slot, checks(left_slot, right_slot)))
+            elif op == Op.ASSIGN:
+                source = slot(left)
+                code.append((op, slot(result), source, None, checks(source)))
+            elif op == Op.PRINT or op == Op.RETURN:
+                source = slot(left)
+                code.append((op, None, source, None, checks(source)))
+            elif op == Op.IF_FALSE:
+                condition = slot(left)
+                code.append((op, None, condition, targets[right], checks(condition)))
+            elif op == Op.GOTO:
+                code.append((op, None, targets[left], None, ()))
+            elif op == Op.BREAK:
+                if left is None:
+                    code.append((op, None, None, None, ()))
+                else:
+                    code.append((Op.GOTO, None, targets[left], None, ()))
+            elif op == Op.CALL or op == Op.CALL_PROC:
+                args = tuple(slot(arg) for arg in right)
+                target = slot(result) if op == Op.CALL else None
+                # Nome não resolvido (chamada de rotina inexistente) só é
+                # erro se a chamada for executada
+                callee = self.routines.get(left, left)
+                code.append((op, target, callee, args, checks(*args)))
+        # Fim da rotina: retorno sem valor
+        code.append((Op.PROC_END, None, None, None, ()))
+
+    def run(self):
+        # Executa o programa a partir do nível superior; devolve as linhas
+        # impressas (quando não há `write`)
+        functions = BINARY_FUNCTIONS
+        # Opcodes em variáveis locais: evita procurar `Op.X` a cada instrução
+        ADD, ASSIGN, IF_FALSE, GOTO, PRINT = Op.ADD, Op.ASSIGN, Op.IF_FALSE, Op.GOTO, Op.PRINT
+        CALL, CALL_PROC, RETURN, PROC_END = Op.CALL, Op.CALL_PROC, Op.RETURN, Op.PROC_END
+        write = self.write
+        limit = self.max_steps if self.max_steps is not None else -1
+        max_depth = self.max_depth
+        stack = []
+        routine = self.routines[MAIN]
+        routine.calls += 1
+        code = routine.code
+        frame = routine.template[:]
+        pc = 0
+        steps = self.steps
+        mark_steps = steps
+        mark_time = time.perf_counter()
+        try:
+            while True:
+                # Com max_steps=N executam-se exatamente N instruções
+                if steps == limit:
+                    raise TacRuntimeError(f"Limite de {limit} instruções atingido")
+                op, a, b, c, checks = code[pc]
+                pc += 1
+                steps += 1
+                if checks:
+                    for index in checks:
+                        if frame[index] is UNSET:
+                            raise TacRuntimeError(f"Variável '{routine.names[index]}' lida antes de ser atribuída")
+                if op >= ADD:
+                    frame[a] = functions[op](frame[b], frame[c])
+                elif op == ASSIGN:
+                    frame[a] = frame[b]
+                elif op == IF_FALSE:
+                    if frame[b] is False:
+                        pc = c
+                elif op == GOTO:
+                    pc = b
+                elif op == PRINT:
+                    write(format_value(frame[b]))
+                elif op == CALL or op == CALL_PROC:
+                    if type(b) is str:
+                        raise TacRuntimeError(f"Rotina '{b}' não declarada")
+                    if len(c) != len(b.params):
+                        raise TacRuntimeError(f"Número incorreto de argumentos para '{b.name}'")
+                    if len(stack) >= max_depth:
+                        raise TacRuntimeError(f"Estouro da pilha de chamadas em '{b.name}'")
+                    callee_frame = b.template[:]
+                    for position, index in enumerate(c):
+                        callee_frame[position] = frame[index]
+                    stack.append((routine, code, frame, pc, a))
+                    now = time.perf_counter()
+                    routine.time += now - mark_time
+                    routine.instructions += steps - mark_steps
+                    mark_time, mark_steps = now, steps
+                    routine = b
+                    routine.calls += 1
+                    code, frame, pc = routine.code, callee_frame, 0
+                elif op == RETURN or op == PROC_END:
+                    value = frame[b] if op == RETURN else UNSET
+                    if not stack:
+                        break
+                    now = time.perf_counter()
+                    routine.time += now - mark_time
+                    routine.instructions += steps - mark_steps
+                    mark_time, mark_steps = now, steps
+                    callee = routine
+                    routine, code, frame, pc, target = stack.pop()
+                    if target is not None:
+                        if value is UNSET:
+                            raise TacRuntimeError(f"Função '{callee.name}' terminou sem retornar um valor")
+                        frame[target] = value
+                elif op == Op.BREAK:
+                    raise TacRuntimeError("'break' fora de um laço")
+        except TacRuntimeError as e:
+            raise TacRuntimeError(f"Erro de execução em '{routine.name}': {e}") from None
+        except TypeError:
+            raise TacRuntimeError(f"Erro de execução em '{routine.name}': operação com tipos incompatíveis") from None
+        except ValueError as e:
+            # Inteiro grande demais para virar texto num `print`
+            raise TacRuntimeError(f"Erro de execução em '{routine.name}': {e}") from None
+        finally:
+            routine.time += time.perf_counter() - mark_time
+            routine.instructions += steps - mark_steps
+            self.steps = steps
+        return self.output
+
+    def profile(self):
+        # Chamadas, instruções executadas e tempo (exclusivo, em segundos) de
+        # cada rotina, da mais demorada para a mais rápida
+        routines = sorted(self.routines.values(), key=lambda routine: routine.time, reverse=True)
+        return {
+            routine.name: {"calls": routine.calls, "instructions": routine.instructions, "time": routine.time}
+            for routine in routines if routine.calls
+        }
+
+def run_program(program, **options):
+    # Executa `program` e devolve as linhas impressas
+    return TacVM(program, **options).run()
+
+if __name__ == '__main__':
+    import sys
+    from compiler import Compiler
+
+    path = sys.argv[1] if len(sys.argv) > 1 else "tests/codigo_1.txt"
+    with open(path) as file:
+        result = Compiler(file.read(), quiet=True).compile()
+    for diagnostic in result.diagnostics:
+        print(diagnostic)
+    if result.tac is not None:
+        vm = TacVM(result.tac, write=print)
+        start = time.perf_counter()
+        try:
+            vm.run()
+        except TacRuntimeError as e:
+            print(e)
+        elapsed = time.perf_counter() - start
+        print(f"{vm.steps} instruções em {elapsed * 1000:.2f} ms")
+        for name, stats in vm.profile().items():
+            print(f"  {name}: {stats['calls']} chamadas, {stats['instructions']} instruções, {stats['time'] * 1000:.2f} ms")
@@ -0,0 +1,99 @@
+import heapq
+from cfg import build_cfgs
+from tac_ir import Op, instruction_def, instruction_uses
+
+# Reaproveitamento de temporários: cada rotina (nível superior, funções e
+# procedimentos) recebe o menor conjunto de temporários que dá conta dos
+# valores vivos ao mesmo tempo, no estilo da alocação de registradores por
+# varredura linear. Os temporários de cada rotina passam a ser numerados a
+# partir de t0, então esta deve ser a última passada sobre o código.
+
+def live_intervals(graph):
+    # Intervalo [primeira, última] posição em que cada temporário da rotina
+    # está vivo. Um temporário vivo na entrada ou na saída de um bloco (em
+    # laços, por exemplo) tem o intervalo estendido até o início/fim do bloco
+    instructions = graph.program.instructions
+    intervals = {}
+
+    def touch(temp, index):
+        interval = intervals.get(temp)
+        if interval is None:
+            intervals[temp] = [index, index]
+        elif index < interval[0]:
+            interval[0] = index
+        elif index > interval[1]:
+            interval[1] = index
+
+    live_in, live_out = graph.liveness()
+    for block in graph.blocks:
+        for index in range(block.start, block.end):
+            ins = instructions[index]
+            for operand in instruction_uses(ins):
+                if type(operand) is int:
+                    touch(operand, index)
+            target = instruction_def(ins)
+            if type(target) is int:
+                touch(target, index)
+        for temp in live_in[block.index]:
+            if type(temp) is int:
+                touch(temp, block.start)
+        for temp in live_out[block.index]:
+            if type(temp) is int:
+                touch(temp, block.end - 1)
+    return intervals
+
+def linear_scan(intervals):
+    # Atribui a cada temporário o menor slot livre no início do seu
+    # intervalo. Um slot é liberado na última leitura do temporário, e a
+    # instrução que o lê pode escrever o resultado nele (lê antes de escrever)
+    slots = {}
+    active = []  # heap de (fim, slot)
+    free = []    # heap de slots livres
+    count = 0
+    for temp, (start, end) in sorted(intervals.items(), key=lambda item: (item[1][0], item[1][1], item[0])):
+        while active and active[0][0] <= start:
+            heapq.heappush(free, heapq.heappop(active)[1])
+        if free:
+            slot = heapq.heappop(free)
+        else:
+            slot = count
+            count += 1
+        slots[temp] = slot
+        heapq.heappush(active, (end, slot))
+    return slots, count
+
+def rename(ins, slots):
+    # A instrução com os temporários trocados pelos slots
+    op, result, left, right = ins
+    if op >= Op.ADD:
+        return (op, slots[result],
+                slots[left] if type(left) is int else left,
+                slots[right] if type(right) is int else right)
+    if op == Op.CALL or op == Op.CALL_PROC:
+        return (op, slots[result] if type(result) is int else result, left,
+                tuple(slots[arg] if type(arg) is int else arg for arg in right))
+    if op == Op.ASSIGN or op == Op.PRINT or op == Op.RETURN or op == Op.IF_FALSE:
+        if type(left) is int:
+            return (op, result, slots[left], right)
+    return ins
+
+def allocate_temps(program):
+    # Renumera os temporários de cada rotina com o mínimo de slots. Devolve
+    # quantos temporários havia, quantos sobraram (somando as rotinas) e o
+    # maior número de temporários vivos ao mesmo tempo numa rotina
+    instructions = program.instructions
+    before = set()
+    total = 0
+    max_live = 0
+    for graph in build_cfgs(program).values():
+        intervals = live_intervals(graph)
+        if not intervals:
+            continue
+        before.update(intervals)
+        slots, count = linear_scan(intervals)
+        total += count
+        max_live = max(max_live, count)
+        for block in graph.blocks:
+            for index in range(block.start, block.end):
+                instructions[index] = rename(instructions[index], slots)
+    return {"temps_before": len(before), "temps_after": total, "max_live_temps": max_live}
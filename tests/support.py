@@ -0,0 +1,36 @@
+# Funções comuns aos testes (rode com `python -m unittest discover tests`
+# ou `python -m pytest tests`, a partir da raiz do repositório)
+import os
+from benchmarks.program_generator import SHAPES, generate_program
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def sample_programs(size=30):
+    # Programas de exemplo de tests/ e um programa gerado de cada formato,
+    # pequeno o bastante para os testes rodarem rápido
+    programs = {}
+    for name in ("codigo.txt", "codigo_1.txt"):
+        with open(os.path.join(TESTS_DIR, name)) as file:
+            programs[name] = file.read()
+    for shape in SHAPES:
+        programs[shape] = generate_program(shape, size)
+    return programs
+
+def ast_items(root):
+    # Nós da AST em pré-ordem como (tipo, valor, linha, coluna), para comparar
+    # duas árvores (ASTNode, ArenaNode ou carregadas de um arquivo) inclusive
+    # as posições; um valor que é um nó (o Tipo de uma declaração) vira uma
+    # tupla igual, e filhos None continuam None
+    items = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if node is None:
+            items.append(None)
+            continue
+        value = node.value
+        if hasattr(value, "kind"):
+            value = (value.node_type, value.value, value.line, value.column)
+        items.append((node.node_type, value, node.line, node.column))
+        stack.extend(reversed(node.children))
+    return items
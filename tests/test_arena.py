@@ -0,0 +1,96 @@
+import pickle
+import unittest
+from ast_arena import ASTArena, ArenaNode
+from compiler import Compiler
+from lexer import Lexer
+from parser import Parser
+from support import ast_items, sample_programs
+
+# AST em arena (ast_arena.py): a mesma árvore, o mesmo código e os mesmos
+# erros da AST de objetos
+
+PROGRAMS = {
+    "if sem else": "int x; x = 1; if (x > 0) { print(x); } print(2);",
+    "erros": "int x;\nbool b;\nx = true;\nb = 1;\n",
+}
+
+def count_nodes(root):
+    # Inclusive os nós que são valores (o Tipo de uma declaração)
+    count = 0
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if node is not None:
+            count += 1
+            if hasattr(node.value, "kind"):
+                stack.append(node.value)
+            stack.extend(node.children)
+    return count
+
+def parse(code, arena=None):
+    return Parser(Lexer(code).iter_tokens(), arena=arena).parse()
+
+class ArenaTest(unittest.TestCase):
+    def programs(self):
+        programs = dict(sample_programs())
+        programs.update(PROGRAMS)
+        return programs.items()
+
+    def test_same_tree(self):
+        for name, code in self.programs():
+            with self.subTest(programa=name):
+                arena = ASTArena()
+                root = parse(code, arena)
+                expected = parse(code)
+                self.assertIsInstance(root, ArenaNode)
+                self.assertEqual(ast_items(root), ast_items(expected))
+                self.assertEqual(arena.count_nodes(), count_nodes(expected))
+                self.assertEqual(root.pretty_print(), expected.pretty_print())
+
+    def test_same_compilation(self):
+        for name, code in self.programs():
+            with self.subTest(programa=name):
+                result = Compiler(code, quiet=True, arena=True).compile()
+                expected = Compiler(code, quiet=True).compile()
+                self.assertIsInstance(result.ast, ArenaNode)
+                self.assertEqual(result.diagnostics, expected.diagnostics)
+                self.assertEqual(result.symbol_table.keys(), expected.symbol_table.keys())
+                if expected.tac is not None:
+                    self.assertEqual(result.tac.instructions, expected.tac.instructions)
+
+    def test_layout(self):
+        # Pós-ordem: os filhos ficam antes do pai, a raiz é o último nó; o
+        # `else` ausente ocupa uma posição vazia que não conta como nó
+        arena = ASTArena()
+        root = parse(PROGRAMS["if sem else"], arena)
+        self.assertEqual(root.index, len(arena) - 1)
+        for index in range(len(arena)):
+            for child in arena.child_indexes(index):
+                self.assertLess(child, index)
+        self.assertEqual(arena.empty_slots, 1)
+        self.assertEqual(arena.count_nodes(), len(arena) - 1)
+        conditional = root.children[2]
+        self.assertEqual(conditional.node_type, "ComandoCondicional")
+        self.assertEqual(len(conditional.children), 3)
+        self.assertIsNone(conditional.children[2])
+        # Valores repetidos ficam uma vez só na tabela de constantes
+        self.assertEqual(arena.constants.count("x"), 1)
+
+    def test_views(self):
+        arena = ASTArena()
+        root = parse("int x; x = 1;", arena)
+        self.assertEqual(root, arena.node(root.index))
+        self.assertEqual(hash(root), hash(arena.node(root.index)))
+        self.assertNotEqual(root, root.children[0])
+        declaration = root.children[0]
+        self.assertEqual(declaration.value.node_type, "Tipo")
+        self.assertEqual(declaration.value.value, "INT")
+
+    def test_pickle(self):
+        arena = ASTArena()
+        root = parse(sample_programs()["mixed"], arena)
+        copy = pickle.loads(pickle.dumps(arena))
+        self.assertEqual(ast_items(copy.node(copy.root)), ast_items(root))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+import ast_dump
+from ast_arena import ASTArena
+from lexer import Lexer
+from parser import Parser
+from support import TESTS_DIR, ast_items, sample_programs
+
+# Impressão da AST em fluxo (ast_dump.py) nos formatos text, json e sexp,
+# com e sem limite de profundidade
+
+CODE = "int x; x = 1; if (x > 0) { print(x); }"
+
+def parse(code, arena=None):
+    return Parser(Lexer(code).iter_tokens(), arena=arena).parse()
+
+def dump(root, format, max_depth=None):
+    out = io.StringIO()
+    ast_dump.dump(root, out, format, max_depth)
+    return out.getvalue()
+
+def json_items(node):
+    # Os nós do JSON em pré-ordem, no formato de ast_items
+    items = []
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node is None:
+            items.append(None)
+            continue
+        value = node["value"]
+        if type(value) is dict:
+            value = (value["type"], value["value"], value["line"], value["column"])
+        items.append((node["type"], value, node["line"], node["column"]))
+        stack.extend(reversed(node.get("children", [])))
+    return items
+
+def json_depth(node, omitted=0):
+    # Profundidade do JSON e total de filhos omitidos
+    deepest = 0
+    stack = [(node, 0)]
+    while stack:
+        node, depth = stack.pop()
+        if node is None:
+            continue
+        deepest = max(deepest, depth)
+        omitted += node.get("omitted", 0)
+        stack.extend((child, depth + 1) for child in node.get("children", []))
+    return deepest, omitted
+
+class ASTDumpTest(unittest.TestCase):
+    def test_text_is_pretty_print(self):
+        for name, code in sample_programs().items():
+            with self.subTest(programa=name):
+                for root in (parse(code), parse(code, ASTArena())):
+                    self.assertEqual(dump(root, "text"), root.pretty_print() + "\n")
+
+    def test_json(self):
+        for name, code in sample_programs().items():
+            with self.subTest(programa=name):
+                root = parse(code)
+                text = dump(root, "json")
+                self.assertEqual(text.count("\n"), 1)
+                self.assertEqual(json_items(json.loads(text)), ast_items(root))
+
+    def test_sexp(self):
+        self.assertEqual(dump(parse(CODE), "sexp"), "\n".join([
+            '(Programa',
+            '  (DeclaracaoVariavel (Tipo "INT")',
+            '    (ID "x"))',
+            '  (ComandoAtribuicao',
+            '    (ID "x")',
+            '    (Numero "1"))',
+            '  (ComandoCondicional',
+            '    (ExpressaoBooleana ">"',
+            '      (ID "x")',
+            '      (Numero "0"))',
+            '    (Bloco',
+            '      (ComandoImpressao',
+            '        (ID "x")))',
+            '    nil))',
+        ]) + "\n")
+        for name, code in sample_programs().items():
+            with self.subTest(programa=name):
+                text = dump(parse(code), "sexp")
+                self.assertEqual(text.count("("), text.count(")"))
+
+    def test_max_depth(self):
+        root = parse(CODE)
+        self.assertEqual(dump(root, "text", 1), "\n".join([
+            "Programa:",
+            "  DeclaracaoVariavel (value: Tipo (value: INT)):",
+            "    ... (1 filhos omitidos)",
+            "  ComandoAtribuicao:",
+            "    ... (2 filhos omitidos)",
+            "  ComandoCondicional:",
+            "    ... (3 filhos omitidos)",
+        ]) + "\n")
+        self.assertEqual(dump(root, "text", 0), "Programa:\n  ... (3 filhos omitidos)\n")
+        self.assertIn("(ComandoCondicional ...3)", dump(root, "sexp", 1))
+        for max_depth in range(6):
+            with self.subTest(profundidade=max_depth):
+                depth, omitted = json_depth(json.loads(dump(root, "json", max_depth)))
+                self.assertEqual(depth, min(max_depth, 4))
+                self.assertEqual(omitted > 0, max_depth < 4)
+        # Sem limite, ou com um limite maior que a árvore, sai tudo
+        self.assertEqual(dump(root, "text", 10), dump(root, "text"))
+
+    def test_streams_in_pieces(self):
+        # A saída é escrita em vários `write`, não montada numa string só
+        class Writes:
+            def __init__(self):
+                self.pieces = []
+
+            def write(self, text):
+                self.pieces.append(text)
+
+        root = parse(sample_programs()["wide"])
+        out = Writes()
+        with mock.patch.object(ast_dump, "FLUSH_PIECES", 10):
+            ast_dump.dump(root, out, "text")
+        self.assertGreater(len(out.pieces), 10)
+        self.assertTrue(all(piece.count("\n") <= 10 for piece in out.pieces))
+        self.assertEqual("".join(out.pieces), root.pretty_print() + "\n")
+
+    def test_unknown_format(self):
+        with self.assertRaisesRegex(ValueError, "Formato desconhecido: xml"):
+            dump(parse(CODE), "xml")
+
+    def test_command_line(self):
+        # --ast-output escreve a AST no arquivo, também com --quiet
+        root = os.path.dirname(TESTS_DIR)
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "ast.json")
+            command = [sys.executable, "main.py", os.path.join(TESTS_DIR, "codigo.txt"), "--quiet",
+                       "--ast-format", "json", "--ast-depth", "2", "--ast-output", output]
+            subprocess.run(command, cwd=root, check=True, capture_output=True)
+            with open(output, encoding="utf-8") as file:
+                self.assertEqual(json_depth(json.load(file))[0], 2)
+            rejected = subprocess.run(command[:-2], cwd=root, capture_output=True, text=True)
+            self.assertEqual(rejected.returncode, 2)
+            self.assertIn("--ast-output", rejected.stderr)
+
+if __name__ == "__main__":
+    unittest.main()
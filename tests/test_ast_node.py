@@ -0,0 +1,84 @@
+import unittest
+from ast_node import NO_CHILDREN, NODE_KINDS, NODE_TYPES, ASTNode, NodeKind
+from lexer import Lexer
+from parser import Parser
+from support import ast_items
+
+# Nós compactos da AST (ast_node.py): __slots__, tipo inteiro, tupla de
+# filhos compartilhada pelas folhas e posição no fonte
+
+CODE = "int x;\nx = 1 +\n   2;\nprint(x);"
+
+def parse(code):
+    return Parser(Lexer(code).iter_tokens()).parse()
+
+def nodes(root):
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(node.children)
+
+class ASTNodeTest(unittest.TestCase):
+    def test_slots(self):
+        node = ASTNode("ID", "x")
+        self.assertFalse(hasattr(node, "__dict__"))
+        with self.assertRaises(AttributeError):
+            node.extra = 1
+
+    def test_kinds(self):
+        self.assertEqual(len(NODE_TYPES), len(NODE_KINDS))
+        for name, kind in NODE_KINDS.items():
+            self.assertEqual(NODE_TYPES[kind], name)
+            node = ASTNode(name)
+            self.assertEqual(node.kind, kind)
+            self.assertEqual(node.node_type, name)
+        self.assertEqual(ASTNode("ComandoLaco").kind, NodeKind.ComandoLaco)
+        with self.assertRaisesRegex(ValueError, "Tipo de nó desconhecido: Inexistente"):
+            ASTNode("Inexistente")
+
+    def test_leaves_share_children(self):
+        root = parse(CODE)
+        leaves = [node for node in nodes(root) if not node.children]
+        self.assertTrue(leaves)
+        for leaf in leaves:
+            self.assertIs(leaf.children, NO_CHILDREN)
+        # O primeiro filho troca a tupla compartilhada por uma lista do nó
+        first, second = ASTNode("Bloco"), ASTNode("Bloco")
+        first.add_child(ASTNode("ComandoBreak"))
+        self.assertEqual(len(first.children), 1)
+        self.assertIs(second.children, NO_CHILDREN)
+        self.assertEqual(NO_CHILDREN, ())
+
+    def test_spans(self):
+        # Linha (a partir de 1) e coluna (a partir de 0) do primeiro token do nó
+        self.assertEqual(ast_items(parse(CODE)), [
+            ("Programa", None, 1, 0),
+            ("DeclaracaoVariavel", ("Tipo", "INT", 1, 0), 1, 0),
+            ("ID", "x", 1, 4),
+            ("ComandoAtribuicao", None, 2, 0),
+            ("ID", "x", 2, 0),
+            ("ExpressaoAritmetica", "+", 2, 4),
+            ("Numero", "1", 2, 4),
+            ("Numero", "2", 3, 3),
+            ("ComandoImpressao", None, 4, 0),
+            ("ID", "x", 4, 6),
+        ])
+
+    def test_pretty_print(self):
+        # O mesmo texto dos nós antigos, sem as posições
+        self.assertEqual(parse(CODE).pretty_print(), "\n".join([
+            "Programa:",
+            "  DeclaracaoVariavel (value: Tipo (value: INT)):",
+            "    ID (value: x)",
+            "  ComandoAtribuicao:",
+            "    ID (value: x)",
+            "    ExpressaoAritmetica (value: +):",
+            "      Numero (value: 1)",
+            "      Numero (value: 2)",
+            "  ComandoImpressao:",
+            "    ID (value: x)",
+        ]))
+
+if __name__ == "__main__":
+    unittest.main()
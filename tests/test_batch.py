@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+from batch import compile_batch, summarize
+from compiler import Compiler
+from support import sample_programs
+
+# Compilação em lote num pool de processos (batch.py): cada arquivo tem que
+# dar o mesmo resultado da compilação sequencial (jobs=1)
+
+def summary(result):
+    # O que não depende do tempo de compilação
+    return result.path, result.success, result.diagnostics, result.instructions, result.tac
+
+class BatchTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.paths = []
+        for name, code in sample_programs().items():
+            path = os.path.join(directory.name, f"{name}.txt")
+            with open(path, "w") as file:
+                file.write(code)
+            self.paths.append(path)
+        self.paths.append(os.path.join(directory.name, "nao_existe.txt"))
+
+    def test_same_results(self):
+        sequential = [summary(result) for result in compile_batch(self.paths, jobs=1, keep_tac=True)]
+        parallel = [summary(result) for result in compile_batch(self.paths, jobs=2, ordered=True, keep_tac=True)]
+        self.assertEqual(parallel, sequential)
+        self.assertEqual([result[0] for result in parallel], self.paths)
+
+    def test_unordered(self):
+        results = list(compile_batch(self.paths, jobs=2))
+        self.assertEqual(sorted(result.path for result in results), sorted(self.paths))
+        totals = summarize(results)
+        self.assertEqual(totals["files"], len(self.paths))
+        self.assertEqual(totals["succeeded"] + totals["failed"], len(self.paths))
+        # O arquivo que não existe vira um resultado com erro
+        self.assertGreaterEqual(totals["failed"], 1)
+
+    def test_options(self):
+        # As opções da compilação de um arquivo só valem também em lote
+        for options in ({"opt_level": 2}, {"arena": True}, {"streaming": True}, {"arena": True, "streaming": True}):
+            with self.subTest(opcoes=options):
+                for result in compile_batch(self.paths[:-1], jobs=2, ordered=True, keep_tac=True, **options):
+                    with open(result.path) as file:
+                        expected = Compiler(file.read(), quiet=True, **options).compile()
+                    self.assertEqual(result.success, expected.success)
+                    self.assertEqual(result.tac, expected.tac.render() if expected.tac is not None else None)
+        optimized = next(compile_batch(self.paths[:1], keep_tac=True, opt_level=2))
+        plain = next(compile_batch(self.paths[:1], keep_tac=True))
+        self.assertLess(optimized.instructions, plain.instructions)
+
+    def test_cache_options(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            first = list(compile_batch(self.paths, jobs=1, cache_dir=cache_dir, opt_level=1, cache_bytes=10))
+            # Nenhuma entrada cabe em 10 bytes
+            self.assertEqual(os.listdir(cache_dir), [])
+            second = list(compile_batch(self.paths, jobs=1, cache_dir=cache_dir, opt_level=1, cache_bytes=10))
+            self.assertEqual([summary(result) for result in second], [summary(result) for result in first])
+
+if __name__ == "__main__":
+    unittest.main()
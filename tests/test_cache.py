@@ -0,0 +1,136 @@
+import os
+import tempfile
+import unittest
+from compile_cache import CompilationCache
+from compiler import Compiler
+from support import ast_items, sample_programs
+from tac_vm import TacRuntimeError
+
+# Um acerto no cache de compilação (compile_cache.py) tem que devolver os
+# mesmos artefatos de uma compilação sem cache
+
+def execution(result):
+    # Saída do programa na TacVM, ou a mensagem do erro de execução
+    try:
+        return result.execute(backend="vm")
+    except TacRuntimeError as e:
+        return str(e)
+
+class CompilationCacheTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.cache = CompilationCache(self.directory)
+
+    def compile(self, code, **options):
+        return Compiler(code, quiet=True, cache=self.cache, **options).compile()
+
+    def assert_same(self, result, expected):
+        self.assertEqual(ast_items(result.ast), ast_items(expected.ast))
+        self.assertEqual(result.tac, expected.tac)
+        self.assertEqual(result.diagnostics, expected.diagnostics)
+
+    def test_hit_equals_miss(self):
+        for name, code in sample_programs().items():
+            with self.subTest(programa=name):
+                miss = self.compile(code)
+                if not miss.success:
+                    continue
+                hit = self.compile(code)
+                self.assertFalse(miss.cache_hit)
+                self.assertTrue(hit.cache_hit)
+                self.assert_same(hit, miss)
+                self.assert_same(hit, Compiler(code, quiet=True).compile())
+                self.assertEqual(execution(hit), execution(miss))
+
+    def test_hit_into_arena(self):
+        code = sample_programs()["mixed"]
+        miss = self.compile(code, arena=True)
+        hit = self.compile(code, arena=True)
+        self.assertTrue(hit.cache_hit)
+        self.assert_same(hit, miss)
+
+    def test_options_in_key(self):
+        # Cada nível de otimização tem a sua entrada
+        code = sample_programs()["wide"]
+        self.compile(code, opt_level=0)
+        optimized = self.compile(code, opt_level=2)
+        self.assertFalse(optimized.cache_hit)
+        self.assert_same(self.compile(code, opt_level=2), optimized)
+
+    def test_errors_not_cached(self):
+        code = "int x;\nx = true;"
+        first = self.compile(code)
+        second = self.compile(code)
+        self.assertFalse(second.cache_hit)
+        self.assertEqual(second.diagnostics, first.diagnostics)
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+    def test_corrupted_entry(self):
+        # Uma entrada estragada é um erro de cache, e a compilação é refeita
+        code = sample_programs()["identifiers"]
+        expected = self.compile(code)
+        for entry in os.listdir(self.directory):
+            with open(os.path.join(self.directory, entry), "wb") as file:
+                file.write(b"lixo")
+        result = self.compile(code)
+        self.assertFalse(result.cache_hit)
+        self.assert_same(result, expected)
+
+    def test_stale_pickle(self):
+        # Entradas gravadas por outra versão do código, com classes que não
+        # existem mais: falha de cache, a entrada é apagada e a compilação segue
+        code = sample_programs()["wide"]
+        expected = self.compile(code)
+        key = self.cache.key(code, "O0")
+        for stale in (b"ccompile_cache\nClasseRemovida\n.", b"cmodulo_removido\nClasse\n."):
+            with self.subTest(entrada=stale):
+                with open(self.cache.path(key), "wb") as file:
+                    file.write(stale)
+                self.assertIsNone(self.cache.get(key))
+                self.assertFalse(os.path.exists(self.cache.path(key)))
+                result = self.compile(code)
+                self.assertFalse(result.cache_hit)
+                self.assert_same(result, expected)
+                self.assertTrue(os.path.exists(self.cache.path(key)))
+
+    def test_failing_cache(self):
+        # Nem um erro inesperado do próprio cache impede a compilação
+        code = sample_programs()["wide"]
+        cache = self.cache
+        def broken(key, arena=None):
+            raise RuntimeError("cache quebrado")
+        cache.get = broken
+        result = Compiler(code, quiet=True, cache=cache).compile()
+        self.assertTrue(result.success)
+        self.assertFalse(result.cache_hit)
+
+    def test_lru_eviction(self):
+        # Passando de max_bytes, saem as entradas usadas há mais tempo; um
+        # acerto conta como uso
+        results = {name: Compiler(f"int {name}; {name} = 1; print({name});", quiet=True).compile() for name in "abc"}
+        self.cache.put("a", results["a"].ast, results["a"].tac)
+        size = os.path.getsize(self.cache.path("a"))
+        cache = CompilationCache(self.directory, max_bytes=size * 2 + size // 2)
+        cache.put("b", results["b"].ast, results["b"].tac)
+        os.utime(cache.path("a"), (1000, 1000))
+        os.utime(cache.path("b"), (2000, 2000))
+        self.assertIsNotNone(cache.get("a"))  # "a" passa a ser a mais recente
+        cache.put("c", results["c"].ast, results["c"].tac)
+        self.assertTrue(os.path.exists(cache.path("a")))
+        self.assertFalse(os.path.exists(cache.path("b")))
+        self.assertTrue(os.path.exists(cache.path("c")))
+        stats = cache.stats()
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(stats["entries"], 2)
+        self.assertLessEqual(stats["bytes"], cache.max_bytes)
+
+    def test_entry_too_large(self):
+        result = Compiler(sample_programs()["wide"], quiet=True).compile()
+        cache = CompilationCache(self.directory, max_bytes=10)
+        self.assertFalse(cache.put("grande", result.ast, result.tac))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import unittest
+from cfg import MAIN, build_cfgs, routine_segments
+from compiler import Compiler
+from lexer import Lexer
+from parser import Parser
+from support import sample_programs
+from tac_ir import Op
+from three_address_code_generator import ThreeAddressCodeGenerator
+
+# Grafo de fluxo de controle (cfg.py): blocos básicos, arestas, dominadores
+# e variáveis vivas
+
+CODE = """int a; a = 0;
+int f(int x) { int r; r = x; return r; print(r); }
+while (a < 10) { a = a + 1; if (a == 5) { break; } }
+print(fun f(a));
+"""
+
+def generate(code):
+    return ThreeAddressCodeGenerator(Parser(Lexer(code).iter_tokens()).parse()).generate()
+
+class ControlFlowGraphTest(unittest.TestCase):
+    def setUp(self):
+        self.program = generate(CODE)
+        self.graphs = build_cfgs(self.program)
+        self.main = self.graphs[MAIN]
+
+    def block_ending_with(self, graph, op, label):
+        # O bloco que termina em `op` para o rótulo `label`
+        blocks = [block for block in graph.blocks if self.program.instructions[block.end - 1][0::2] == (op, label)]
+        self.assertEqual(len(blocks), 1)
+        return blocks[0]
+
+    def test_segments(self):
+        # O corpo de `f` sai do meio do nível superior, sem FUNC_BEGIN/FUNC_END
+        instructions = self.program.instructions
+        segments = routine_segments(self.program)
+        self.assertEqual(set(segments), {MAIN, "f"})
+        self.assertEqual(len(segments[MAIN]), 2)
+        (start, end), = segments["f"]
+        self.assertEqual(instructions[start - 1][0], Op.FUNC_BEGIN)
+        self.assertEqual(instructions[end][0], Op.FUNC_END)
+        self.assertEqual(segments[MAIN][0][1], start - 1)
+        self.assertEqual(segments[MAIN][1][0], end + 1)
+
+    def test_blocks_and_edges(self):
+        for name, code in sample_programs().items():
+            result = Compiler(code, quiet=True).compile()
+            if result.tac is None:
+                continue
+            with self.subTest(programa=name):
+                for graph in build_cfgs(result.tac).values():
+                    covered = []
+                    for block in graph.blocks:
+                        instructions = graph.instructions(block)
+                        covered.extend(range(block.start, block.end))
+                        # Rótulo só no início, desvio só no fim
+                        self.assertTrue(all(ins[0] != Op.LABEL for ins in instructions[1:]))
+                        self.assertTrue(all(ins[0] not in (Op.GOTO, Op.IF_FALSE, Op.BREAK, Op.RETURN) for ins in instructions[:-1]))
+                        for successor in block.successors:
+                            self.assertIn(block, successor.predecessors)
+                        for predecessor in block.predecessors:
+                            self.assertIn(block, predecessor.successors)
+                    segments = routine_segments(result.tac)[graph.name]
+                    self.assertEqual(covered, [index for start, end in segments for index in range(start, end)])
+
+    def test_loop(self):
+        labels = self.main.label_blocks
+        header, end = labels[0], labels[1]
+        body = header.successors[0]
+        back = self.block_ending_with(self.main, Op.GOTO, 0)
+        breaking = self.block_ending_with(self.main, Op.BREAK, 1)
+        self.assertEqual(header.successors, [body, end])
+        self.assertEqual(breaking.successors, [end])
+        self.assertEqual(set(end.predecessors), {header, breaking})
+        # Aresta de volta: o cabeçalho domina o bloco que volta para ele
+        self.assertIn(header, back.successors)
+        self.assertTrue(self.main.dominates(header, back))
+        self.assertTrue(self.main.dominates(header, breaking))
+        self.assertFalse(self.main.dominates(breaking, end))
+        self.assertFalse(self.main.dominates(body, header))
+
+    def test_dominators(self):
+        idom = self.main.immediate_dominators()
+        labels = self.main.label_blocks
+        header, end = labels[0], labels[1]
+        self.assertIsNone(idom[self.main.entry.index])
+        self.assertEqual(idom[header.index], self.main.entry.index)
+        self.assertEqual(idom[end.index], header.index)
+        reachable = self.main.reachable()
+        for block in self.main.blocks:
+            self.assertEqual(self.main.dominates(self.main.entry, block), block.index in reachable)
+
+    def test_unreachable(self):
+        # O `goto` depois do `break` e o `print` depois do `return`
+        self.assertEqual(len(self.main.blocks) - len(self.main.reachable()), 1)
+        f = self.graphs["f"]
+        self.assertEqual(f.reachable(), {f.entry.index})
+        self.assertEqual(f.entry.successors, [])
+        self.assertIsNone(f.immediate_dominators()[1])
+
+    def test_liveness(self):
+        live_in, live_out = self.main.liveness()
+        labels = self.main.label_blocks
+        header, end = labels[0], labels[1]
+        self.assertEqual(live_in[self.main.entry.index], set())
+        self.assertEqual(live_in[header.index], {"a"})
+        self.assertEqual(live_out[self.block_ending_with(self.main, Op.GOTO, 0).index], {"a"})
+        self.assertEqual(live_out[end.index], set())
+        # Temporários não sobrevivem de um bloco para outro
+        for live in live_in + live_out:
+            self.assertFalse(any(type(operand) is int for operand in live))
+        f_in, f_out = self.graphs["f"].liveness()
+        self.assertEqual(f_in[0], {"x"})
+        self.assertEqual(f_out[0], set())
+
+if __name__ == "__main__":
+    unittest.main()
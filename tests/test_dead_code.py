@@ -0,0 +1,84 @@
+import unittest
+from cfg import build_cfgs
+from dead_code import eliminate_dead_code, remove_jumps_to_next
+from lexer import Lexer
+from optimizer import fold_constants
+from parser import Parser
+from tac_ir import Op
+from tac_vm import run_program
+from three_address_code_generator import ThreeAddressCodeGenerator
+
+# Remoção de código morto (dead_code.py): blocos inalcançáveis de cada
+# rotina e rotinas que nunca são chamadas a partir do nível superior
+
+CODE = """int f(int x) { int r; r = fun h(x); return r; print(r); }
+int h(int y) { return y + 1; }
+int g(int z) { return fun k(z); }
+int k(int w) { return w; }
+int rec(int n) { return fun rec(n); }
+void p() { print(0); }
+int a; a = 0;
+while (a < 3) { a = a + 1; break; print(a); }
+if (1 > 2) { print(1); } else { print(2); }
+print(fun f(a));
+"""
+
+def generate(code):
+    return ThreeAddressCodeGenerator(Parser(Lexer(code).iter_tokens()).parse()).generate()
+
+def printed(program):
+    # Variáveis e literais de todos os `print` que sobraram
+    return [left for op, _, left, _ in program.instructions if op == Op.PRINT and type(left) is str]
+
+class DeadCodeTest(unittest.TestCase):
+    def setUp(self):
+        self.program = generate(CODE)
+        self.expected = run_program(self.program)
+        fold_constants(self.program)  # resolve o `if (1 > 2)`
+
+    def test_dead_routines(self):
+        # `k` só é chamada por `g`, que ninguém chama; `rec` só chama a si mesma
+        stats = eliminate_dead_code(self.program)
+        self.assertEqual(sorted(stats["dead_routine_names"]), ["g", "k", "p", "rec"])
+        self.assertEqual(stats["dead_routines"], 4)
+        self.assertEqual(set(build_cfgs(self.program)), {"<main>", "f", "h"})
+        begins = [left for op, _, left, _ in self.program.instructions if op in (Op.FUNC_BEGIN, Op.PROC_BEGIN, Op.FUNC_END, Op.PROC_END)]
+        self.assertEqual(begins, ["f", "f", "h", "h"])
+
+    def test_unreachable_blocks(self):
+        # Saem o `print` depois do `return` e do `break`, o lado do `if` que
+        # a condição constante descartou e os `goto` que ficaram sem função
+        self.assertEqual(printed(self.program), ["r", "0", "a", "1", "2"])
+        stats = eliminate_dead_code(self.program)
+        self.assertEqual(printed(self.program), ["2"])
+        for graph in build_cfgs(self.program).values():
+            self.assertEqual(graph.reachable(), {block.index for block in graph.blocks})
+        gotos = [ins for ins in self.program.instructions if ins[0] == Op.GOTO]
+        self.assertEqual(gotos, [])
+        self.assertEqual(stats["unreachable"], 6)
+
+    def test_same_execution(self):
+        eliminate_dead_code(self.program)
+        self.assertEqual(run_program(self.program), self.expected)
+        self.assertEqual(self.expected, ["2", "2"])
+
+    def test_idempotent(self):
+        eliminate_dead_code(self.program)
+        instructions = list(self.program.instructions)
+        stats = eliminate_dead_code(self.program)
+        self.assertEqual(self.program.instructions, instructions)
+        self.assertEqual(stats, {"unreachable": 0, "dead_routines": 0, "dead_routine_names": ()})
+
+    def test_jumps_to_next(self):
+        instructions = [
+            (Op.GOTO, None, 1, None),
+            (Op.LABEL, None, 0, None),
+            (Op.LABEL, None, 1, None),  # o `goto` só pula rótulos: sai
+            (Op.GOTO, None, 0, None),   # volta para trás: fica
+            (Op.PRINT, None, "x", None),
+        ]
+        self.assertEqual(remove_jumps_to_next(instructions), 1)
+        self.assertEqual([ins[0] for ins in instructions], [Op.LABEL, Op.LABEL, Op.GOTO, Op.PRINT])
+
+if __name__ == "__main__":
+    unittest.main()
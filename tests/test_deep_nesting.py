@@ -0,0 +1,87 @@
+import sys
+import unittest
+from ast_node import ASTNode
+from compiler import Compiler
+from lexer import Lexer
+from new_semantic import SemanticAnalyzer
+from parser import Parser
+from tac_vm import run_program
+from three_address_code_generator import ThreeAddressCodeGenerator
+
+# Análise semântica, geração de código e impressão da AST percorrem a árvore
+# com pilhas explícitas: árvores bem mais fundas que o limite de recursão do
+# Python (sem mexer nele) são processadas normalmente
+
+DEPTH = 3 * sys.getrecursionlimit()
+
+def parse(code):
+    return Parser(Lexer(code).iter_tokens()).parse()
+
+def count_nodes(root):
+    count = 0
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(node.children)
+    return count
+
+def node_depth(root):
+    deepest = 0
+    stack = [(root, 1)]
+    while stack:
+        node, depth = stack.pop()
+        deepest = max(deepest, depth)
+        stack.extend((child, depth + 1) for child in node.children)
+    return deepest
+
+def nested_loops(depth):
+    # `while (x < 1) { ... break; }` aninhado `depth` vezes, com `print(x)`
+    # no laço mais interno. O parser descendente recursivo não chega a essa
+    # profundidade, então a árvore é montada à mão
+    root = parse("int x; x = 0; while (x < 1) { print(x); break; }")
+    loop = root.children[-1]
+    condition, body = loop.children
+    for _ in range(depth):
+        loop = ASTNode("ComandoLaco", children=[condition, body])
+        body = ASTNode("Bloco", children=[loop, ASTNode("ComandoBreak")])
+    root.children[-1] = loop
+    return root
+
+class DeepNestingTest(unittest.TestCase):
+    def setUp(self):
+        self.limit = sys.getrecursionlimit()
+
+    def tearDown(self):
+        self.assertEqual(sys.getrecursionlimit(), self.limit)
+
+    def test_long_expression(self):
+        # A cadeia `1 + 1 + ...` vira uma espinha à esquerda de DEPTH nós
+        code = f"int x; x = {' + '.join(['1'] * DEPTH)}; print(x);"
+        result = Compiler(code, quiet=True).compile()
+        self.assertTrue(result.success, result.diagnostics)
+        self.assertGreater(node_depth(result.ast), DEPTH)
+        self.assertEqual(result.execute(backend="vm"), [str(DEPTH)])
+        self.assertEqual(len(result.ast.pretty_print().split("\n")), count_nodes(result.ast))
+
+    def test_error_in_long_expression(self):
+        # O tipo da soma só é conhecido depois de percorrer a cadeia inteira
+        code = f"print({' + '.join(['1'] * DEPTH)} + true);"
+        result = Compiler(code, quiet=True).compile()
+        self.assertEqual([str(diagnostic) for diagnostic in result.diagnostics],
+                         ["[semantic] Erro: Operação aritmética entre tipos incompatíveis."])
+
+    def test_nested_blocks(self):
+        root = nested_loops(DEPTH)
+        self.assertGreater(node_depth(root), 2 * DEPTH)
+        analyzer = SemanticAnalyzer(root, {}, verbose=False)
+        analyzer.analyze()
+        self.assertEqual(analyzer.errors, [])
+        program = ThreeAddressCodeGenerator(root).generate()
+        self.assertEqual(run_program(program), ["0"])
+        lines = root.pretty_print().split("\n")
+        self.assertEqual(len(lines), count_nodes(root))
+        self.assertEqual(max(len(line) - len(line.lstrip()) for line in lines) // 2, node_depth(root) - 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+from compiler import Compiler
+from incremental import IncrementalCompiler
+from support import ast_items, sample_programs
+
+# Cada compilação do IncrementalCompiler, depois de qualquer sequência de
+# edições, tem que dar o mesmo resultado de uma compilação completa
+
+def edits(code):
+    # Versões sucessivas de um programa, como se alguém o editasse
+    lines = code.split("\n")
+    middle = len(lines) // 2
+    yield code
+    yield "int novo;\n" + code                          # todos os trechos mudam de linha
+    yield "\n\n   " + code                               # e de coluna na primeira linha
+    yield "\n".join(lines[:middle] + ["int meio;"] + lines[middle:])
+    yield code + "\nint zz; zz = 1; zz = 1;\n  zz = 1;"   # texto repetido
+    yield code.replace("\n", "\n\n", 3)
+    yield code + "\nint quebrado"                         # erro de sintaxe
+    yield code
+
+class IncrementalTest(unittest.TestCase):
+    def assert_same(self, incremental, code):
+        result = incremental.compile(code)
+        full = Compiler(code, quiet=True).compile()
+        self.assertEqual(ast_items(result.ast), ast_items(full.ast))
+        self.assertEqual([diagnostic.phase for diagnostic in result.diagnostics],
+                         [diagnostic.phase for diagnostic in full.diagnostics])
+        if full.success:
+            self.assertEqual(result.diagnostics, full.diagnostics)
+            self.assertEqual(result.tac, full.tac)
+            self.assertEqual(result.symbol_table.keys(), full.symbol_table.keys())
+        return result
+
+    def test_edits(self):
+        for name, code in sample_programs().items():
+            incremental = IncrementalCompiler()
+            for version, edited in enumerate(edits(code)):
+                with self.subTest(programa=name, versao=version):
+                    self.assert_same(incremental, edited)
+
+    def test_reuses_moved_units(self):
+        # Inserir uma linha no início só reprocessa o trecho novo; os demais
+        # são reaproveitados na posição nova
+        code = sample_programs()["functions"]
+        incremental = IncrementalCompiler()
+        incremental.compile(code)
+        result = self.assert_same(incremental, "int novo;\n" + code)
+        self.assertEqual(result.profile["phases"]["parser"]["counters"]["reparsed_units"], 1)
+
+    def test_semantic_errors(self):
+        code = "int x;\nbool b;\nx = true;\nb = 1;\n"
+        incremental = IncrementalCompiler()
+        for edited in (code, "int y;\n" + code):
+            result = incremental.compile(edited)
+            full = Compiler(edited, quiet=True).compile()
+            self.assertEqual(result.diagnostics, full.diagnostics)
+            self.assertEqual(ast_items(result.ast), ast_items(full.ast))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import unittest
+from compiler import Compiler
+from support import sample_programs
+from tac_ir import Op
+from tac_vm import TacRuntimeError
+
+# Os níveis de otimização só podem mudar o código gerado, nunca o que o
+# programa imprime: -O0, -O1 e -O2 dão a mesma saída (ou o mesmo erro) na TacVM,
+# e o código otimizado nunca fica maior
+
+PROGRAMS = {
+    "identidades": """
+int x, y;
+bool b;
+x = 7;
+y = x * 1 + 0;
+print(y);
+print((x + 1) * 1);
+print(0 + (x - 3));
+print((x * 2) / 1);
+print((x + 2) * 0);
+print(x - x);
+print((0 - 7) / 2);
+b = true * 1;
+print(b);
+b = x == 7;
+print(b == true);
+print(b != false);
+""",
+    "laco": """
+int i, s;
+i = 0;
+s = 0;
+while (i < 50) {
+    s = s + i * 2 - i / 3 + 0;
+    if (s > 100) {
+        s = s - 100 * 1;
+    }
+    i = i + 1;
+}
+print(s);
+""",
+    "recursao": """
+int fib(int n) {
+    int r;
+    if (n < 2) {
+        r = n;
+    } else {
+        r = fun fib(n - 1) + fun fib(n - 2);
+    }
+    return r;
+}
+int dobro(int n) {
+    int r;
+    r = n * 2 + 1 * 0;
+    return r;
+}
+print(fun fib(12));
+print(fun dobro(fun fib(6)));
+""",
+}
+
+def run(code, opt_level):
+    result = Compiler(code, quiet=True, opt_level=opt_level).compile()
+    if not result.success:
+        return "erro de compilação", result.diagnostics
+    try:
+        return "saída", result.execute(backend="vm")
+    except TacRuntimeError as e:
+        return "erro de execução", str(e)
+
+def compile(code, opt_level):
+    result = Compiler(code, quiet=True, opt_level=opt_level).compile()
+    assert result.success, result.diagnostics
+    return result.tac
+
+def operations(tac):
+    return [(op, left, right) for op, _, left, right in tac]
+
+class OptimizerTest(unittest.TestCase):
+    def test_same_output(self):
+        programs = dict(sample_programs())
+        programs.update(PROGRAMS)
+        for name, code in programs.items():
+            with self.subTest(programa=name):
+                expected = run(code, 0)
+                for opt_level in (1, 2):
+                    self.assertEqual(run(code, opt_level), expected, f"-O{opt_level}")
+
+    def test_programs_run(self):
+        # Os programas acima compilam e executam (não comparam só dois erros)
+        for name, code in PROGRAMS.items():
+            with self.subTest(programa=name):
+                self.assertEqual(run(code, 0)[0], "saída")
+
+    def test_bool_times_one(self):
+        # `true * 1` vale 1: a identidade x*1 não se aplica a um bool
+        self.assertEqual(run("bool b; b = true * 1; print(b);", 2), ("saída", ["1"]))
+
+    def test_folds_constants(self):
+        self.assertEqual(compile("int x; x = 2 + 3 * 4; print(x);", 1).render(), ["x = 14", "print x"])
+
+    def test_integer_division(self):
+        # Divisão truncada como em C; a divisão por zero fica para a execução
+        ops = operations(compile("print(7 / 2); print((0 - 7) / 2); print(1 / 0);", 1))
+        self.assertEqual([left for op, left, _ in ops if op == Op.PRINT][:2], ["3", "-3"])
+        self.assertIn((Op.DIV, "1", "0"), ops)
+
+    def test_identities_only_for_ints(self):
+        code = "int x, y; bool b; x = 7; y = (x + 2) * 1 + 0; print(y); b = true * 1; print(b);"
+        ops = operations(compile(code, 1))
+        self.assertEqual([(op, left, right) for op, left, right in ops if op in (Op.ADD, Op.MUL)],
+                         [(Op.ADD, "x", "2"), (Op.MUL, "true", "1")])  # `true * 1` vale 1, não true
+
+    def test_constant_branches(self):
+        code = "int i; i = 0; while (1 > 2) { i = i + 1; } if (1 < 2) { print(i); } else { print(2); }"
+        ops = {op for op, _, _ in operations(compile(code, 1))}
+        self.assertFalse(ops & {Op.IF_FALSE, Op.GT, Op.LT})
+
+    def test_never_larger(self):
+        for name, code in sample_programs().items():
+            with self.subTest(programa=name):
+                plain = Compiler(code, quiet=True).compile()
+                if plain.success:
+                    self.assertLessEqual(len(compile(code, 1)), len(plain.tac))
+
+if __name__ == "__main__":
+    unittest.main()
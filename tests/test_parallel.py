@@ -0,0 +1,73 @@
+import unittest
+import parallel_backend
+from compiler import Compiler
+from lexer import Lexer
+from parallel_backend import ParallelBackend, VisibleSymbols
+from parser import Parser
+from support import sample_programs
+
+# Com jobs=2 os corpos das funções são analisados e gerados num pool de
+# processos (parallel_backend.py); o resultado tem que ser o mesmo de jobs=1
+
+def parse(code):
+    return Parser(Lexer(code).iter_tokens()).parse()
+
+class ParallelBackendTest(unittest.TestCase):
+    def compile(self, code, jobs):
+        return Compiler(code, quiet=True, jobs=jobs).compile()
+
+    def assert_same(self, code):
+        sequential = self.compile(code, jobs=1)
+        parallel = self.compile(code, jobs=2)
+        self.assertEqual(parallel.tac, sequential.tac)
+        self.assertEqual(parallel.diagnostics, sequential.diagnostics)
+        self.assertEqual(parallel.symbol_table.keys(), sequential.symbol_table.keys())
+        return parallel
+
+    def test_same_tac(self):
+        for name, code in sample_programs().items():
+            with self.subTest(programa=name):
+                self.assert_same(code)
+
+    def test_uses_pool(self):
+        # O programa gerado no formato "functions" passa mesmo pelo pool
+        result = self.assert_same(sample_programs()["functions"])
+        self.assertTrue(result.success)
+        self.assertGreater(result.profile["phases"]["semantic"]["counters"]["parallel_functions"], 1)
+
+    def test_same_errors(self):
+        code = ("int f(int a) { bool r; r = a; return a; }\n"
+                "int g(int b) { int r; r = true; return r; }\n"
+                "int x; x = fun g(2);")
+        result = self.assert_same(code)
+        self.assertEqual(len(result.diagnostics), 2)
+
+    def test_state_released(self):
+        # O processo pai não fica com a AST e a tabela da última compilação
+        # (nem pelo pool, nem pelo caminho sequencial com jobs=1)
+        self.compile(sample_programs()["functions"], jobs=2)
+        self.assertEqual(parallel_backend._units, ())
+        self.assertEqual(parallel_backend._positions, {})
+        backend = ParallelBackend(parse("int f(int a) { return a; }\nint g(int b) { return b; }\n"), 1)
+        self.assertEqual(backend.analyze(), [])
+        self.assertEqual(parallel_backend._units, ())
+        self.assertEqual(parallel_backend._positions, {})
+
+    def test_visible_symbols(self):
+        # Uma função só vê as entradas globais que existiam quando foi declarada
+        positions = {"a": (0, "int"), "f": (1, "fun"), "b": (2, "bool")}
+        visible = VisibleSymbols(positions, 2)
+        self.assertIn("a", visible)
+        self.assertIn("f", visible)
+        self.assertNotIn("b", visible)
+        self.assertEqual(visible["a"], "int")
+        with self.assertRaises(KeyError):
+            visible["b"]
+
+    def test_supports(self):
+        two = "int f(int a) { return a; }\nint g(int b) { return b; }\n"
+        self.assertTrue(ParallelBackend.supports(parse(two)))
+        self.assertFalse(ParallelBackend.supports(parse("int f(int a) { return a; }\n")))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import io
+import unittest
+from lexer import Lexer
+from parse_trace import CallbackTracer, ListTracer, StreamTracer
+from parser import Parser
+
+# Rastreamento opcional do Parser (parse_trace.py)
+
+def parse(code, tracer):
+    return Parser(Lexer(code).iter_tokens(), tracer=tracer).parse()
+
+class ParseTraceTest(unittest.TestCase):
+    def events(self, code):
+        events = []
+        try:
+            parse(code, CallbackTracer(lambda event, data: events.append((event, data))))
+        except SyntaxError:
+            pass
+        return events
+
+    def assert_balanced(self, events):
+        # Cada "enter" tem o seu "leave", na ordem de uma pilha
+        stack = []
+        for event, data in events:
+            if event == "enter":
+                stack.append(data)
+            elif event == "leave":
+                self.assertEqual(stack.pop(), data)
+        self.assertEqual(stack, [])
+
+    def test_events(self):
+        events = self.events("int x;\nx = 1 + 2;")
+        self.assert_balanced(events)
+        self.assertEqual(events[0], ("enter", "declaracao_comando"))
+        consumed = [data.value for event, data in events if event == "consume"]
+        self.assertEqual(consumed, ["int", "x", ";", "x", "=", "1", "+", "2", ";"])
+
+    def test_balanced_on_syntax_error(self):
+        for code in ("int x;\nx = 1 +;", "int f(int a) { int r; r = a", "if (1 < 2) { print(1); "):
+            with self.subTest(codigo=code):
+                events = self.events(code)
+                self.assertTrue(events)
+                self.assert_balanced(events)
+
+    def test_stream_tracer_depth(self):
+        stream = io.StringIO()
+        tracer = StreamTracer(stream)
+        with self.assertRaises(SyntaxError):
+            parse("int x;\nx = (1 + ;", tracer)
+        self.assertEqual(tracer.depth, 0)
+        self.assertTrue(stream.getvalue().endswith("}\n"))
+
+    def test_list_tracer(self):
+        tracer = ListTracer()
+        parse("print(1);", tracer)
+        self.assertIn("Analisando comando_impressao...", tracer.steps)
+        self.assertEqual(tracer.steps[-1], "Fim de declaracao_comando")
+
+    def test_no_tracer(self):
+        # Sem tracer os métodos da gramática não são embrulhados
+        parser = Parser(Lexer("print(1);").iter_tokens())
+        self.assertEqual(parser.eat.__func__, Parser.eat)
+
+if __name__ == "__main__":
+    unittest.main()
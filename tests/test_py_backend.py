@@ -0,0 +1,63 @@
+import unittest
+import py_backend
+from compiler import Compiler
+from support import sample_programs
+from tac_vm import TacRuntimeError
+
+# O backend Python (py_backend.py) tem que imprimir o mesmo que a TacVM, ou
+# dar o mesmo erro de execução, com a mesma mensagem
+
+def run(result, backend):
+    output = []
+    try:
+        result.execute(backend=backend, write=output.append)
+    except TacRuntimeError as e:
+        return output, str(e)
+    return output, None
+
+class PythonBackendTest(unittest.TestCase):
+    def assert_same(self, code):
+        result = Compiler(code, quiet=True).compile()
+        self.assertTrue(result.success, result.diagnostics)
+        self.assertEqual(run(result, "python"), run(result, "vm"))
+        return result
+
+    def test_same_as_vm(self):
+        for name, code in sample_programs().items():
+            with self.subTest(programa=name):
+                result = Compiler(code, quiet=True).compile()
+                if not result.success:
+                    continue
+                self.assertIsNotNone(py_backend.load(result.ast))
+                self.assertEqual(run(result, "python"), run(result, "vm"))
+
+    def test_runtime_errors(self):
+        cases = (
+            "int x; x = 0; print(1); print(2 / x);",
+            "int x, y; y = x + 1;",
+            "int f(int a) { int r; if (a > 0) { r = a; } return r; }\nprint(fun f(1));\nprint(fun f(0));",
+            "int f(int n) { return fun f(n + 1); }\nprint(fun f(0));",
+        )
+        for code in cases:
+            with self.subTest(codigo=code):
+                result = self.assert_same(code)
+                self.assertIsNotNone(run(result, "python")[1])
+
+    def test_deep_nesting_falls_back_to_vm(self):
+        # Blocos aninhados além dos limites do compilador do CPython (níveis
+        # de indentação, blocos estáticos de laços): load devolve None e a
+        # execução vai para a TacVM
+        programs = {
+            "if": "int x; x = 1;\n" + "if (x > 0) {\n" * 150 + "print(x);\n" + "}\n" * 150,
+            "while": "int i; i = 0;\n" + "while (i < 1) {\n" * 30 + "print(i); i = i + 1;\n" + "}\n" * 30,
+        }
+        for name, code in programs.items():
+            with self.subTest(programa=name):
+                result = Compiler(code, quiet=True).compile()
+                self.assertIsNotNone(py_backend.translate(result.ast))
+                self.assertIsNone(py_backend.load(result.ast))
+                self.assertEqual(result.execute(), result.execute(backend="vm"))
+                self.assertTrue(result.execute())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import random
+import unittest
+from ast_arena import ASTArena
+from ast_node import NodeKind
+from compiler import Compiler
+from serialization import (AST_MAGIC, FORMAT_VERSION, TUPLE_OPS, AstReader, SerializationError, TacReader,
+                           dump_ast, dump_tac, load_ast, load_tac)
+from support import ast_items, sample_programs
+
+# Ida e volta pelo formato binário (serialization.py): a AST (com as
+# posições) e o código de três endereços voltam iguais, e dados estragados
+# geram SerializationError em vez de um resultado malformado
+
+class SerializationTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.results = {name: Compiler(code, quiet=True).compile() for name, code in sample_programs().items()}
+
+    def test_ast_round_trip(self):
+        for name, result in self.results.items():
+            with self.subTest(programa=name):
+                data = dump_ast(result.ast)
+                self.assertEqual(ast_items(load_ast(data)), ast_items(result.ast))
+                self.assertEqual(ast_items(load_ast(data, arena=ASTArena())), ast_items(result.ast))
+
+    def test_ast_from_arena(self):
+        code = sample_programs()["mixed"]
+        result = Compiler(code, quiet=True, arena=True).compile()
+        self.assertEqual(ast_items(load_ast(dump_ast(result.ast))), ast_items(result.ast))
+
+    def test_ast_single_function(self):
+        result = self.results["functions"]
+        reader = AstReader(dump_ast(result.ast))
+        declarations = {node.value: node for node in result.ast.children
+                        if node.kind in (NodeKind.DeclaracaoFuncao, NodeKind.DeclaracaoProcedimento)}
+        self.assertEqual(list(declarations), reader.functions())
+        self.assertTrue(declarations)
+        for name, node in declarations.items():
+            self.assertEqual(ast_items(reader.function(name)), ast_items(node))
+
+    def test_tac_round_trip(self):
+        for name, result in self.results.items():
+            if result.tac is None:
+                continue
+            with self.subTest(programa=name):
+                data = dump_tac(result.tac)
+                self.assertEqual(load_tac(data), result.tac)
+                reader = TacReader(data)
+                for function in reader.functions():
+                    self.assertTrue(reader.function(function).instructions)
+
+    def test_invalid_header(self):
+        data = dump_ast(self.results["codigo_1.txt"].ast)
+        with self.assertRaises(SerializationError):
+            load_tac(data)
+        with self.assertRaises(SerializationError):
+            load_ast(AST_MAGIC + bytes([FORMAT_VERSION + 1]) + data[5:])
+        with self.assertRaises(SerializationError):
+            load_ast(data[:len(data) // 2])
+
+    def test_corrupted_tac(self):
+        # Trocar um byte qualquer ou gera erro ou dá um programa bem formado:
+        # tuplas só no `right` das instruções que recebem parâmetros/argumentos
+        data = dump_tac(self.results["mixed"].tac)
+        rng = random.Random(0)
+        for _ in range(500):
+            corrupted = bytearray(data)
+            corrupted[rng.randrange(len(corrupted))] = rng.randrange(256)
+            try:
+                program = load_tac(bytes(corrupted))
+            except SerializationError:
+                continue
+            for op, result, left, right in program.instructions:
+                self.assertNotIsInstance(result, tuple)
+                self.assertNotIsInstance(left, tuple)
+                if isinstance(right, tuple):
+                    self.assertIn(op, TUPLE_OPS)
+                    self.assertFalse(any(isinstance(item, tuple) for item in right))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+from compiler import Compiler
+from source import open_source
+from support import ast_items, sample_programs
+
+# O modo streaming (parser lendo Lexer.iter_tokens) tem que dar o mesmo
+# resultado da compilação com a lista de tokens completa
+
+class StreamingTest(unittest.TestCase):
+    def compile(self, code, streaming):
+        return Compiler(code, streaming=streaming, quiet=True).compile()
+
+    def assert_same(self, code):
+        buffered = self.compile(code, streaming=False)
+        streamed = self.compile(code, streaming=True)
+        self.assertEqual(ast_items(streamed.ast), ast_items(buffered.ast))
+        self.assertEqual(streamed.diagnostics, buffered.diagnostics)
+        if buffered.tac is not None:
+            self.assertEqual(streamed.tac, buffered.tac)
+
+    def test_same_ast(self):
+        for name, code in sample_programs().items():
+            with self.subTest(programa=name):
+                self.assert_same(code)
+
+    def test_same_errors(self):
+        for code in ("int x;\nx = 1 $ 2;", "int x\nx = 1;", "int x;\nprint(\"ção\"); x = ;"):
+            with self.subTest(codigo=code):
+                self.assert_same(code)
+
+    def test_mapped_file(self):
+        # Com o arquivo mapeado em memória (bytes), como no main.py
+        code = 'int a;\nprint("ação"); a = 1; print(a);\n'
+        expected = ast_items(self.compile(code, streaming=False).ast)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "codigo.txt")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(code)
+            for streaming in (False, True):
+                with open_source(path) as mapped:
+                    result = self.compile(mapped, streaming)
+                self.assertEqual(ast_items(result.ast), expected)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+from compiler import Compiler
+from lexer import Lexer
+from parser import Parser
+from tac_vm import TacRuntimeError, TacVM
+from three_address_code_generator import ThreeAddressCodeGenerator
+
+# Limites e erros de execução da TacVM (tac_vm.py)
+
+def compile(code):
+    result = Compiler(code, quiet=True).compile()
+    assert result.success, result.diagnostics
+    return result.tac
+
+class TacVMTest(unittest.TestCase):
+    def test_step_limit(self):
+        # Com max_steps=N executam-se exatamente N instruções
+        program = compile("int i; i = 0; while (i < 10) { i = i + 1; } print(i);")
+        vm = TacVM(program)
+        self.assertEqual(vm.run(), ["10"])
+        steps = vm.steps
+        vm = TacVM(program, max_steps=steps)
+        self.assertEqual(vm.run(), ["10"])
+        self.assertEqual(vm.steps, steps)
+        vm = TacVM(program, max_steps=steps - 1)
+        with self.assertRaisesRegex(TacRuntimeError, f"Limite de {steps - 1} instruções"):
+            vm.run()
+        self.assertEqual(vm.steps, steps - 1)
+
+    def test_depth_limit(self):
+        program = compile("int f(int n) { int r; r = n; if (n > 0) { r = fun f(n - 1); } return r; }\n"
+                          "print(fun f(20));")
+        self.assertEqual(TacVM(program, max_depth=21).run(), ["0"])
+        with self.assertRaisesRegex(TacRuntimeError, "Estouro da pilha de chamadas em 'f'"):
+            TacVM(program, max_depth=20).run()
+
+    def test_runtime_errors(self):
+        cases = {
+            "int x; x = 0; print(1 / x);": "Erro de execução em '<main>': Divisão por zero",
+            "int x, y; y = x + 1;": "Variável 'x' lida antes de ser atribuída",
+            "int f(int a) { int r; return r; }\nprint(fun f(1));": "Erro de execução em 'f': Variável 'r'",
+        }
+        for code, message in cases.items():
+            with self.subTest(codigo=code):
+                with self.assertRaisesRegex(TacRuntimeError, message):
+                    TacVM(compile(code)).run()
+
+    def test_break_outside_loop(self):
+        # A análise semântica recusa; sem ela o gerador emite um `break` sem
+        # destino, que é erro de execução
+        code = "print(1); break; print(2);"
+        result = Compiler(code, quiet=True).compile()
+        self.assertEqual([str(diagnostic) for diagnostic in result.diagnostics], ["[semantic] Erro: 'break' fora de um laço."])
+        program = ThreeAddressCodeGenerator(Parser(Lexer(code).iter_tokens()).parse()).generate()
+        output = []
+        with self.assertRaisesRegex(TacRuntimeError, "'break' fora de um laço"):
+            TacVM(program, write=output.append).run()
+        self.assertEqual(output, ["1"])
+
+    def test_break_in_routine_inside_loop(self):
+        # O `break` de uma função declarada dentro de um laço só sai dos
+        # laços da própria função
+        code = ("int i; i = 0;\n"
+                "while (i < 3) {\n"
+                "    int f(int a) { while (a < 5) { a = a + 1; break; } return a; }\n"
+                "    print(fun f(i));\n"
+                "    i = i + 1;\n"
+                "}\n")
+        self.assertEqual(TacVM(compile(code)).run(), ["1", "2", "3"])
+        result = Compiler("int i; i = 0; while (i < 3) { int f(int a) { break; return a; } i = i + 1; }", quiet=True).compile()
+        self.assertEqual([str(diagnostic) for diagnostic in result.diagnostics], ["[semantic] Erro: 'break' fora de um laço."])
+
+    def test_repeated_parameter(self):
+        result = Compiler("int f(int a, int a) { return a; }\nprint(fun f(1, 2));", quiet=True).compile()
+        self.assertFalse(result.success)
+        self.assertEqual([str(diagnostic) for diagnostic in result.diagnostics], ["[semantic] Erro: Parâmetro 'a' repetido em 'f'."])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+from cfg import build_cfgs
+from compiler import Compiler
+from support import sample_programs
+from tac_vm import TacRuntimeError, run_program
+from temp_allocation import allocate_temps, linear_scan, live_intervals
+
+# Reaproveitamento de temporários (temp_allocation.py): dois temporários só
+# dividem um slot se os seus intervalos de vida não se sobrepõem
+
+CODE = """int f(int a, int b) { int r; r = a * b; return r; }
+int x;
+x = 3;
+print(fun f(x + 1, x * 2) + (x - 1) * (x + 4));
+print((x + 1) * (x + 2) * (x + 3));
+while (x + 0 < 6) { x = x + 1 * 1; }
+print(x);
+"""
+
+def execution(program):
+    try:
+        return run_program(program)
+    except TacRuntimeError as e:
+        return str(e)
+
+def compile(code):
+    return Compiler(code, quiet=True).compile().tac
+
+class TempAllocationTest(unittest.TestCase):
+    def assert_disjoint(self, intervals, slots):
+        # Temporários com o mesmo slot: um termina (na leitura) antes ou no
+        # ponto em que o outro começa
+        by_slot = {}
+        for temp, slot in slots.items():
+            by_slot.setdefault(slot, []).append(intervals[temp])
+        for shared in by_slot.values():
+            shared.sort()
+            for (_, end), (start, _) in zip(shared, shared[1:]):
+                self.assertLessEqual(end, start)
+
+    def test_no_overlap(self):
+        programs = dict(sample_programs())
+        programs["exemplo"] = CODE
+        for name, code in programs.items():
+            program = compile(code)
+            if program is None:
+                continue
+            for graph in build_cfgs(program).values():
+                with self.subTest(programa=name, rotina=graph.name):
+                    intervals = live_intervals(graph)
+                    slots, count = linear_scan(intervals)
+                    self.assertEqual(set(slots), set(intervals))
+                    self.assertEqual(set(slots.values()), set(range(count)))
+                    self.assert_disjoint(intervals, slots)
+
+    def test_intervals(self):
+        # Um temporário vive da instrução que o escreve até a última que o lê
+        program = compile("int x; x = 2; print((x + 1) * (x + 2));")
+        intervals = live_intervals(build_cfgs(program)["<main>"])
+        self.assertEqual(len(intervals), 3)
+        first, second, product = sorted(intervals.values())
+        self.assertEqual(first[1], second[1])      # os dois são lidos pela multiplicação
+        self.assertEqual(product[0], first[1])     # que escreve o produto
+        self.assertGreater(product[1], product[0])
+
+    def test_linear_scan(self):
+        # O resultado pode ir para o slot de um operando lido na mesma instrução
+        slots, count = linear_scan({0: [0, 2], 1: [1, 3], 2: [2, 4], 3: [3, 5], 4: [6, 6]})
+        self.assertEqual(count, 2)
+        self.assertEqual(slots[0], slots[2])
+        self.assertEqual(slots[1], slots[3])
+        self.assertNotEqual(slots[0], slots[1])
+        self.assertEqual(linear_scan({})[1], 0)
+
+    def test_same_execution(self):
+        programs = dict(sample_programs())
+        programs["exemplo"] = CODE
+        for name, code in programs.items():
+            program = compile(code)
+            if program is None:
+                continue
+            with self.subTest(programa=name):
+                expected = execution(program)
+                stats = allocate_temps(program)
+                self.assertEqual(execution(program), expected)
+                self.assertLessEqual(stats["temps_after"], stats["temps_before"])
+                self.assertLessEqual(stats["max_live_temps"], 3)
+                for graph in build_cfgs(program).values():
+                    # Numeração compacta a partir de t0 em cada rotina
+                    temps = set(live_intervals(graph))
+                    self.assertEqual(temps, set(range(len(temps))))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,134 +1,196 @@
+from ast_node import NodeKind
+from tac_ir import BINARY_OPS, LabelKind, Op, TacProgram
+
+# Nós que criam um temporário e nós que criam dois rótulos
+BINARY_NODES = frozenset({NodeKind.ExpressaoBooleana, NodeKind.ExpressaoAritmetica, NodeKind.Termo})
+TEMP_NODES = BINARY_NODES | {NodeKind.ChamadaFuncao}
+LABEL_NODES = frozenset({NodeKind.ComandoLaco, NodeKind.ComandoCondicional})
+EXPRESSION_NODES = TEMP_NODES | {NodeKind.Numero, NodeKind.ID, NodeKind.Booleano, NodeKind.String}
+END_LOOP = object()  # marcador na pilha da geração: fecha o laço mais interno
+
+def numbers_used(node):
+    # Quantos temporários e rótulos a geração de `node` vai numerar, sem
+    # gerar o código; permite saber onde a numeração de cada trecho começa
+    temps = labels = 0
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node is None:
+            continue
+        if node.kind in TEMP_NODES:
+            temps += 1
+        elif node.kind in LABEL_NODES:
+            labels += 2
+        stack.extend(node.children)
+    return temps, labels
+
 class ThreeAddressCodeGenerator:
-    def __init__(self, ast_root):
+    # Gera o código de três endereços como um tac_ir.TacProgram; o texto é
+    # produzido só quando pedido (TacProgram.render)
+    def __init__(self, ast_root, temp_count=0, label_count=0):
         self.ast_root = ast_root
-        self.temp_count = 0
-        self.instructions = []
-        self.indentation_level = 0
+        # Temporários e rótulos têm numerações separadas; os valores iniciais
+        # permitem continuar a numeração de outro gerador
+        self.temp_count = temp_count
+        self.label_count = label_count
+        self.temps_created = 0
+        self.program = TacProgram()
+        self.instructions = self.program.instructions
+        self.emit = self.instructions.append
+        self.loop_ends = []  # rótulo de fim de cada laço aberto, para o `break`
     
     def new_temp(self):
-        temp_name = f"t{self.temp_count}"
+        temp = self.temp_count
         self.temp_count += 1
-        return temp_name
+        self.temps_created += 1
+        return temp
 
-    def indent(self):
-        return '    ' * self.indentation_level
+    def new_label(self, kind):
+        label = self.label_count
+        self.label_count += 1
+        self.program.labels[label] = kind
+        return label
 
     def generate(self):
         self.traverse(self.ast_root)
-        return self.instructions
+        return self.program
 
     def traverse(self, node):
+        # Gera o código de `node` sem recursão, com uma pilha explícita de
+        # nós a visitar e de instruções (tuplas) a emitir depois deles; para
+        # expressões devolve o operando com o valor
         if node is None:
-            return
-
-        if node.node_type == "Programa":
-            for child in node.children:
-                self.traverse(child)
-        elif node.node_type == "DeclaracaoVariavel":
-            pass 
-        elif node.node_type == "DeclaracaoFuncao":
-            func_name = node.value
-            self.instructions.append(f"\n{self.indent()}# Início da função '{func_name}'")
-            self.instructions.append(f"{self.indent()}function {func_name} begin")
-            self.indentation_level += 1
-            for param in node.children[1:-1]:
-                if param.node_type == "Parametro":
-                  """   param_name = param.value
-                    self.instructions.append(f"{self.indent()}param {param_name}") """
-                pass
-            self.traverse(node.children[-1])
-            self.indentation_level -= 1
-            self.instructions.append(f"{self.indent()}function {func_name} end")
-        elif node.node_type == "DeclaracaoProcedimento":
-            proc_name = node.value
-            self.instructions.append(f"\n{self.indent()}# Início do procedimento '{proc_name}'")
-            self.instructions.append(f"{self.indent()}procedure {proc_name} begin")
-            self.indentation_level += 1
-            for param in node.children[1:-1]:
-                """ if param.node_type == "Parametro":
-                    param_name = param.value
-                    self.instructions.append(f"{self.indent()}param {param_name}") """
+            return None
+        if node.kind in EXPRESSION_NODES:
+            return self.expression(node)
+        emit = self.emit
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            if type(node) is tuple:
+                emit(node)
+                continue
+            if node is END_LOOP:
+                self.loop_ends.pop()
+                continue
+            if type(node) is list:
+                # Fim de uma rotina: volta aos laços abertos fora dela
+                self.loop_ends = node
+                continue
+
+            kind = node.kind
+            if kind == NodeKind.Programa or kind == NodeKind.Bloco or kind == NodeKind.BlocoComRetorno:
+                stack.extend(reversed(node.children))
+            elif kind == NodeKind.DeclaracaoVariavel:
                 pass
-            self.traverse(node.children[-1])
-            self.indentation_level -= 1
-            self.instructions.append(f"{self.indent()}procedure {proc_name} end")
-        elif node.node_type == "ComandoAtribuicao":
-            temp = self.traverse(node.children[1])
-            self.instructions.append(f"{self.indent()}{node.children[0].value} = {temp}")
-        elif node.node_type == "ComandoImpressao":
-            temp = self.traverse(node.children[0])
-            self.instructions.append(f"{self.indent()}print {temp}")
-        elif node.node_type == "ComandoLaco":
-            start_label = f"L{self.temp_count}"
-            self.temp_count += 1
-            end_label = f"L{self.temp_count}"
-            self.temp_count += 1
-
-            self.instructions.append(f"\n{self.indent()}{start_label}:  # Início do laço 'while'")
-            cond = self.traverse(node.children[0])
-            self.instructions.append(f"{self.indent()}if {cond} == false goto {end_label}")
-            self.traverse(node.children[1])
-            self.instructions.append(f"{self.indent()}goto {start_label}")
-            self.instructions.append(f"{self.indent()}{end_label}:  # Fim do laço 'while'")
-        elif node.node_type == "ComandoCondicional":
-            cond = self.traverse(node.children[0])
-            else_label = f"L{self.temp_count}"
-            self.temp_count += 1
-            end_label = f"L{self.temp_count}"
-            self.temp_count += 1
-
-            self.instructions.append(f"\n{self.indent()}if {cond} == false goto {else_label}")
-            self.traverse(node.children[1])
-            self.instructions.append(f"{self.indent()}goto {end_label}")
-            self.instructions.append(f"{self.indent()}{else_label}:  # Bloco 'else'")
-            if len(node.children) == 3:
-                self.traverse(node.children[2])
-            self.instructions.append(f"{self.indent()}{end_label}:  # Fim do if-else")
-        elif node.node_type == "ComandoBreak":
-            self.instructions.append(f"{self.indent()}break")
-        elif node.node_type == "ChamadaFuncao":
-            args = [self.traverse(arg) for arg in node.children]
-            temp = self.new_temp()
-            self.instructions.append(f"{self.indent()}{temp} = call {node.value}, {', '.join(args)}")
-            return temp
-        elif node.node_type == "ChamadaProcedimento":
-            self.instructions.append(f"\n{self.indent()}# Início da chamada de '{node.value}'")
-            args = [self.traverse(arg) for arg in node.children]
-            self.instructions.append(f"{self.indent()}call {node.value}, {', '.join(args)}")
-            self.instructions.append(f"{self.indent()}# Fim da chamada de '{node.value}'")
-
-
-        elif node.node_type == "ExpressaoBooleana":
-            left = self.traverse(node.children[0])
-            right = self.traverse(node.children[1])
-            temp = self.new_temp()
-            self.instructions.append(f"{self.indent()}{temp} = {left} {node.value} {right}")
-            return temp
-        elif node.node_type == "ExpressaoAritmetica" or node.node_type == "Termo":
-            left = self.traverse(node.children[0])
-            right = self.traverse(node.children[1])
-            temp = self.new_temp()
-            self.instructions.append(f"{self.indent()}{temp} = {left} {node.value} {right}")
-            return temp
-        elif node.node_type == "Numero":
-            return node.value
-        elif node.node_type == "ID":
-            return node.value
-        elif node.node_type == "Booleano":
-            return node.value
-        elif node.node_type == "String":  
-            return f'"{node.value}"'  
-        elif node.node_type == "ComandoRetorno":
-            temp = self.traverse(node.children[0])
-            self.instructions.append(f"{self.indent()}return {temp}")
-        elif node.node_type == "Bloco":
-            for child in node.children:
-                self.traverse(child)
-        elif node.node_type == "BlocoComRetorno":
-            for child in node.children:
-                self.traverse(child)
-        else:
-            raise NotImplementedError(f"Node type {node.node_type} not implemented in code generation")
+            elif kind == NodeKind.DeclaracaoFuncao:
+                params = tuple(param.value for param in node.children[1:-1])
+                emit((Op.FUNC_BEGIN, None, node.value, params))
+                stack.append(self.loop_ends)
+                stack.append((Op.FUNC_END, None, node.value, None))
+                stack.append(node.children[-1])
+                # Um `break` na rotina não sai dos laços de quem a declarou
+                self.loop_ends = []
+            elif kind == NodeKind.DeclaracaoProcedimento:
+                params = tuple(param.value for param in node.children[:-1])
+                emit((Op.PROC_BEGIN, None, node.value, params))
+                stack.append(self.loop_ends)
+                stack.append((Op.PROC_END, None, node.value, None))
+                stack.append(node.children[-1])
+                self.loop_ends = []
+            elif kind == NodeKind.ComandoAtribuicao:
+                temp = self.expression(node.children[1])
+                emit((Op.ASSIGN, node.children[0].value, temp, None))
+            elif kind == NodeKind.ComandoImpressao:
+                temp = self.expression(node.children[0])
+                emit((Op.PRINT, None, temp, None))
+            elif kind == NodeKind.ComandoLaco:
+                start_label = self.new_label(LabelKind.LOOP_START)
+                end_label = self.new_label(LabelKind.LOOP_END)
+
+                emit((Op.LABEL, None, start_label, None))
+                cond = self.expression(node.children[0])
+                emit((Op.IF_FALSE, None, cond, end_label))
+                self.loop_ends.append(end_label)
+                stack.append((Op.LABEL, None, end_label, None))
+                stack.append((Op.GOTO, None, start_label, None))
+                stack.append(END_LOOP)
+                stack.append(node.children[1])
+            elif kind == NodeKind.ComandoCondicional:
+                cond = self.expression(node.children[0])
+                else_label = self.new_label(LabelKind.ELSE)
+                end_label = self.new_label(LabelKind.IF_END)
+
+                emit((Op.IF_FALSE, None, cond, else_label))
+                stack.append((Op.LABEL, None, end_label, None))
+                if len(node.children) == 3:
+                    stack.append(node.children[2])
+                stack.append((Op.LABEL, None, else_label, None))
+                stack.append((Op.GOTO, None, end_label, None))
+                stack.append(node.children[1])
+            elif kind == NodeKind.ComandoBreak:
+                # Sai para o fim do laço mais interno; fora de laço fica sem destino
+                emit((Op.BREAK, None, self.loop_ends[-1] if self.loop_ends else None, None))
+            elif kind == NodeKind.ChamadaProcedimento:
+                emit((Op.CALL_START, None, node.value, None))
+                args = tuple(self.expression(arg) for arg in node.children)
+                emit((Op.CALL_PROC, None, node.value, args))
+            elif kind == NodeKind.ComandoRetorno:
+                temp = self.expression(node.children[0])
+                emit((Op.RETURN, None, temp, None))
+            elif kind in EXPRESSION_NODES:
+                self.expression(node)
+            else:
+                raise NotImplementedError(f"Node type {node.node_type} not implemented in code generation")
+
+    def expression(self, node):
+        # Avalia a expressão em pós-ordem com uma pilha explícita (cadeias
+        # longas como `a + b + c ...` formam árvores muito profundas); um
+        # nó numa tupla já teve os filhos avaliados e os operandos deles
+        # estão no topo de `values`
+        if node is None:
+            return None
+        emit = self.emit
+        values = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if type(node) is tuple:
+                node = node[0]
+                temp = self.new_temp()
+                if node.kind == NodeKind.ChamadaFuncao:
+                    first = len(values) - len(node.children)
+                    args = tuple(values[first:])
+                    del values[first:]
+                    emit((Op.CALL, temp, node.value, args))
+                else:
+                    right = values.pop()
+                    left = values.pop()
+                    emit((BINARY_OPS[node.value], temp, left, right))
+                values.append(temp)
+                continue
+            if node is None:
+                values.append(None)
+                continue
+
+            kind = node.kind
+            if kind in BINARY_NODES:
+                stack.append((node,))
+                stack.append(node.children[1])
+                stack.append(node.children[0])
+            elif kind == NodeKind.ChamadaFuncao:
+                stack.append((node,))
+                stack.extend(reversed(node.children))
+            elif kind == NodeKind.Numero or kind == NodeKind.ID or kind == NodeKind.Booleano:
+                values.append(node.value)
+            elif kind == NodeKind.String:
+                values.append(f'"{node.value}"')
+            else:
+                # Comando no lugar de uma expressão: gera o código dele
+                values.append(self.traverse(node))
+        return values[0]
 
 if __name__ == '__main__':
     from lexer import Lexer
@@ -154,7 +216,7 @@ if __name__ == '__main__':
 
         codegen = ThreeAddressCodeGenerator(ast_root)
         instructions = codegen.generate()
-        for instr in instructions:
+        for instr in instructions.render():
             print(instr)
 
     except SyntaxError as e: